@@ -37,10 +37,14 @@ bl_info = {
     'category': 'Development',
 }
 
+import os
+
 import bpy
 
 from .directory_monitor import monitor
-from .hot_swap import reload_modules
+from .hot_swap import queue_hot_swap, stop_import_tracking
+from .main_thread import main_thread
+from .swap_profiler import profiler
 
 from .preferences import DebuggerPreferences
 from .ui import ScriptingAssistantPanel, DebugServerPanel, HotSwapPanel
@@ -52,6 +56,7 @@ from .operators.monitor_stop import MonitorStop
 from .operators.open_addon_preferences import OpenAddonPreferences
 from .operators.open_blender_addon_directory import OpenAddonDirectory
 from .operators.open_monitor_source_directory import OpenMonitoredSourceDirectory
+from .operators.preview_addon_sync import PreviewAddonSync
 from .operators.toggle_blender_terminal import ToggleBlenderTerminal
 
 debugger_classes = (
@@ -68,12 +73,19 @@ debugger_classes = (
     OpenAddonPreferences,
     OpenAddonDirectory,
     OpenMonitoredSourceDirectory,
+    PreviewAddonSync,
     ToggleBlenderTerminal,
 
     # Preferences
     DebuggerPreferences
 )
 
+@bpy.app.handlers.persistent
+def reset_monitor_backoff(*args):
+    # Any scene update means the user is working in Blender again, so they are probably about to try out their latest
+    #   edit. Make sure the monitor is polling at full speed for it.
+    monitor.reset_backoff()
+
 def register():
     for cls in debugger_classes:
         bpy.utils.register_class(cls)
@@ -81,12 +93,28 @@ def register():
 
     monitor._directory = bpy.context.preferences.addons[__package__].preferences.monitor_path
         # Ensure the directory is set to a valid path at startup; prevents unexpected errors for the first time user
+    preferences = bpy.context.preferences.addons[__package__].preferences
+    monitor.scan_budget_entries = preferences.monitor_scan_budget_entries
+    monitor.scan_budget_time = preferences.monitor_scan_budget_time
+    profiler.latency_budget = preferences.hot_swap_latency_budget
+    monitor.cache_file = os.path.join(bpy.utils.user_resource('CONFIG', path="scripting_assistant", create=True),
+        "monitor_snapshot.cache")
+        # Read on the first watch, so edits made while Blender was closed are still hot swapped
     
-    monitor.subscribe("Hotswap", reload_modules)
+    monitor.subscribe("Hotswap", queue_hot_swap, pass_changes=True)
+        # The changed files let the hot swap reload only the modules they affect. The swap itself is queued to run on
+        #   Blender's main thread, since the monitor calls its subscribers from a background thread.
+    main_thread.start()
+    bpy.app.handlers.depsgraph_update_post.append(reset_monitor_backoff)
 
 def unregister(): 
     for cls in debugger_classes:
         bpy.utils.unregister_class(cls)
 
+    if reset_monitor_backoff in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(reset_monitor_backoff)
+    main_thread.stop()
+    stop_import_tracking()  # Its finder must not outlive this add-on's code
+
 if __name__ == "__main__":
     register()
@@ -0,0 +1,202 @@
+"""
+Add-on Sync
+
+Keeps the installed copy of an add-on in Blender's add-ons folder up to date with its source folder, copying only what
+changed. A manifest in the installed folder records the size, modified time, and optionally the content hash of every
+file that was copied. On the next sync, files whose source still matches the manifest are left alone, so an add-on
+that ships large icons, presets, or .blend libraries only pays for the files that were actually edited.
+
+Once there is a manifest, only files listed in it are ever deleted from the installed folder. Anything else found
+there, such as files the add-on writes at runtime, is left untouched. The first sync into a folder without a manifest
+cannot tell those apart from files an older install left behind, so it removes every file the source does not have.
+"""
+
+import json
+import os
+import shutil
+
+from .content_hash import MAX_HASHED_FILE_SIZE, file_digest
+from .directory_snapshot import relative_path, take_snapshot
+from .path_filter import PathFilter
+
+MANIFEST_FILE_NAME = ".scripting_assistant_manifest.json"
+MANIFEST_FORMAT_VERSION = 1
+
+
+class SyncReport(object):
+    """What a sync copied or removed, or for a dry run, what it would. Paths are relative to the add-on folder."""
+
+    def __init__(self, dry_run: bool = False):
+        self.dry_run = dry_run
+        self.added = []         # In the source but not installed yet
+        self.updated = []       # Installed, but the source changed since
+        self.removed = []       # Installed earlier, but no longer in the source
+        self.unchanged = 0      # Number of files that matched the manifest and were skipped
+        self.bytes_copied = 0   # Total size of the added and updated files
+
+    def __bool__(self):
+        return bool(self.added or self.updated or self.removed)
+
+    def __repr__(self):
+        return "SyncReport(added={}, updated={}, removed={}, unchanged={}, bytes_copied={}, dry_run={})".format(
+            len(self.added), len(self.updated), len(self.removed), self.unchanged, self.bytes_copied, self.dry_run)
+
+    def lines(self) -> list:
+        """Returns a readable line for every file, e.g. `+ icons/new.png`, `~ operators.py`, or `- old_module.py`."""
+        return ["+ " + path for path in self.added] + ["~ " + path for path in self.updated] \
+            + ["- " + path for path in self.removed]
+
+
+def load_manifest(target_folder: str) -> dict:
+    """Returns `{relative path: [size, mtime_ns, hex digest or '']}` for the installed folder. A missing or unreadable
+    manifest is empty, which makes the next sync compare against the installed files directly."""
+    try:
+        with open(os.path.join(target_folder, MANIFEST_FILE_NAME), "r", encoding="utf-8") as file:
+            contents = json.load(file)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(contents, dict) or contents.get("version") != MANIFEST_FORMAT_VERSION \
+            or not isinstance(contents.get("files"), dict):
+        return {}
+    return contents["files"]
+
+
+def save_manifest(target_folder: str, manifest: dict) -> None:
+    manifest_file = os.path.join(target_folder, MANIFEST_FILE_NAME)
+    with open(manifest_file + ".tmp", "w", encoding="utf-8") as file:
+        json.dump({"version": MANIFEST_FORMAT_VERSION, "files": manifest}, file, separators=(",", ":"))
+    os.replace(manifest_file + ".tmp", manifest_file)
+
+
+def _hash_file(file_path: str, size: int) -> str:
+    if size > MAX_HASHED_FILE_SIZE:
+        return ""
+    try:
+        return file_digest(file_path).hex()
+    except OSError:
+        return ""
+
+
+def _installed_matches(target_file: str, size: int, mtime_ns: int) -> bool:
+    # copy2 keeps the modified time, so an installed file with the same size and time is the same copy
+    try:
+        stat = os.stat(target_file)
+    except OSError:
+        return False
+    return stat.st_size == size and stat.st_mtime_ns == mtime_ns
+
+
+def _stale_files(source_folder: str, target_folder: str, source_files, path_filter) -> list:
+    """Returns the relative paths of the installed files that have no counterpart in `source_files`."""
+    stale = []
+    for target_file in take_snapshot(target_folder, path_filter):
+        relative_file = relative_path(target_file, target_folder)
+        if relative_file != MANIFEST_FILE_NAME \
+                and os.path.join(source_folder, *relative_file.split("/")) not in source_files:
+            stale.append(relative_file)
+    return stale
+
+
+def _remove_empty_folders(target_folder: str, relative_file: str) -> None:
+    folder = os.path.dirname(os.path.join(target_folder, relative_file))
+    while os.path.normcase(folder) != os.path.normcase(target_folder):
+        try:
+            os.rmdir(folder)
+        except OSError:
+            return  # Not empty
+        folder = os.path.dirname(folder)
+
+
+def sync_addon(source_folder: str, target_folder: str, dry_run: bool = False, verify_hash: bool = False,
+        path_filter=None, changed_paths=None) -> SyncReport:
+    """Copies the files of `source_folder` that differ from the installed copy in `target_folder`, removes the ones
+    deleted from the source, and returns a `SyncReport` of what was done.
+
+    `dry_run`: Only work out the report. Nothing is copied, removed, or written.
+
+    `verify_hash`: When only a file's modified time changed, compare its contents against the digest in the manifest
+        before copying it. The manifest then records a digest for every file it copies, which costs reading them once.
+
+    `path_filter`: The `PathFilter` for source files. The default skips version control folders, `__pycache__`, and
+        editor temporary files.
+
+    `changed_paths`: Absolute source paths that are known to be the only ones that changed, e.g. from the monitor's
+        `ChangeSet`. Only these are compared, instead of scanning the whole source folder. Ignored on the first sync
+        into a folder without a manifest, which always compares everything.
+    """
+    report = SyncReport(dry_run)
+    path_filter = path_filter if path_filter is not None else PathFilter()
+    manifest = load_manifest(target_folder)
+    first_sync = not manifest
+
+    if changed_paths is None or first_sync:
+        candidates = take_snapshot(source_folder, path_filter)
+        if first_sync:
+            removed = _stale_files(source_folder, target_folder, candidates, path_filter)
+        else:
+            removed = [path for path in manifest if os.path.join(source_folder, *path.split("/")) not in candidates]
+    else:
+        candidates = {}
+        removed = []
+        for file_path in changed_paths:
+            relative_file = relative_path(file_path, source_folder)
+            if not relative_file or not path_filter.includes_path(relative_file, False):
+                continue
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                if relative_file in manifest:
+                    removed.append(relative_file)
+                continue
+            candidates[file_path] = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    copies = []
+    manifest_changed = False
+    for file_path, (mtime_ns, size, _) in sorted(candidates.items()):
+        relative_file = relative_path(file_path, source_folder)
+        target_file = os.path.join(target_folder, *relative_file.split("/"))
+        entry = manifest.get(relative_file)
+
+        if entry is None:
+            if _installed_matches(target_file, size, mtime_ns):
+                # Copied before the manifest existed. Adopt it instead of copying it again.
+                manifest[relative_file] = [size, mtime_ns, ""]
+                manifest_changed = True
+                report.unchanged += 1
+                continue
+            report.added.append(relative_file)
+        elif entry[0] == size and entry[1] == mtime_ns and os.path.exists(target_file):
+            report.unchanged += 1
+            continue
+        elif verify_hash and entry[0] == size and entry[2] and os.path.exists(target_file) \
+                and _hash_file(file_path, size) == entry[2]:
+            # Touched, but the same bytes. Only the manifest needs to learn the new time.
+            manifest[relative_file] = [size, mtime_ns, entry[2]]
+            manifest_changed = True
+            report.unchanged += 1
+            continue
+        else:
+            report.updated.append(relative_file)
+        copies.append((file_path, target_file, relative_file, size, mtime_ns))
+        report.bytes_copied += size
+    report.removed = sorted(removed)
+
+    if dry_run:
+        return report
+
+    for file_path, target_file, relative_file, size, mtime_ns in copies:
+        os.makedirs(os.path.dirname(target_file), exist_ok=True)
+        shutil.copy2(file_path, target_file)
+        manifest[relative_file] = [size, mtime_ns, _hash_file(file_path, size) if verify_hash else ""]
+    for relative_file in report.removed:
+        try:
+            os.remove(os.path.join(target_folder, *relative_file.split("/")))
+        except OSError:
+            pass
+        manifest.pop(relative_file, None)
+        _remove_empty_folders(target_folder, relative_file)
+
+    if report or manifest_changed:
+        os.makedirs(target_folder, exist_ok=True)
+        save_manifest(target_folder, manifest)
+    return report
@@ -0,0 +1,325 @@
+"""
+Compact Snapshot
+
+A memory efficient stand in for the `{path: (mtime_ns, size, inode)}` dictionaries that `take_snapshot` returns. The
+monitor keeps a snapshot alive for as long as Blender runs, and on large add-on trees full of assets the dictionary
+form costs several hundred bytes per file: a full path string, a tuple, and three integer objects each.
+
+`CompactSnapshot` stores the tree as a trie of folders instead. Each folder holds the names of its files (interned, so
+consecutive snapshots share them) and three `array` columns for the stat values, so a file costs its name plus 24
+bytes. Comparing two compact snapshots checks whole folders at once, which skips unchanged folders at C speed. A folder
+whose files are looked up one by one, as event backends do, also gets a table of name to position on first use, so each
+lookup stays constant time however many files the folder holds.
+
+It behaves like a regular mutable mapping of full paths, so everything that accepts a snapshot dictionary also accepts
+a `CompactSnapshot`.
+"""
+
+from array import array
+import collections.abc
+import os
+import sys
+import time
+import tracemalloc
+
+from .directory_snapshot import ChangeSet, _scan_one_folder, diff_snapshots, take_snapshot
+
+
+class _Folder(object):
+    __slots__ = ("folders", "names", "mtimes", "sizes", "inodes", "_indexes")
+
+    def __init__(self):
+        self.folders = {}           # Subfolder name -> _Folder
+        self.names = []             # File names, in the same order as the columns
+        self.mtimes = array("q")
+        self.sizes = array("q")
+        self.inodes = array("Q")
+        self._indexes = None        # File name -> position, built by the first `index()` call
+
+    def append(self, name: str, signature: tuple) -> None:
+        if self._indexes is not None:
+            self._indexes[name] = len(self.names)
+        self.names.append(sys.intern(name))
+        self.mtimes.append(signature[0])
+        self.sizes.append(signature[1])
+        self.inodes.append(signature[2])
+
+    def index(self, name: str) -> int:
+        """Returns the position of the file `name`, or -1 if there is none."""
+        indexes = self._indexes
+        if indexes is None:
+            indexes = self._indexes = {file_name: index for index, file_name in enumerate(self.names)}
+        return indexes.get(name, -1)
+
+    def remove(self, index: int) -> None:
+        # The last file moves into the gap, so no other position changes
+        name = self.names[index]
+        last = len(self.names) - 1
+        if index != last:
+            self.names[index] = self.names[last]
+            self.mtimes[index] = self.mtimes[last]
+            self.sizes[index] = self.sizes[last]
+            self.inodes[index] = self.inodes[last]
+            if self._indexes is not None:
+                self._indexes[self.names[index]] = index
+        self.names.pop()
+        self.mtimes.pop()
+        self.sizes.pop()
+        self.inodes.pop()
+        if self._indexes is not None:
+            del self._indexes[name]
+
+    def signature(self, index: int) -> tuple:
+        return (self.mtimes[index], self.sizes[index], self.inodes[index])
+
+    def same_files(self, other) -> bool:
+        # Four comparisons done in C, instead of one comparison per file
+        return self.names == other.names and self.mtimes == other.mtimes and self.sizes == other.sizes \
+            and self.inodes == other.inodes
+
+
+class CompactSnapshot(collections.abc.MutableMapping):
+    """A snapshot of the files below `root`, stored as a folder trie with array columns.
+
+    Paths outside `root` are accepted too, but are kept in an ordinary dictionary.
+    """
+
+    __slots__ = ("root", "_prefix", "_tree", "_count", "_outside")
+
+    def __init__(self, root: str, snapshot=None):
+        self.root = root
+        self._prefix = os.path.join(root, "")
+        self._tree = _Folder()
+        self._count = 0
+        self._outside = {}
+        if snapshot:
+            self.update(snapshot)
+
+    def _parts(self, path: str):
+        if not path.startswith(self._prefix) or len(path) == len(self._prefix):
+            return None
+        return path[len(self._prefix):].split(os.sep)
+
+    def _folder(self, folder_parts, create: bool = False):
+        folder = self._tree
+        for name in folder_parts:
+            subfolder = folder.folders.get(name)
+            if subfolder is None:
+                if not create:
+                    return None
+                subfolder = folder.folders[sys.intern(name)] = _Folder()
+            folder = subfolder
+        return folder
+
+    def _locate(self, path: str):
+        # Returns (folder, index of the file in it), or (None, -1) if the path is not tracked
+        parts = self._parts(path)
+        if parts is None:
+            return None, -1
+        folder = self._folder(parts[:-1])
+        if folder is None:
+            return None, -1
+        index = folder.index(parts[-1])
+        return (folder, index) if index >= 0 else (None, -1)
+
+    def __getitem__(self, path: str) -> tuple:
+        if path in self._outside:
+            return self._outside[path]
+        folder, index = self._locate(path)
+        if folder is None:
+            raise KeyError(path)
+        return folder.signature(index)
+
+    def __setitem__(self, path: str, signature: tuple) -> None:
+        parts = self._parts(path)
+        if parts is None:
+            if path not in self._outside:
+                self._count += 1
+            self._outside[path] = signature
+            return
+
+        folder = self._folder(parts[:-1], create=True)
+        index = folder.index(parts[-1])
+        if index < 0:
+            folder.append(parts[-1], signature)
+            self._count += 1
+            return
+        folder.mtimes[index], folder.sizes[index], folder.inodes[index] = signature
+
+    def __delitem__(self, path: str) -> None:
+        if path in self._outside:
+            del self._outside[path]
+            self._count -= 1
+            return
+
+        folder, index = self._locate(path)
+        if folder is None:
+            raise KeyError(path)
+        folder.remove(index)
+        self._count -= 1
+
+    def __contains__(self, path) -> bool:
+        return path in self._outside or self._locate(path)[0] is not None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self):
+        for path, _ in self._iter_items():
+            yield path
+
+    def _iter_items(self):
+        pending_folders = [(self._tree, self._prefix)]
+        while pending_folders:
+            folder, folder_prefix = pending_folders.pop()
+            for index, name in enumerate(folder.names):
+                yield folder_prefix + name, folder.signature(index)
+            for name, subfolder in folder.folders.items():
+                pending_folders.append((subfolder, folder_prefix + name + os.sep))
+        yield from self._outside.items()
+
+    def items(self):
+        # Walks the trie once, instead of looking every path up again
+        return list(self._iter_items())
+
+    def add_folder(self, folder_path: str, files: dict) -> None:
+        """Adds the files found directly in one folder, as returned by a folder scan. Faster than adding them one at a
+        time, since the folder is only looked up once."""
+        parts = self._parts(os.path.join(folder_path, "x"))
+        if parts is None:
+            self.update(files)
+            return
+        folder = self._folder(parts[:-1], create=True)
+        name_start = len(folder_path) + len(os.sep)
+        for path, signature in files.items():
+            folder.append(path[name_start:], signature)
+        self._count += len(files)
+
+
+def take_compact_snapshot(file_or_folder_path: str, path_filter=None, stop=None) -> CompactSnapshot:
+    """Same as `take_snapshot`, but builds a `CompactSnapshot` folder by folder without a full dictionary in between.
+    Also returns None if `stop` gets set part way through."""
+    if os.path.isfile(file_or_folder_path):
+        return CompactSnapshot(os.path.dirname(file_or_folder_path), take_snapshot(file_or_folder_path))
+
+    snapshot = CompactSnapshot(file_or_folder_path)
+    pending_folders = [(file_or_folder_path, "")]
+    while pending_folders:
+        if stop is not None and stop.is_set():
+            return None
+        folder, relative_folder = pending_folders.pop()
+        files = {}
+        _scan_one_folder(folder, relative_folder, files, pending_folders, path_filter)
+        if files:
+            snapshot.add_folder(folder, files)
+    return snapshot
+
+
+def _add_all(folder: _Folder, folder_prefix: str, changed: dict) -> None:
+    # Records every file below `folder` in `changed`
+    pending_folders = [(folder, folder_prefix)]
+    while pending_folders:
+        folder, folder_prefix = pending_folders.pop()
+        for index, name in enumerate(folder.names):
+            changed[folder_prefix + name] = folder.signature(index)
+        for name, subfolder in folder.folders.items():
+            pending_folders.append((subfolder, folder_prefix + name + os.sep))
+
+
+def diff_compact(old_snapshot, new_snapshot) -> ChangeSet:
+    """Returns the `ChangeSet` between two snapshots, like `diff_snapshots`.
+
+    When both are `CompactSnapshot`s of the same root, folders are compared a whole folder at a time. Anything else
+    falls back to `diff_snapshots`.
+    """
+    if not isinstance(old_snapshot, CompactSnapshot) or not isinstance(new_snapshot, CompactSnapshot) \
+            or old_snapshot.root != new_snapshot.root:
+        return diff_snapshots(old_snapshot, new_snapshot)
+
+    changes = ChangeSet()
+    pending_folders = [(old_snapshot._tree, new_snapshot._tree, new_snapshot._prefix)]
+    while pending_folders:
+        old_folder, new_folder, folder_prefix = pending_folders.pop()
+
+        if not old_folder.same_files(new_folder):
+            if old_folder.names == new_folder.names:
+                for index, name in enumerate(new_folder.names):
+                    signature = new_folder.signature(index)
+                    if signature != old_folder.signature(index):
+                        changes.modified[folder_prefix + name] = signature
+            else:
+                old_indexes = {name: index for index, name in enumerate(old_folder.names)}
+                for index, name in enumerate(new_folder.names):
+                    signature = new_folder.signature(index)
+                    old_index = old_indexes.pop(name, None)
+                    if old_index is None:
+                        changes.added[folder_prefix + name] = signature
+                    elif old_folder.signature(old_index) != signature:
+                        changes.modified[folder_prefix + name] = signature
+                for name, old_index in old_indexes.items():
+                    changes.deleted[folder_prefix + name] = old_folder.signature(old_index)
+
+        for name, new_subfolder in new_folder.folders.items():
+            old_subfolder = old_folder.folders.get(name)
+            if old_subfolder is None:
+                _add_all(new_subfolder, folder_prefix + name + os.sep, changes.added)
+            else:
+                pending_folders.append((old_subfolder, new_subfolder, folder_prefix + name + os.sep))
+        for name, old_subfolder in old_folder.folders.items():
+            if name not in new_folder.folders:
+                _add_all(old_subfolder, folder_prefix + name + os.sep, changes.deleted)
+
+    if old_snapshot._outside or new_snapshot._outside:
+        outside_changes = diff_snapshots(old_snapshot._outside, new_snapshot._outside)
+        changes.added.update(outside_changes.added)
+        changes.modified.update(outside_changes.modified)
+        changes.deleted.update(outside_changes.deleted)
+
+    changes.detect_moves()
+    return changes
+
+
+def benchmark_snapshot(file_or_folder_path: str, path_filter=None, repeat: int = 3) -> dict:
+    """Measures both snapshot forms on a real tree. Returns the number of files, the memory per tracked file in bytes,
+    and the best time in seconds to take and to compare two snapshots, for the dictionary and compact forms.
+
+    For example, from Blender's Python console:
+        from <add-on module>.compact_snapshot import benchmark_snapshot
+        benchmark_snapshot("/path/to/addon")
+    """
+    def measure(take, diff):
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        snapshot = take()
+        size = tracemalloc.get_traced_memory()[0] - before
+        if not tracing:
+            tracemalloc.stop()
+
+        take_times = []
+        diff_times = []
+        for _ in range(max(repeat, 1)):
+            start = time.perf_counter()
+            new_snapshot = take()
+            take_times.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            diff(snapshot, new_snapshot)
+            diff_times.append(time.perf_counter() - start)
+        return snapshot, size, min(take_times), min(diff_times)
+
+    dict_snapshot, dict_bytes, dict_take, dict_diff = measure(
+        lambda: take_snapshot(file_or_folder_path, path_filter), diff_snapshots)
+    _, compact_bytes, compact_take, compact_diff = measure(
+        lambda: take_compact_snapshot(file_or_folder_path, path_filter), diff_compact)
+
+    files = max(len(dict_snapshot), 1)
+    return {
+        "files": len(dict_snapshot),
+        "dict_bytes_per_file": dict_bytes / files,
+        "compact_bytes_per_file": compact_bytes / files,
+        "dict_take_seconds": dict_take,
+        "compact_take_seconds": compact_take,
+        "dict_diff_seconds": dict_diff,
+        "compact_diff_seconds": compact_diff,
+    }
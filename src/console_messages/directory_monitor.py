@@ -47,13 +47,43 @@ class DirectoryMonitorMessages:
             del_msg += " deleted file."
         print(del_msg)
 
+    def found_added_file(filepath):
+        print("DirectoryMonitor found an added file: " + color.OKGREEN +  filepath + color.ENDC)
+
     def found_updated_file(filepath):
         print("DirectoryMonitor found an updated file: " + color.OKGREEN +  filepath + color.ENDC)
     
+    def found_moved_file(old_path, new_path):
+        print("DirectoryMonitor found a moved file: " + color.OKGREEN + old_path + color.ENDC + " -> " + color.OKGREEN
+            + new_path + color.ENDC)
+
+    def skipped_unchanged_files(num_files):
+        skip_msg = "DirectoryMonitor ignored " + color.OKGREEN + str(num_files) + color.ENDC
+        if num_files > 1:
+            skip_msg += " files that were saved without changing their contents."
+        else:
+            skip_msg += " file that was saved without changing its contents."
+        print(skip_msg)
+
     def unable_to_unsubscribe(script):
         print(DirectoryMonitorMessages._ErrorHeader() + "Unable to unsubscribe '" + color.WARNING + script + color.ENDC 
             + "'. This script was never registered.")
     
+    def subscriber_failed(script, error):
+        print(DirectoryMonitorMessages._ErrorHeader() + "The subscriber '" + color.WARNING + str(script) + color.ENDC
+            + "' raised an error. The other subscribers still ran.")
+        print(error)
+
+    def invalid_priority(script, priority):
+        print(DirectoryMonitorMessages._ErrorHeader() + "Unable to subscribe '" + color.WARNING + str(script)
+            + color.ENDC + "'. The priority must be a whole number. You tried: " + color.WARNING + str(priority)
+            + color.ENDC)
+
+    def invalid_subscriber_threads(threads, current_threads):
+        print(DirectoryMonitorMessages._ErrorHeader() + "'DirectoryMonitor.subscriber_threads' must be a whole number"
+            + " of at least 1. Maintaining the subscriber threads at: " + color.OKGREEN + str(current_threads)
+            + color.ENDC + ".")
+
     def unable_to_change_directory(new_dir, current_dir):
         print(DirectoryMonitorMessages._ErrorHeader()
             + "'DirectoryMonitor.directory' must be a file or folder that exists.")
@@ -62,4 +92,85 @@ class DirectoryMonitorMessages:
     
     def invalid_polling_delay(delay):
         print(DirectoryMonitorMessages._ErrorHeader() + "'DirectoryMonitor.polling_delay' must be a number greater than"
-            + " 0. Maintaining polling interval at : " + color.OKGREEN + str(delay) + color.ENDC + " seconds.")
\ No newline at end of file
+            + " 0. Maintaining polling interval at : " + color.OKGREEN + str(delay) + color.ENDC + " seconds.")
+
+    def invalid_max_polling_delay(delay):
+        print(DirectoryMonitorMessages._ErrorHeader() + "'DirectoryMonitor.max_polling_delay' must be a number greater"
+            + " than 0. Maintaining the maximum polling interval at: " + color.OKGREEN + str(delay) + color.ENDC
+            + " seconds.")
+
+    def invalid_backoff_factor(factor):
+        print(DirectoryMonitorMessages._ErrorHeader() + "'DirectoryMonitor.backoff_factor' must be a number of at least"
+            + " 1. Maintaining the backoff factor at: " + color.OKGREEN + str(factor) + color.ENDC + ".")
+
+    def invalid_backoff_idle_time(idle_time):
+        print(DirectoryMonitorMessages._ErrorHeader() + "'DirectoryMonitor.backoff_idle_time' must be a number of"
+            + " seconds (0 or greater). Maintaining the idle time at: " + color.OKGREEN + str(idle_time) + color.ENDC
+            + " seconds.")
+
+    def invalid_verify_content(verify):
+        print(DirectoryMonitorMessages._ErrorHeader() + "'DirectoryMonitor.verify_content' must be True or False."
+            + " You tried: " + color.WARNING + str(verify) + color.ENDC)
+
+    def invalid_compact_snapshot(compact):
+        print(DirectoryMonitorMessages._ErrorHeader() + "'DirectoryMonitor.compact_snapshot' must be True or False."
+            + " You tried: " + color.WARNING + str(compact) + color.ENDC)
+
+    def invalid_import_reachable(reachable):
+        print(DirectoryMonitorMessages._ErrorHeader() + "'DirectoryMonitor.import_reachable' must be True or False."
+            + " You tried: " + color.WARNING + str(reachable) + color.ENDC)
+
+    def import_graph_changed(num_modules):
+        print("DirectoryMonitor found changed imports. Now tracking " + color.OKGREEN + str(num_modules) + color.ENDC
+            + " reachable modules.")
+
+    def invalid_debounce_delay(delay):
+        print(DirectoryMonitorMessages._ErrorHeader() + "'DirectoryMonitor.debounce_delay' must be a number of seconds"
+            + " (0 or greater). Maintaining the debounce delay at: " + color.OKGREEN + str(delay) + color.ENDC
+            + " seconds.")
+
+    def invalid_max_debounce_latency(latency):
+        print(DirectoryMonitorMessages._ErrorHeader() + "'DirectoryMonitor.max_debounce_latency' must be a number"
+            + " greater than 0. Maintaining the maximum latency at: " + color.OKGREEN + str(latency) + color.ENDC
+            + " seconds.")
+
+    def invalid_backend(backend, current_backend):
+        print(DirectoryMonitorMessages._ErrorHeader() + "'DirectoryMonitor.backend' must be 'auto', 'polling', or the"
+            + " name of an event backend. You tried: " + color.WARNING + str(backend) + color.ENDC
+            + ". Maintaining the backend as: " + color.OKGREEN + str(current_backend) + color.ENDC + ".")
+
+    def backend_started(backend):
+        print("DirectoryMonitor is using the " + color.OKGREEN + backend + color.ENDC + " backend.")
+
+    def backend_fallback(reason):
+        print(color.WARNING + "DirectoryMonitor cannot use an event backend: " + color.ENDC + reason
+            + " Falling back to polling.")
+
+    def invalid_patterns(property_name, patterns):
+        print(DirectoryMonitorMessages._ErrorHeader() + "'DirectoryMonitor." + property_name + "' must be a list of"
+            + " glob pattern strings. Unable to use: " + color.WARNING + str(patterns) + color.ENDC)
+
+    def invalid_scan_setting(property_name, value, current_value):
+        print(DirectoryMonitorMessages._ErrorHeader() + "'DirectoryMonitor." + property_name + "' must be a whole"
+            + " number of at least 1. You tried: " + color.WARNING + str(value) + color.ENDC + ". Maintaining it at: "
+            + color.OKGREEN + str(current_value) + color.ENDC + ".")
+
+    def invalid_scan_budget(property_name, value, current_value):
+        print(DirectoryMonitorMessages._ErrorHeader() + "'DirectoryMonitor." + property_name + "' must be a whole"
+            + " number (0 for no limit). You tried: " + color.WARNING + str(value) + color.ENDC + ". Maintaining it"
+            + " at: " + color.OKGREEN + str(current_value) + color.ENDC + ".")
+
+    def invalid_cache_file(cache_file):
+        print(DirectoryMonitorMessages._ErrorHeader() + "'DirectoryMonitor.cache_file' must be in a folder that exists,"
+            + " or an empty string to turn it off. You tried: " + color.WARNING + str(cache_file) + color.ENDC)
+
+    def loaded_snapshot_cache(num_files):
+        print("DirectoryMonitor restored the last session's snapshot of " + color.OKGREEN + str(num_files)
+            + color.ENDC + " files. Only changes made since then will be reported.")
+
+    def unable_to_save_snapshot_cache(cache_file):
+        print(color.WARNING + "DirectoryMonitor could not save its snapshot cache to: " + color.ENDC + str(cache_file))
+
+    def invalid_ignore_file(ignore_file):
+        print(DirectoryMonitorMessages._ErrorHeader() + "'DirectoryMonitor.ignore_file' must be a file that exists,"
+            + " or an empty string to turn it off. You tried: " + color.WARNING + str(ignore_file) + color.ENDC)
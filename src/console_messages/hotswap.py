@@ -4,6 +4,8 @@ This module provides defines all the console output messages for the hotswap mod
 This makes the code in src/hotswap.py easier to read and maintain. 
 """
 
+import os
+
 from .color_control import color
 
 class HotswapMessages:
@@ -16,6 +18,49 @@ class HotswapMessages:
     def hotswap_successful():
         print(color.OKGREEN + "Hotswap successfully completed." + color.ENDC)
 
+    def partial_hotswap_successful(num_modules):
+        print(color.OKGREEN + "Hotswap reloaded " + str(num_modules) + " changed or dependent modules." + color.ENDC)
+
+    def partial_hotswap_fallback():
+        print("The change touches __init__.py, registration code, or data files. Reloading the whole add-on.")
+
+    def synced_addon_files(report):
+        print("Synced the add-on: " + str(len(report.added)) + " added, " + str(len(report.updated)) + " updated, "
+            + str(len(report.removed)) + " removed, " + str(report.unchanged) + " unchanged.")
+
+    def sync_preview(report, installed_path):
+        print("The next hot swap into " + color.OKGREEN + str(installed_path) + color.ENDC + " would copy "
+            + str(len(report.added) + len(report.updated)) + " files (" + str(report.bytes_copied) + " bytes) and remove "
+            + str(len(report.removed)) + ". " + str(report.unchanged) + " files are already up to date.")
+        for line in report.lines():
+            print("    " + line)
+
+    def sync_preview_needs_package():
+        print(HotswapMessages._ErrorHeader() + "Only a package add-on (a folder with an __init__.py) is synced file by"
+            + " file. A single file add-on is always copied whole.")
+
+    def preflight_failed(compile_errors):
+        print(HotswapMessages._ErrorHeader() + "The changes do not compile. Keeping the add-on that is already loaded.")
+        for error in compile_errors:
+            print("    " + color.WARNING + str(error.file_path) + ":" + str(error.line) + ":" + str(error.column)
+                + color.ENDC + " " + str(error.message))
+            if error.text:
+                print("        " + error.text.strip())
+
+    def over_latency_budget(profile, budget):
+        latency = profile.save_to_live if profile.save_to_live is not None else profile.total
+        print(color.WARNING + "Hotswap took " + format(latency, ".2f") + " seconds from save to live, over the "
+            + format(budget, ".2f") + " second budget." + color.ENDC + " Slowest phase: " + profile.slowest_phase()
+            + " (" + format(profile.phases.get(profile.slowest_phase(), 0), ".2f") + " seconds).")
+
+    def workspace_must_be_folder():
+        print(HotswapMessages._ErrorHeader() + "Workspace mode needs a folder as the monitor path, with the add-ons"
+            + " somewhere inside it.")
+
+    def workspace_hot_swap(addon_paths):
+        print("Hotswapping " + str(len(addon_paths)) + " add-on" + ("s" if len(addon_paths) != 1 else "")
+            + " from the workspace: " + ", ".join(os.path.basename(path) for path in addon_paths) + ".")
+
     def monitor_path_cannot_be_empty():
         print(HotswapMessages._ErrorHeader() + "Cannot hotswap when the monitor path is empty."
             + " Please set a valid path.")
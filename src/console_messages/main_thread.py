@@ -0,0 +1,25 @@
+""" Output messages to the console for the main thread queue.
+
+This module provides defines all the console output messages for the main_thread module.
+This makes the code in src/main_thread.py easier to read and maintain.
+"""
+
+from .color_control import color
+
+class MainThreadMessages:
+    """Consolidates and prints formatted console messages for the main_thread module."""
+
+    @staticmethod
+    def _ErrorHeader():
+        return str(color.FAIL + "Main thread queue error: " + color.ENDC)
+
+    def jobs_deferred(keys, reason):
+        print(color.WARNING + "Blender is busy (" + reason + ")." + color.ENDC + " Waiting to run: " + ", ".join(keys)
+            + ".")
+
+    def job_waited(key, wait, coalesced):
+        print(str(key) + " waited " + format(wait, ".2f") + " seconds for Blender's main thread"
+            + (" (" + str(coalesced) + " repeated requests combined)." if coalesced else "."))
+
+    def job_failed(key):
+        print(MainThreadMessages._ErrorHeader() + str(key) + " raised an exception:")
@@ -0,0 +1,123 @@
+"""
+Content Hash
+
+Optional second opinion for the DirectoryMonitor. A file whose modified time or size changed is hashed, and if the
+bytes are identical to what was there before (a `touch`, a branch switch back to the same content, an editor saving
+an unchanged buffer) the change is dropped so it never triggers a hot swap.
+
+Digests are cached against the stat signature they were computed for, so a file is only ever read again after its
+stat signature changes.
+"""
+
+import hashlib
+import os
+import queue
+import threading
+
+from .directory_snapshot import ChangeSet, stat_signature
+
+# Files larger than this are never hashed. Reading them would cost more than the hot swap they might prevent, so any
+#   stat change to them always counts as a real change.
+MAX_HASHED_FILE_SIZE = 32 * 1024 * 1024     # Bytes
+
+_READ_CHUNK_SIZE = 1024 * 1024
+
+
+def file_digest(file_path: str) -> bytes:
+    """Returns a BLAKE2b digest of the file's contents."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(_READ_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+
+class ContentHashCache(object):
+    """Caches file digests keyed by stat signature, and removes unchanged files from a `ChangeSet`."""
+
+    def __init__(self):
+        self._digests = {}      # File path -> (stat signature, digest)
+        self._prime_queue = queue.Queue()
+        self._prime_thread = None
+        self._prime_lock = threading.Lock()
+
+    def clear(self) -> None:
+        self._digests.clear()
+
+    def digest(self, file_path: str, signature: tuple):
+        """Returns the digest of `file_path` for the given stat signature, or None if it cannot be hashed.
+
+        A cached digest is reused when the signature matches. Otherwise the file is read, and the result is cached only
+        if the file did not change while it was being read.
+        """
+        cached = self._digests.get(file_path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+
+        if signature[1] > MAX_HASHED_FILE_SIZE:
+            self._digests.pop(file_path, None)
+            return None
+
+        try:
+            digest = file_digest(file_path)
+            unchanged = stat_signature(os.stat(file_path)) == signature
+        except OSError:
+            return None
+
+        if unchanged:
+            self._digests[file_path] = (signature, digest)
+        return digest
+
+    def prime(self, files: dict) -> None:
+        """Hashes every file in `files` (path -> stat signature) on a background thread, so later modifications have
+        something to compare against. Files that change before they are reached are hashed when they show up as
+        modified instead."""
+        with self._prime_lock:
+            self._prime_queue.put(list(files.items()))
+            if self._prime_thread is None:
+                self._prime_thread = threading.Thread(target=self._prime_files, name="DirectoryMonitor-content-hash",
+                    daemon=True)
+                self._prime_thread.start()
+
+    def _prime_files(self) -> None:
+        while True:
+            with self._prime_lock:
+                try:
+                    files = self._prime_queue.get_nowait()
+                except queue.Empty:
+                    self._prime_thread = None   # Nothing left to do. 'prime()' starts a new thread when needed.
+                    return
+
+            for file_path, signature in files:
+                self.digest(file_path, signature)
+
+    def filter_changes(self, changes: ChangeSet) -> tuple:
+        """Returns `(changes_with_different_content, number_of_files_dropped)`.
+
+        Modified files whose new digest matches the digest cached for their previous signature are dropped. Added
+        files are hashed in the background so that their next modification can be verified. Deleted files are
+        forgotten, and moved files keep their digest under the new path.
+        """
+        verified = ChangeSet(dict(changes.added), {}, dict(changes.deleted), dict(changes.moved))
+        dropped = 0
+
+        for file_path in changes.deleted:
+            self._digests.pop(file_path, None)
+
+        for old_path, (new_path, _) in changes.moved.items():
+            cached = self._digests.pop(old_path, None)
+            if cached is not None:
+                self._digests[new_path] = cached
+
+        if changes.added:
+            self.prime(changes.added)
+
+        for file_path, signature in changes.modified.items():
+            cached = self._digests.get(file_path)
+            new_digest = self.digest(file_path, signature)
+            if cached is not None and new_digest is not None and cached[1] == new_digest:
+                dropped += 1
+                continue
+            verified.modified[file_path] = signature
+
+        return verified, dropped
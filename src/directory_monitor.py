@@ -7,33 +7,90 @@ Watches a specified file or folder for changes. Will run subscribed scripts if c
 from collections import defaultdict
 import os
 import threading
+import time
 
 from .console_messages.directory_monitor import DirectoryMonitorMessages as message
+from .compact_snapshot import CompactSnapshot, diff_compact, take_compact_snapshot
+from .content_hash import ContentHashCache
+from .directory_snapshot import (ChangeSet, IncrementalScan, diff_snapshots, relative_path, take_snapshot,
+    update_snapshot)
+from .import_graph import ImportGraph, ReachableFilter
+from .path_filter import DEFAULT_EXCLUDE_PATTERNS, PathFilter
+from .snapshot_cache import load_snapshot, save_snapshot
+from .monitor_backends import BACKENDS, BackendUnavailable, create_event_backend, supported_backends
+from .monitor_scheduler import scheduler
+from .subscribers import SubscriberExecutor, Subscription
 
 class DirectoryMonitor(object):
     """This class monitors a specified file or folder for any changes.
 
-    Only one instance of this class can exist.
+    Any number of instances can exist, each with its own directory, filters, and subscribers. Polling for all of them
+    runs on the one shared scheduler thread in `monitor_scheduler`, so watching more folders does not add threads.
 
     The class uses properties for data validation. Accessing the private self._ values directly could cause
     instabilities."""
 
-    def __init__(self):
+    def __init__(self, directory: str = ""):
         """The class uses properties for data validation. Accessing the private self._ values directly could cause
             instabilities."""
-        self._polling_delay = .15       # Seconds
+        self._polling_delay = .15       # Seconds. The fastest polling interval, used right after any activity.
+        self._max_polling_delay = 2     # Seconds. Idle polling slows down until it reaches this interval.
+        self._backoff_factor = 1.5      # Each idle poll multiplies the interval by this much, up to the maximum
+        self._backoff_idle_time = 5     # Seconds without changes before polling starts to slow down
+        self._current_polling_delay = self._polling_delay
+        self._last_activity = 0         # time.monotonic() of the last detected change or reset_backoff() call
+        self._poll_in_progress = False
+        self._wake_requested = False    # wake() was called during a poll, so the next one starts right away
+        self._schedule_lock = threading.Lock()
         self._directory = ""            # Can be a file or folder
-        self._last_tracked_update = 0   # Comparison for file modified times
-        self._last_tracked_filecount = 0    # Comparison to check for deleted files
+        self._stopped = threading.Event()   # Set while secured. Polls and scans stop as soon as they see it.
+        self._stopped.set()
+        self._last_tracked_update = 0   # time.time() of the last completed scan
+        self._snapshot = {}             # Stat signature of every tracked file, compared against on each scan
+        self._snapshot_lock = threading.Lock()  # Full scans and event updates can come from different threads
+        self._full_scans = 0            # Full scans running right now, outside of '_snapshot_lock'
+        self._paths_changed_during_scan = set()     # Paths event updates checked while a full scan was running
+        self._compact_snapshot = False  # Keep the snapshot as a CompactSnapshot trie instead of a dictionary
+        self._last_change_set = None    # The most recent set of changes that ran the subscribers
+        self._backend_name = "auto"     # 'auto', 'polling', or the name of an event backend
+        self._backend = None            # The running event backend. None while polling.
+        self._include_patterns = ()     # Glob rules a file must match to be tracked. Empty tracks every file.
+        self._exclude_patterns = DEFAULT_EXCLUDE_PATTERNS   # Glob rules for files and folders that are never scanned
+        self._ignore_file = ""          # Optional '.gitignore' style file with more exclude rules
+        self._path_filter = PathFilter(self._include_patterns, self._exclude_patterns, self._ignore_file)
+        self._import_reachable = False  # Only track the modules a package's __init__.py imports, plus data files
+        self._data_patterns = ()        # Glob rules for data files tracked alongside the reachable modules
+        self._import_graph = None       # The package's ImportGraph while 'import_reachable' is on
 
-        self._poll_timer = threading.Timer(self.polling_delay, self._poll)
+        self._scan_workers = 1          # Threads listing folders during a full scan. 1 scans serially.
+        self._scan_queue_depth = 64     # Most folders queued for the scan threads at once
+        self._scan_budget_entries = 0   # Most directory entries a poll may scan before pausing. 0 is no limit.
+        self._scan_budget_time = 0      # Microseconds a poll may scan before pausing. 0 is no limit.
+        self._incremental_scan = None   # The budgeted sweep in progress, continued by each poll until complete
+        self._sweep_time = 0            # Seconds the last complete scan took, pauses between slices included
+
+        self._cache_file = ""           # Where the snapshot is saved between sessions. Empty turns the cache off.
+        self._cache_loaded = False      # The cache is only read by the first watch() of a session
+        self._cache_save_delay = 5      # Seconds. Changes are written to the cache at most this often.
+        self._cache_save_call = None
+
+        self._verify_content = False    # Hash modified files and ignore the ones whose bytes did not change
+        self._content_hashes = ContentHashCache()
+
+        self._debounce_delay = 0        # Seconds without changes before the subscribers run. 0 runs them right away.
+        self._max_debounce_latency = 2  # Seconds. A constant stream of changes still runs the subscribers this often.
+        self._pending_changes = None    # Changes merged together while waiting for the debounce delay to pass
+        self._pending_since = 0         # time.monotonic() of the first pending change
+        self._pending_lock = threading.Lock()
+        self._debounce_call = None      # Scheduled flush of the pending changes
+
+        self._poll_call = None          # The next scheduled poll. None until polling starts.
         self._subscribers = defaultdict(list)
-        
-    def __new__(cls):
-        # This class uses a singleton pattern to ensure only one timer exists.
-        if not hasattr(cls, 'instance'):
-            cls.instance = super(DirectoryMonitor, cls).__new__(cls)
-        return cls.instance
+        self._subscriber_threads = 4    # Thread pool size for subscribers registered as thread safe
+        self._executor = SubscriberExecutor(message.subscriber_failed, self._subscriber_threads)
+
+        if directory != "":
+            self.directory = directory
 
     def get_polling_delay(self):
         return self._polling_delay
@@ -51,9 +108,136 @@ class DirectoryMonitor(object):
             return
         
         self._polling_delay = check_polling_delay
+        self._current_polling_delay = check_polling_delay
+
+    def get_max_polling_delay(self):
+        return self._max_polling_delay
+
+    def set_max_polling_delay(self, new_delay: float):
+        try:
+            check_max_delay = float(new_delay)
+        except:
+            message.invalid_max_polling_delay(self.max_polling_delay)
+            return
+
+        if check_max_delay <= 0:
+            message.invalid_max_polling_delay(self.max_polling_delay)
+            return
+
+        self._max_polling_delay = check_max_delay
+
+    def get_backoff_factor(self):
+        return self._backoff_factor
+
+    def set_backoff_factor(self, new_factor: float):
+        # A factor of 1 turns the backoff off and always polls at 'polling_delay'
+        try:
+            check_factor = float(new_factor)
+        except:
+            message.invalid_backoff_factor(self.backoff_factor)
+            return
+
+        if check_factor < 1:
+            message.invalid_backoff_factor(self.backoff_factor)
+            return
+
+        self._backoff_factor = check_factor
+
+    def get_backoff_idle_time(self):
+        return self._backoff_idle_time
+
+    def set_backoff_idle_time(self, new_time: float):
+        try:
+            check_idle_time = float(new_time)
+        except:
+            message.invalid_backoff_idle_time(self.backoff_idle_time)
+            return
+
+        if check_idle_time < 0:
+            message.invalid_backoff_idle_time(self.backoff_idle_time)
+            return
+
+        self._backoff_idle_time = check_idle_time
+
+    def get_current_polling_delay(self):
+        return self._current_polling_delay
+
+    def get_debounce_delay(self):
+        return self._debounce_delay
+
+    def set_debounce_delay(self, new_delay: float):
+        try:
+            check_debounce_delay = float(new_delay)
+        except:
+            message.invalid_debounce_delay(self.debounce_delay)
+            return
+
+        if check_debounce_delay < 0:
+            message.invalid_debounce_delay(self.debounce_delay)
+            return
+
+        self._debounce_delay = check_debounce_delay
+
+    def get_max_debounce_latency(self):
+        return self._max_debounce_latency
+
+    def set_max_debounce_latency(self, new_latency: float):
+        try:
+            check_latency = float(new_latency)
+        except:
+            message.invalid_max_debounce_latency(self.max_debounce_latency)
+            return
+
+        if check_latency <= 0:
+            message.invalid_max_debounce_latency(self.max_debounce_latency)
+            return
+
+        self._max_debounce_latency = check_latency
+
+    def get_verify_content(self):
+        return self._verify_content
+
+    def set_verify_content(self, verify: bool):
+        if not isinstance(verify, bool):
+            message.invalid_verify_content(verify)
+            return
+
+        self._verify_content = verify
+        if verify and self._snapshot:
+            self._content_hashes.prime(self._snapshot)
+        elif not verify:
+            self._content_hashes.clear()
+
+    def get_compact_snapshot(self):
+        return self._compact_snapshot
+
+    def set_compact_snapshot(self, compact: bool):
+        # Uses far less memory on large trees. The current snapshot is converted right away.
+        if not isinstance(compact, bool):
+            message.invalid_compact_snapshot(compact)
+            return
+
+        self._compact_snapshot = compact
+        with self._snapshot_lock:
+            if compact and not isinstance(self._snapshot, CompactSnapshot):
+                self._snapshot = CompactSnapshot(self._change_root(), self._snapshot)
+            elif not compact and isinstance(self._snapshot, CompactSnapshot):
+                self._snapshot = dict(self._snapshot.items())
 
     def get_active(self):
-        return self._poll_timer.is_alive()
+        polling = self._poll_call is not None and self._poll_call.pending()
+        return polling or (self._backend is not None and self._backend.is_alive())
+
+    def get_backend(self):
+        return self._backend_name
+
+    def set_backend(self, new_backend: str):
+        # Takes effect the next time monitoring starts
+        if new_backend not in ("auto", "polling") and new_backend not in BACKENDS:
+            message.invalid_backend(new_backend, self.backend)
+            return
+
+        self._backend_name = new_backend
 
     def get_directory(self):
         return self._directory
@@ -62,22 +246,218 @@ class DirectoryMonitor(object):
         # May be a file or folder, but it has to exist
         if os.path.exists(str(desired_directory)):
             self._directory = str(desired_directory).strip('\\')
-            self._last_tracked_filecount = self._num_files(self._directory)
+            self._snapshot = {}
+            if self._import_reachable:
+                self._compile_path_filter()     # Restarts the event backend too
+            else:
+                # The running backend still watches the old tree
+                self._restart_event_backend()
             message.changed_directory(self._directory)
         else:
             message.unable_to_change_directory(desired_directory, self.directory)
     
+    def _compile_path_filter(self) -> None:
+        # Compiled once here rather than interpreting the patterns for every file during a scan
+        path_filter = PathFilter(self._include_patterns, self._exclude_patterns, self._ignore_file)
+        self._import_graph = None
+        if self._import_reachable and os.path.isdir(self._directory) and ImportGraph.is_package(self._directory):
+            # Single file add-ons and plain folders of scripts are tracked as before
+            self._import_graph = ImportGraph(self._directory)
+            self._import_graph.build()
+            path_filter = ReachableFilter(path_filter, self._import_graph, self._data_patterns)
+        self._path_filter = path_filter
+        self._restart_event_backend()
+
+    @staticmethod
+    def _valid_patterns(patterns) -> bool:
+        return isinstance(patterns, (list, tuple)) and all(isinstance(pattern, str) for pattern in patterns)
+
+    def get_include_patterns(self):
+        return self._include_patterns
+
+    def set_include_patterns(self, patterns):
+        if not self._valid_patterns(patterns):
+            message.invalid_patterns("include_patterns", patterns)
+            return
+
+        self._include_patterns = tuple(patterns)
+        self._compile_path_filter()
+
+    def get_exclude_patterns(self):
+        return self._exclude_patterns
+
+    def set_exclude_patterns(self, patterns):
+        if not self._valid_patterns(patterns):
+            message.invalid_patterns("exclude_patterns", patterns)
+            return
+
+        self._exclude_patterns = tuple(patterns)
+        self._compile_path_filter()
+
+    def get_ignore_file(self):
+        return self._ignore_file
+
+    def set_ignore_file(self, ignore_file: str):
+        # An empty string turns the ignore file off. Otherwise it has to be a file that exists.
+        if ignore_file != "" and not os.path.isfile(str(ignore_file)):
+            message.invalid_ignore_file(ignore_file)
+            return
+
+        self._ignore_file = str(ignore_file)
+        self._compile_path_filter()
+
+    def get_import_reachable(self):
+        return self._import_reachable
+
+    def set_import_reachable(self, reachable: bool):
+        # Tests, docs, and build scripts next to the add-on's modules then cost nothing to watch
+        if not isinstance(reachable, bool):
+            message.invalid_import_reachable(reachable)
+            return
+
+        self._import_reachable = reachable
+        self._compile_path_filter()
+
+    def get_data_patterns(self):
+        return self._data_patterns
+
+    def set_data_patterns(self, patterns):
+        # Files the add-on loads at runtime that no import points to, e.g. 'icons/*.png' or 'blender_manifest.toml'
+        if not self._valid_patterns(patterns):
+            message.invalid_patterns("data_patterns", patterns)
+            return
+
+        self._data_patterns = tuple(patterns)
+        self._compile_path_filter()
+
+    def get_reachable_files(self):
+        if self._import_graph is None:
+            return frozenset()
+        return self._import_graph.files
+
+    def get_subscriber_threads(self):
+        return self._subscriber_threads
+
+    def set_subscriber_threads(self, threads: int):
+        if not isinstance(threads, int) or isinstance(threads, bool) or threads < 1:
+            message.invalid_subscriber_threads(threads, self.subscriber_threads)
+            return
+
+        self._subscriber_threads = threads
+        self._executor.resize(threads)
+
+    def get_scan_workers(self):
+        return self._scan_workers
+
+    def set_scan_workers(self, workers: int):
+        # More than 1 is worth it for slow or network drives, where each folder listing waits on the server
+        if not isinstance(workers, int) or isinstance(workers, bool) or workers < 1:
+            message.invalid_scan_setting("scan_workers", workers, self.scan_workers)
+            return
+
+        self._scan_workers = workers
+
+    def get_scan_queue_depth(self):
+        return self._scan_queue_depth
+
+    def set_scan_queue_depth(self, depth: int):
+        if not isinstance(depth, int) or isinstance(depth, bool) or depth < 1:
+            message.invalid_scan_setting("scan_queue_depth", depth, self.scan_queue_depth)
+            return
+
+        self._scan_queue_depth = depth
+
+    def get_scan_budget_entries(self):
+        return self._scan_budget_entries
+
+    def set_scan_budget_entries(self, entries: int):
+        if not isinstance(entries, int) or isinstance(entries, bool) or entries < 0:
+            message.invalid_scan_budget("scan_budget_entries", entries, self.scan_budget_entries)
+            return
+
+        self._scan_budget_entries = entries
+
+    def get_scan_budget_time(self):
+        return self._scan_budget_time
+
+    def set_scan_budget_time(self, microseconds: int):
+        if not isinstance(microseconds, int) or isinstance(microseconds, bool) or microseconds < 0:
+            message.invalid_scan_budget("scan_budget_time", microseconds, self.scan_budget_time)
+            return
+
+        self._scan_budget_time = microseconds
+
+    def get_sweep_time(self):
+        return self._sweep_time
+
+    def get_cache_file(self):
+        return self._cache_file
+
+    def set_cache_file(self, cache_file: str):
+        # An empty string turns the cache off. Otherwise the folder it goes in has to exist.
+        cache_file = str(cache_file)
+        if cache_file != "" and not os.path.isdir(os.path.dirname(os.path.abspath(cache_file))):
+            message.invalid_cache_file(cache_file)
+            return
+
+        self._cache_file = cache_file
+        self._cache_loaded = False
+
+    def get_last_change_set(self):
+        return self._last_change_set
+
+    def get_pending_change_set(self):
+        return self._pending_changes
+
     polling_delay = property(get_polling_delay, set_polling_delay)
+    max_polling_delay = property(get_max_polling_delay, set_max_polling_delay)
+    backoff_factor = property(get_backoff_factor, set_backoff_factor)
+    backoff_idle_time = property(get_backoff_idle_time, set_backoff_idle_time)
+    current_polling_delay = property(get_current_polling_delay)     # Read only. Changes as polling backs off.
+    debounce_delay = property(get_debounce_delay, set_debounce_delay)
+    max_debounce_latency = property(get_max_debounce_latency, set_max_debounce_latency)
     active = property(get_active)   # Read only. Turn on with 'watch()'
+    backend = property(get_backend, set_backend)
+    include_patterns = property(get_include_patterns, set_include_patterns)
+    exclude_patterns = property(get_exclude_patterns, set_exclude_patterns)
+    ignore_file = property(get_ignore_file, set_ignore_file)
+    import_reachable = property(get_import_reachable, set_import_reachable)
+    data_patterns = property(get_data_patterns, set_data_patterns)
+    reachable_files = property(get_reachable_files)   # Read only. Modules found by 'import_reachable'.
+    verify_content = property(get_verify_content, set_verify_content)
+    compact_snapshot = property(get_compact_snapshot, set_compact_snapshot)
+    cache_file = property(get_cache_file, set_cache_file)
+    scan_workers = property(get_scan_workers, set_scan_workers)
+    scan_queue_depth = property(get_scan_queue_depth, set_scan_queue_depth)
+    scan_budget_entries = property(get_scan_budget_entries, set_scan_budget_entries)
+    scan_budget_time = property(get_scan_budget_time, set_scan_budget_time)     # Microseconds
+    sweep_time = property(get_sweep_time)   # Read only. Seconds the last full scan of the directory took.
+    subscriber_threads = property(get_subscriber_threads, set_subscriber_threads)
     directory = property(get_directory, set_directory)
+    last_change_set = property(get_last_change_set)     # Read only. The changes that last ran the subscribers
+    pending_change_set = property(get_pending_change_set)   # Read only. Changes waiting out the debounce delay
 
-    def subscribe(self, script: str, script_function) -> None:
+    def subscribe(self, script: str, script_function, patterns=(), pass_changes: bool = False, priority: int = 0,
+            thread_safe: bool = False) -> None:
         """ When another class subscribes to the monitor, any time monitor detects a change it will
         run all of the subscribed callback functions that were registered.
 
-        @returns: a list of strings representing the header columns
+        `patterns` limits the callback to changes in matching files, using the same glob syntax as
+        `include_patterns` relative to the monitored folder (e.g. `['*.py', 'icons/**']`). With `pass_changes`, the
+        callback is called with a `ChangeSet` of only the matching added, modified, deleted, and moved files.
+
+        Callbacks with a higher `priority` run first. `thread_safe` callbacks run on a thread pool alongside the
+        others, so a slow one does not hold up the rest. Leave it False for anything that touches Blender data.
         """
-        self._subscribers[script].append(script_function)
+        if not self._valid_patterns(patterns):
+            message.invalid_patterns("subscribe() patterns", patterns)
+            return
+        if not isinstance(priority, int) or isinstance(priority, bool):
+            message.invalid_priority(script, priority)
+            return
+
+        self._subscribers[script].append(Subscription(script_function, patterns, pass_changes, priority,
+            bool(thread_safe)))
     
     def unsubscribe(self, script: str) -> None:
         try:
@@ -88,77 +468,368 @@ class DirectoryMonitor(object):
     def clear_subscribers(self) -> None:
         self._subscribers.clear()
 
-    def run_scripts(self) -> None:
-        # Run all of the callback functions that have subscribed
-        for script in self._subscribers.keys():
-            for func in self._subscribers[script]:
-                func()
-
-    def _isNewerFileUpdate(self, file_path):
-        # Will return boolean False if it is an older version that currently tracked.
-        #   If it is newer, it will return that newer value.
-        # 'file_path' has to be a safe file. Folders or files that do not exist throw errors.
-        file_update_time = os.path.getmtime(file_path)
-
-        if file_update_time > self._last_tracked_update:    # Only file changes (not folders) can trigger updates
-            if self.active: # Only print after initialized and active
-                message.found_updated_file(file_path)
-        else:
-            return 0
-        
-        self._last_tracked_update = file_update_time
-        return file_update_time
-    
-    def _num_files(self, file_path):
-        return  sum([len(files) for r, d, files in os.walk(file_path)])
-    
-    def _update_filecount(self):
-        self._last_tracked_filecount = self._num_files(self.directory)
-    
-    def _isNewerFolderUpdate(self, folder_path, latest_folder_update):
-        # 'folder_path' has to be a safe folder. Files or folders that do not exist throw errors.
-        #   This loops throw each file and subdirectory in the 'folder_path'.
+    def _change_root(self) -> str:
+        # The folder that subscription patterns are relative to
+        if os.path.isfile(self.directory):
+            return os.path.dirname(self.directory)
+        return self.directory
 
-        for item in os.scandir(folder_path):
-            if os.path.isfile(item.path):
-                latest_folder_update = max(self._last_tracked_update, self._isNewerFileUpdate(item.path))
-            else:
-                self._isNewerFolderUpdate(item.path, latest_folder_update)    # Recursively call this method again for folders
-        
-        return latest_folder_update
+    def run_scripts(self, changes: ChangeSet = None) -> None:
+        # Run all of the callback functions that have subscribed. Without a ChangeSet, every one of them runs. A
+        #   callback that raises is reported, and does not stop the others or the monitor.
+        self._executor.run(self._subscribers, changes, self._change_root())
+
+    def subscriber_timings(self, script: str = "") -> list:
+        """Returns a `SubscriberRun` (script, function, started, duration, error) for each recent subscriber call,
+        oldest first. Pass `script` to only see the calls for that subscriber."""
+        return self._executor.timings(script)
+
+    def subscriber_timing_summary(self) -> dict:
+        """Returns the number of calls, errors, and the total, mean, and maximum wall time in seconds per script."""
+        return self._executor.timing_summary()
+
+    def clear_subscriber_timings(self) -> None:
+        self._executor.clear_timings()
+
+    def _report_changes(self, changes) -> None:
+        if not self.active:
+            # Only print after initialized and active, otherwise the first scan lists every file
+            return
+
+        for file_path in sorted(changes.added):
+            message.found_added_file(file_path)
+        for file_path in sorted(changes.modified):
+            message.found_updated_file(file_path)
+        for old_path, (new_path, _) in sorted(changes.moved.items()):
+            message.found_moved_file(old_path, new_path)
+        if changes.deleted:
+            message.found_deleted_files(len(changes.deleted))
+
+    def _cache_filter_key(self) -> str:
+        # A cached snapshot only applies to the same tracking rules it was taken with
+        return self._path_filter.key()
+
+    def _load_snapshot_cache(self) -> None:
+        # Use the snapshot from the last session as the baseline, so the first scan reports what changed since then
+        if self._cache_loaded or not self._cache_file:
+            return
+        self._cache_loaded = True
+
+        cached_snapshot = load_snapshot(self._cache_file, self.directory, self._cache_filter_key())
+        if cached_snapshot is None:
+            return
+        with self._snapshot_lock:
+            self._snapshot = cached_snapshot
+        message.loaded_snapshot_cache(len(cached_snapshot))
+        if self._verify_content:
+            self._content_hashes.prime(cached_snapshot)
+
+    def _save_snapshot_cache(self) -> None:
+        if not self._cache_file or not self.directory:
+            return
+        with self._snapshot_lock:
+            snapshot = dict(self._snapshot.items())
+        if snapshot and not save_snapshot(self._cache_file, self.directory, self._cache_filter_key(), snapshot):
+            message.unable_to_save_snapshot_cache(self._cache_file)
+
+    def _schedule_cache_save(self) -> None:
+        # Saving rewrites the whole file, so a burst of edits only saves once, shortly after it ends
+        if not self._cache_file:
+            return
+        if self._cache_save_call is not None:
+            self._cache_save_call.cancel()
+        self._cache_save_call = scheduler.call_later(self._cache_save_delay, self._save_snapshot_cache)
+
+    def _ignore_file_changed(self, changes) -> bool:
+        # The ignore file may have been given as a relative path, while scanned paths start from the monitored folder
+        ignore_file = os.path.normcase(os.path.abspath(self._ignore_file))
+        changed_paths = list(changes.modified) + list(changes.added) \
+            + [new_path for new_path, _ in changes.moved.values()]
+        return any(os.path.normcase(os.path.abspath(path)) == ignore_file for path in changed_paths)
+
+    def _process_changes(self, changes) -> None:
+        if changes:
+            self._schedule_cache_save()
+
+        if self._ignore_file and changes and self._ignore_file_changed(changes):
+            # New rules apply from the next scan onward
+            self._compile_path_filter()
+
+        import_graph = self._import_graph
+        if import_graph is not None and changes and import_graph.update(changes.paths()):
+            # An import was added or removed. An event backend is restarted, since it only watches the folders that
+            #   were reachable when it started. Either way, scan again right away so the modules that just became
+            #   reachable are picked up.
+            message.import_graph_changed(len(import_graph.files))
+            if not self._restart_event_backend():
+                self.wake()
+
+        if self._verify_content and changes:
+            changes, unchanged_files = self._content_hashes.filter_changes(changes)
+            if unchanged_files and self.active:
+                message.skipped_unchanged_files(unchanged_files)
+
+        if not changes:
+            return
+
+        self._report_changes(changes)
+        if self._debounce_delay <= 0:
+            self._last_change_set = changes
+            self.run_scripts(changes)
+            return
+
+        # Editors saving through a temporary file, formatters, and branch switches write many files in a burst. Merge
+        #   the burst together and only run the subscribers once it has been quiet for the debounce delay, or once the
+        #   first change has waited the maximum latency.
+        with self._pending_lock:
+            now = time.monotonic()
+            if self._pending_changes is None:
+                self._pending_changes = ChangeSet()
+                self._pending_since = now
+            self._pending_changes.merge(changes)
+
+            if self._debounce_call is not None:
+                self._debounce_call.cancel()
+            wait = min(self._debounce_delay, self._pending_since + self._max_debounce_latency - now)
+            self._debounce_call = scheduler.call_later(wait, self._flush_pending_changes)
+
+    def _flush_pending_changes(self) -> None:
+        with self._pending_lock:
+            changes = self._pending_changes
+            self._pending_changes = None
+
+        if changes:     # The burst may have cancelled itself out, such as a temporary file created then removed
+            self._last_change_set = changes
+            self.run_scripts(changes)
+
+    def _budgeted_scan_slice(self, file_or_folder_path):
+        # Continues the budgeted sweep by one slice. Returns the finished snapshot, or None if there is more to do.
+        sweep = self._incremental_scan
+        if sweep is None or sweep.path != file_or_folder_path:
+            if sweep is not None:
+                sweep.close()
+            sweep = self._incremental_scan = IncrementalScan(file_or_folder_path, self._path_filter)
 
-    def _scan_and_update(self, file_or_folder_path):
-        original_tracked_update = self._last_tracked_update
-        original_filecount = self._last_tracked_filecount
-        latest_update = 0
+        if not sweep.step(self._scan_budget_entries, self._scan_budget_time / 1000000):
+            return None
+        self._incremental_scan = None
+        self._sweep_time = sweep.duration
+        return sweep.snapshot
 
+    def _scan_and_update(self, file_or_folder_path, budgeted: bool = False):
+        """Scans the directory and processes the changes. Returns the `ChangeSet`, or None if there was nothing to
+        compare yet or the monitor was secured during the scan.
+
+        `budgeted` scans are spread over several calls when a scan budget is set. Each call scans one slice, and only
+        the call that completes the sweep compares and returns changes.
+        """
         if not os.path.exists(str(file_or_folder_path)):
             message.file_or_folder_does_not_exist(file_or_folder_path)
             self.secure()
             return
 
-        if os.path.isfile(file_or_folder_path):
-            latest_update = self._isNewerFileUpdate(file_or_folder_path)
-        else:
-            latest_update = max(latest_update, self._isNewerFolderUpdate(file_or_folder_path, latest_update))
-        
-        self._update_filecount()
+        new_snapshot = None
+        stop = None
+        if budgeted and (self._scan_budget_entries > 0 or self._scan_budget_time > 0):
+            # Only polls are budgeted, so no event backend is updating the snapshot while the sweep is in progress
+            new_snapshot = self._budgeted_scan_slice(file_or_folder_path)
+            if new_snapshot is None:
+                return None
+
+        if new_snapshot is None:
+            # One pass over the tree gives the complete state. Comparing it against the previous pass catches files
+            #   that were added, modified, and deleted in the same polling interval. The scan runs without the lock, so
+            #   'secure()' and event updates never wait for it. Securing stops it at the next folder.
+            stop = None if self._stopped.is_set() else self._stopped   # Direct calls scan even while secured
+            with self._snapshot_lock:
+                self._full_scans += 1
+            try:
+                sweep_start = time.monotonic()
+                if self._compact_snapshot and self._scan_workers <= 1:
+                    new_snapshot = take_compact_snapshot(file_or_folder_path, self._path_filter, stop)
+                else:
+                    new_snapshot = take_snapshot(file_or_folder_path, self._path_filter, self._scan_workers,
+                        self._scan_queue_depth, stop)
+                if new_snapshot is not None:
+                    self._sweep_time = time.monotonic() - sweep_start
+            finally:
+                with self._snapshot_lock:
+                    self._full_scans -= 1
+                    changed_during_scan = self._paths_changed_during_scan
+                    if not self._full_scans:
+                        self._paths_changed_during_scan = set()
+                    if new_snapshot is not None and changed_during_scan:
+                        # The scan may have listed these before their events were applied. Check them again, so the
+                        #   new snapshot is at least as recent as the one it replaces.
+                        update_snapshot(new_snapshot, changed_during_scan, self.directory, self._path_filter)
+            if new_snapshot is None:
+                return None     # Secured part way through
+
+        with self._snapshot_lock:
+            if stop is not None and stop.is_set():
+                return None     # Secured after the scan, which has already reset the snapshot
+            if self._compact_snapshot:
+                if not isinstance(new_snapshot, CompactSnapshot):
+                    new_snapshot = CompactSnapshot(self._change_root(), new_snapshot)
+                changes = diff_compact(self._snapshot, new_snapshot)
+            else:
+                changes = diff_snapshots(self._snapshot, new_snapshot)
+            self._snapshot = new_snapshot
+            self._last_tracked_update = time.time()
+        self._process_changes(changes)
+        return changes
+
+    def _next_polling_delay(self, found_changes: bool) -> float:
+        # Poll quickly while someone is working, then back off exponentially toward the maximum while idle
+        now = time.monotonic()
+        if found_changes:
+            self._last_activity = now
+
+        if found_changes or now - self._last_activity < self._backoff_idle_time:
+            return self._polling_delay
+
+        ceiling = max(self._max_polling_delay, self._polling_delay)
+        return min(self._current_polling_delay * self._backoff_factor, ceiling)
+
+    def _poll(self):
+        with self._schedule_lock:
+            if scheduler.current_call is not self._poll_call:
+                return  # This poll was replaced by 'reset_backoff()' just as it came due
+            self._poll_in_progress = True
 
-        if original_tracked_update < self._last_tracked_update:
-            self.run_scripts()
+        changes = None
+        try:
+            changes = self._scan_and_update(self.directory, budgeted=True)
+        finally:
+            with self._schedule_lock:
+                self._poll_in_progress = False
+                if self._incremental_scan is not None:
+                    # Part way through a budgeted sweep. Continue at the normal rate without touching the backoff.
+                    self._schedule_poll(0 if self._wake_requested else self._polling_delay)
+                else:
+                    self._current_polling_delay = self._next_polling_delay(bool(changes))
+                    self._schedule_poll(0 if self._wake_requested else None)
+                self._wake_requested = False
+
+    def _schedule_poll(self, delay: float = None):
+        # Called with '_schedule_lock' held. Nothing is scheduled once secured.
+        if self._stopped.is_set():
             return
-    
-        if original_filecount > self._last_tracked_filecount:
-            message.found_deleted_files(original_filecount - self._last_tracked_filecount)
-            self.run_scripts()
+        if delay is None:
+            delay = self._current_polling_delay
+        self._poll_call = scheduler.call_later(delay, self._poll)
+
+    def wake(self) -> None:
+        """Scans the directory right away instead of waiting for the next poll, and returns to the fastest polling
+        interval. Does nothing while secured.
+
+        Use this when another component knows files were just written, such as a build step or a git checkout. With an
+        event backend, a full comparison is run in case the operating system missed anything.
+        """
+        self._last_activity = time.monotonic()
+        with self._schedule_lock:
+            if self._stopped.is_set():
+                return
+            self._current_polling_delay = self._polling_delay
+
+            if self._backend is not None:
+                scheduler.call_later(0, self._rescan)
+            elif self._poll_in_progress:
+                self._wake_requested = True     # The running poll may have already passed the new files
+            else:
+                if self._poll_call is not None:
+                    self._poll_call.cancel()
+                self._schedule_poll(0)
+
+    def _rescan(self) -> None:
+        if not self._stopped.is_set():
+            self._scan_and_update(self.directory)
+
+    def reset_backoff(self) -> None:
+        """Returns to the fastest polling interval immediately, as if a change was just detected.
+
+        Call this whenever the user is likely to be about to test a change, such as when they start interacting with
+        Blender again. It is cheap to call often.
+        """
+        self._last_activity = time.monotonic()
+        if self._current_polling_delay <= self._polling_delay:
             return
 
-    def _poll(self):
-        
-        self._scan_and_update(self.directory)
-        self._poll_timer = threading.Timer(self.polling_delay, self._poll)
-        if self._last_tracked_update > 0:   # Break out of infinite loop if the poll request was cancelled
-            self._poll_timer.start()
+        with self._schedule_lock:
+            self._current_polling_delay = self._polling_delay
+            if self._poll_in_progress or self._backend is not None or not self.active:
+                return  # A running poll picks up the new interval when it schedules the next one
+
+            # Replace the long wait with a short one
+            self._poll_call.cancel()
+            self._schedule_poll()
+
+    def _start_event_backend(self) -> bool:
+        # Returns True if an event backend is now watching the directory. Otherwise the caller should poll instead.
+        if self._backend_name == "polling":
+            return False
+        if self._backend_name == "auto" and not supported_backends(automatic_only=True):
+            return False    # Polling is the normal mode on this platform, so there is nothing to report
+
+        try:
+            self._backend = create_event_backend(self._backend_name, self.directory, self._on_backend_changes,
+                self._on_backend_overflow, self._on_backend_unavailable, self._path_filter)
+        except BackendUnavailable as error:
+            message.backend_fallback(str(error))
+            return False
+
+        message.backend_started(self._backend.name)
+        return True
+
+    def _restart_event_backend(self) -> bool:
+        # Event backends skip the folders their filter excluded when they started, so a folder the current rules
+        #   include could go unwatched. Start a fresh backend with the current filter, and scan everything once so the
+        #   files in those folders are picked up. Returns False if no backend was running.
+        with self._schedule_lock:
+            backend = self._backend
+            self._backend = None
+        if backend is None:
+            return False
+        backend.stop()
+        if self._stopped.is_set():
+            return True
+        if not self._start_event_backend():
+            with self._schedule_lock:
+                self._schedule_poll()
+        self.wake()
+        return True
+
+    def _on_backend_changes(self, changed_paths) -> None:
+        # Runs on the backend thread. Only the reported paths are checked, the rest of the snapshot stays as is.
+        if not os.path.exists(str(self.directory)):
+            message.file_or_folder_does_not_exist(self.directory)
+            self.secure()
+            return
+
+        if self._stopped.is_set():
+            return
+        # A backend that is still stopping may report paths from the directory that was monitored before
+        directory = self.directory
+        changed_paths = [path for path in changed_paths if path == directory or relative_path(path, directory)]
+        if not changed_paths:
+            return
+        with self._snapshot_lock:
+            changes = update_snapshot(self._snapshot, changed_paths, directory, self._path_filter)
+            if self._full_scans:
+                self._paths_changed_during_scan.update(changed_paths)
+            self._last_tracked_update = time.time()
+        self._process_changes(changes)
+
+    def _on_backend_overflow(self) -> None:
+        # The operating system dropped events, so the only safe option is a full comparison
+        self._rescan()
+
+    def _on_backend_unavailable(self, reason: str) -> None:
+        # The backend stopped on its own (for example, the watch limit ran out as folders were added)
+        message.backend_fallback(reason)
+        with self._schedule_lock:
+            self._backend = None
+            self._schedule_poll()
     
     def watch(self) -> None:
         """Begin watching the specified directory for changes. Will secure if the directory is invalid."""
@@ -172,14 +843,45 @@ class DirectoryMonitor(object):
             message.monitoring_active()
             return
         
-        # Hasn't been run yet. Initialize and commence monitoring
-        self._poll()
-        if monitor.active:
+        # Hasn't been run yet. Initialize and commence monitoring. The first scan establishes the baseline, after
+        #   that an event backend reports changes as they happen. Polling is the fallback when none is available.
+        self._stopped.clear()
+        if self._import_graph is not None:
+            self._import_graph.build()  # Imports may have changed while the monitor was secured
+        self._load_snapshot_cache()
+        self._scan_and_update(self.directory)   # Secures again if the directory disappeared
+        self._last_activity = time.monotonic()
+        self._current_polling_delay = self._polling_delay
+        if not self._stopped.is_set() and not self._start_event_backend():
+            with self._schedule_lock:
+                self._schedule_poll()
+        if self.active:
             message.watch() # Let the user know that there wasn't another error along the way that disabled the monitor
     
     def secure(self) -> None:
-        self._poll_timer.cancel()
-        self._last_tracked_update = 0
+        """Stops monitoring. A poll that is already running finishes its scan, but nothing is scheduled after it."""
+        self._stopped.set()
+        with self._schedule_lock:
+            self._wake_requested = False
+            if self._incremental_scan is not None:
+                if not self._poll_in_progress:     # Otherwise the running poll still has it open
+                    self._incremental_scan.close()
+                self._incremental_scan = None
+            if self._poll_call is not None:
+                self._poll_call.cancel()
+        with self._pending_lock:
+            # Changes still waiting out the debounce delay are dropped along with the rest of the monitoring state
+            if self._debounce_call is not None:
+                self._debounce_call.cancel()
+            self._pending_changes = None
+        if self._backend is not None:
+            self._backend.stop()
+            self._backend = None
+        if self._cache_save_call is not None:
+            self._cache_save_call.cancel()
+        self._save_snapshot_cache()
+        with self._snapshot_lock:
+            self._snapshot = {}     # Watching again will treat every file as new and run the subscribers
         message.secure()
         
 
@@ -0,0 +1,443 @@
+"""
+Directory Snapshot
+
+Records the stat signature of every file below a file or folder in a single pass, and compares two of those records
+to find exactly which files were added, modified, or deleted in between.
+"""
+
+import collections
+import concurrent.futures
+import os
+import stat
+import threading
+import time
+
+
+def stat_signature(stat_result) -> tuple:
+    """Reduces an `os.stat_result` to the values the monitor compares: `(mtime_ns, size, inode)`.
+
+    The inode is included so that editors doing atomic saves (write a temporary file, then rename it over the original)
+    still register as a modification even when the size and modified time happen to match.
+    """
+    return (stat_result.st_mtime_ns, stat_result.st_size, stat_result.st_ino)
+
+
+class ChangeSet(object):
+    """The exact difference between two snapshots.
+
+    Each of `added`, `modified`, and `deleted` is a dictionary keyed by file path. Added and modified paths map to
+    their new stat signature, deleted paths map to the last signature that was seen for them.
+
+    `moved` maps the old path of a renamed or moved file to `(new_path, stat_signature)`. A move is a deleted file and
+    an added file with the exact same signature, including the inode.
+    """
+
+    def __init__(self, added: dict = None, modified: dict = None, deleted: dict = None, moved: dict = None):
+        self.added = added if added is not None else {}
+        self.modified = modified if modified is not None else {}
+        self.deleted = deleted if deleted is not None else {}
+        self.moved = moved if moved is not None else {}
+
+    def __bool__(self):
+        return bool(self.added or self.modified or self.deleted or self.moved)
+
+    def __len__(self):
+        return len(self.added) + len(self.modified) + len(self.deleted) + len(self.moved)
+
+    def __repr__(self):
+        return "ChangeSet(added={}, modified={}, deleted={}, moved={})".format(
+            len(self.added), len(self.modified), len(self.deleted), len(self.moved))
+
+    def paths(self) -> list:
+        """Returns every changed path in sorted order. Moved files list both their old and new path."""
+        moved_paths = set(self.moved) | set(new_path for new_path, _ in self.moved.values())
+        return sorted(set(self.added) | set(self.modified) | set(self.deleted) | moved_paths)
+
+    def stat(self, path: str):
+        """Returns the stat signature `(mtime_ns, size, inode)` recorded for `path`, or None if it did not change.
+
+        For deleted files this is the last signature seen. Moved files can be looked up by either path.
+        """
+        for changed in (self.added, self.modified, self.deleted):
+            if path in changed:
+                return changed[path]
+        if path in self.moved:
+            return self.moved[path][1]
+        for new_path, signature in self.moved.values():
+            if new_path == path:
+                return signature
+        return None
+
+    def detect_moves(self) -> None:
+        """Pairs deleted and added files with identical signatures and records them as moves instead.
+
+        Files without an inode number (for example, from `os.scandir` on Windows) are never paired, since the modified
+        time and size alone are not reliable enough.
+        """
+        if not self.added or not self.deleted:
+            return
+
+        deleted_by_signature = {}
+        for path, signature in self.deleted.items():
+            if signature[2]:
+                deleted_by_signature.setdefault(signature, []).append(path)
+
+        for new_path, signature in list(self.added.items()):
+            old_paths = deleted_by_signature.get(signature)
+            if not old_paths:
+                continue
+            old_path = old_paths.pop()
+            del self.added[new_path]
+            del self.deleted[old_path]
+            self.moved[old_path] = (new_path, signature)
+
+    def filtered(self, keep) -> "ChangeSet":
+        """Returns a new `ChangeSet` with only the paths where `keep(path)` is True. A move is kept if either path is."""
+        return ChangeSet(
+            {path: signature for path, signature in self.added.items() if keep(path)},
+            {path: signature for path, signature in self.modified.items() if keep(path)},
+            {path: signature for path, signature in self.deleted.items() if keep(path)},
+            {old_path: move for old_path, move in self.moved.items() if keep(old_path) or keep(move[0])})
+
+    def merge(self, later) -> None:
+        """Folds a `ChangeSet` that happened after this one into it, so the result describes both as a single change.
+
+        A file added and then deleted disappears entirely, a file deleted and then recreated (an atomic save) becomes
+        a modification, and a file added and then modified is still just added.
+        """
+        # Moves are merged as a delete plus an add, and found again at the end
+        for old_path, (new_path, signature) in self.moved.items():
+            self.deleted[old_path] = signature
+            self.added[new_path] = signature
+        self.moved = {}
+        later_added = dict(later.added)
+        later_deleted = dict(later.deleted)
+        for old_path, (new_path, signature) in later.moved.items():
+            later_deleted[old_path] = signature
+            later_added[new_path] = signature
+
+        for path, signature in later_added.items():
+            old_signature = self.deleted.pop(path, None)
+            if old_signature is None:
+                self.added[path] = signature
+            elif old_signature != signature:
+                self.modified[path] = signature
+
+        for path, signature in later.modified.items():
+            if path in self.added:
+                self.added[path] = signature
+            else:
+                self.modified[path] = signature
+
+        for path, signature in later_deleted.items():
+            if self.added.pop(path, None) is not None:
+                continue
+            self.modified.pop(path, None)
+            self.deleted[path] = signature
+
+        self.detect_moves()
+
+
+def relative_path(path: str, root: str) -> str:
+    """Returns `path` relative to `root` using `/` separators, the form that `PathFilter` rules are matched against.
+
+    Returns an empty string if `path` is `root` itself or is not inside it.
+    """
+    relative = os.path.relpath(path, root)
+    if relative == "." or relative == os.pardir or relative.startswith(os.pardir + os.sep):
+        return ""
+    return relative.replace(os.sep, "/")
+
+
+def _scan_entry(entry, relative_folder: str, files: dict, subfolders: list, path_filter) -> None:
+    # Records a file entry in `files`, or queues a folder entry in `subfolders` unless it is excluded
+    try:
+        if entry.is_dir(follow_symlinks=False):
+            entry_relative_path = relative_folder + entry.name
+            if path_filter is None or not path_filter.excludes_folder(entry_relative_path, entry.name):
+                subfolders.append((entry.path, entry_relative_path + "/"))
+        elif entry.is_file():
+            # Filter before calling stat, so excluded files never cost a system call
+            if path_filter is None or path_filter.includes_file(relative_folder + entry.name, entry.name):
+                files[entry.path] = stat_signature(entry.stat())
+    except OSError:
+        pass
+
+
+def _scan_one_folder(folder: str, relative_folder: str, files: dict, subfolders: list, path_filter=None) -> None:
+    # Adds the files directly inside `folder` to `files`, and the folders to descend into to `subfolders`.
+    #   `relative_folder` is the path of `folder` relative to the monitored folder, ending with '/' (or empty for the
+    #   monitored folder itself).
+    try:
+        entries = os.scandir(folder)
+    except OSError:
+        # The folder was removed or became unreadable after it was listed. Its files count as deleted.
+        return
+
+    with entries:
+        for entry in entries:
+            _scan_entry(entry, relative_folder, files, subfolders, path_filter)
+
+
+def _scan_folder(folder_path: str, relative_folder: str, snapshot: dict, path_filter=None, stop=None) -> bool:
+    # Returns False if `stop` was set before every folder was scanned
+    pending_folders = [(folder_path, relative_folder)]
+    while pending_folders:
+        if stop is not None and stop.is_set():
+            return False
+        folder, relative_folder = pending_folders.pop()
+        _scan_one_folder(folder, relative_folder, snapshot, pending_folders, path_filter)
+    return True
+
+
+###############################################################
+# Parallel Scanning
+###############################################################
+
+_scan_pools = {}    # Number of workers -> ThreadPoolExecutor
+_scan_pool_lock = threading.Lock()
+
+def _shared_scan_pool(workers: int):
+    # Pools are kept between scans so polling does not start new threads every time. Monitors asking for different
+    #   numbers of workers each get their own pool, and a pool is never shut down while another scan may be using it.
+    with _scan_pool_lock:
+        pool = _scan_pools.get(workers)
+        if pool is None:
+            pool = _scan_pools[workers] = concurrent.futures.ThreadPoolExecutor(max_workers=workers,
+                thread_name_prefix="DirectoryMonitor-scan")
+        return pool
+
+def _scan_one_folder_task(folder: str, relative_folder: str, path_filter) -> tuple:
+    files = {}
+    subfolders = []
+    _scan_one_folder(folder, relative_folder, files, subfolders, path_filter)
+    return files, subfolders
+
+def _scan_folder_parallel(folder_path: str, relative_folder: str, snapshot: dict, path_filter, workers: int,
+        queue_depth: int, stop=None) -> bool:
+    # Each folder is listed by a worker thread. `os.scandir` and `stat` release the GIL, so on a slow (network) drive
+    #   the workers wait on the filesystem at the same time instead of one after another. At most `queue_depth`
+    #   folders are handed to the pool at once, the rest wait here.
+    pool = _shared_scan_pool(workers)
+    pending_folders = collections.deque([(folder_path, relative_folder)])
+    running = {}    # Future -> folder path
+    files_by_folder = {}
+
+    while pending_folders or running:
+        if stop is not None and stop.is_set():
+            for future in running:
+                future.cancel()
+            return False
+        while pending_folders and len(running) < queue_depth:
+            folder, folder_relative = pending_folders.popleft()
+            running[pool.submit(_scan_one_folder_task, folder, folder_relative, path_filter)] = folder
+
+        done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+        for future in done:
+            folder = running.pop(future)
+            files, subfolders = future.result()
+            files_by_folder[folder] = files
+            pending_folders.extend(subfolders)
+
+    # Folders finish in whatever order the filesystem answers. Merge them in a fixed order so the snapshot is the same
+    #   as a serial scan no matter how the work was split up.
+    for folder in sorted(files_by_folder):
+        snapshot.update(files_by_folder[folder])
+    return True
+
+
+def take_snapshot(file_or_folder_path: str, path_filter=None, workers: int = 1, queue_depth: int = 64, stop=None):
+    """Returns a dictionary mapping every file below `file_or_folder_path` to its stat signature.
+
+    Folders are walked with a single `os.scandir` pass. The stat information comes from the `DirEntry` objects, which
+    lets the operating system reuse what it already returned while listing the folder instead of making extra
+    `isfile`/`getmtime` calls for each entry.
+
+    If a `PathFilter` is given, excluded folders are never descended into and excluded files are never stat'ed. A
+    single file is always tracked, since it was chosen explicitly.
+
+    Symbolic links to folders are not followed, which prevents infinite loops. Files that disappear part way through
+    the scan are skipped, and show up as deleted on the next comparison.
+
+    With more than one of `workers`, folders are listed in parallel on a shared thread pool, keeping at most
+    `queue_depth` folders queued at once. This mostly helps on network drives where every call waits on the server.
+
+    `stop` is an optional `threading.Event` that is checked between folders. If it gets set, the scan ends early and
+    returns None instead of an incomplete snapshot.
+    """
+    snapshot = {}
+
+    if os.path.isfile(file_or_folder_path):
+        try:
+            snapshot[file_or_folder_path] = stat_signature(os.stat(file_or_folder_path))
+        except OSError:
+            pass
+        return snapshot
+
+    if workers > 1:
+        complete = _scan_folder_parallel(file_or_folder_path, "", snapshot, path_filter, workers, max(queue_depth, 1),
+            stop)
+    else:
+        complete = _scan_folder(file_or_folder_path, "", snapshot, path_filter, stop)
+    return snapshot if complete else None
+
+
+class IncrementalScan(object):
+    """Takes the same snapshot as `take_snapshot`, a limited amount of work at a time.
+
+    Each `step()` processes directory entries until it reaches its entry or time budget, then returns. The next call
+    continues from the same spot, so a large tree is swept in short slices and never holds the GIL for long. The
+    result is in `snapshot` once `complete` is True.
+    """
+
+    def __init__(self, file_or_folder_path: str, path_filter=None):
+        self.path = file_or_folder_path
+        self.snapshot = {}
+        self.complete = False
+        self.entries_scanned = 0
+        self.started = time.monotonic()
+        self.finished = 0.0
+        self._path_filter = path_filter
+        self._pending_folders = []
+        self._entries = None            # The open `os.scandir` iterator of the folder being scanned
+        self._relative_folder = ""
+
+        if os.path.isfile(file_or_folder_path):
+            self.snapshot = take_snapshot(file_or_folder_path)
+            self._finish()
+        else:
+            self._pending_folders.append((file_or_folder_path, ""))
+
+    @property
+    def duration(self) -> float:
+        """Seconds from the start of the sweep until it completed, or until now if it is still running."""
+        return (self.finished if self.complete else time.monotonic()) - self.started
+
+    def _finish(self) -> None:
+        self.complete = True
+        self.finished = time.monotonic()
+
+    def close(self) -> None:
+        """Stops the sweep early and releases the open folder handle."""
+        if self._entries is not None:
+            self._entries.close()
+            self._entries = None
+
+    def step(self, max_entries: int = 0, max_seconds: float = 0) -> bool:
+        """Scans until `max_entries` entries were processed or `max_seconds` passed. 0 means no limit. At least one
+        entry is always processed, so the sweep keeps moving however small the budget is. Returns True once the sweep
+        is complete."""
+        if self.complete:
+            return True
+
+        deadline = time.perf_counter() + max_seconds if max_seconds > 0 else 0
+        processed = 0
+
+        while True:
+            if self._entries is None:
+                if not self._pending_folders:
+                    self.entries_scanned += processed
+                    self._finish()
+                    return True
+                folder, self._relative_folder = self._pending_folders.pop()
+                try:
+                    self._entries = os.scandir(folder)
+                except OSError:
+                    continue
+
+            entry = next(self._entries, None)
+            if entry is None:
+                self._entries.close()
+                self._entries = None
+                continue
+
+            _scan_entry(entry, self._relative_folder, self.snapshot, self._pending_folders, self._path_filter)
+            processed += 1
+            if max_entries > 0 and processed >= max_entries:
+                break
+            if deadline and time.perf_counter() >= deadline:
+                break
+
+        self.entries_scanned += processed
+        return False
+
+
+def diff_snapshots(old_snapshot: dict, new_snapshot: dict) -> ChangeSet:
+    """Compares two snapshots created by `take_snapshot` and returns the `ChangeSet` between them."""
+    added = {}
+    modified = {}
+
+    for path, signature in new_snapshot.items():
+        old_signature = old_snapshot.get(path)
+        if old_signature is None:
+            added[path] = signature
+        elif old_signature != signature:
+            modified[path] = signature
+
+    deleted = {}
+    if len(new_snapshot) - len(added) != len(old_snapshot):
+        # Only look for deleted files when the counts show that something is missing
+        deleted = {path: signature for path, signature in old_snapshot.items() if path not in new_snapshot}
+
+    changes = ChangeSet(added, modified, deleted)
+    changes.detect_moves()
+    return changes
+
+
+def update_snapshot(snapshot: dict, changed_paths, root: str = "", path_filter=None) -> ChangeSet:
+    """Updates `snapshot` in place by checking only `changed_paths`, and returns the `ChangeSet` that was applied.
+
+    This is used by event driven backends that already know which paths changed, so the rest of the tree does not
+    have to be scanned. A changed folder is rescanned in full, and a folder that no longer exists removes every
+    tracked file below it.
+
+    `root` is the monitored folder, which `path_filter` rules are relative to.
+    """
+    changes = ChangeSet()
+
+    for path in changed_paths:
+        folder_prefix = os.path.join(path, "")
+        try:
+            stat_result = os.stat(path)
+        except OSError:
+            stat_result = None
+
+        is_folder = stat_result is not None and stat.S_ISDIR(stat_result.st_mode)
+        path_relative = relative_path(path, root) if root else ""
+        if path_filter is not None and path_relative and path not in snapshot \
+                and not path_filter.includes_path(path_relative, is_folder):
+            continue
+
+        if stat_result is not None and not is_folder:
+            signature = stat_signature(stat_result)
+            old_signature = snapshot.get(path)
+            if old_signature is None:
+                changes.added[path] = signature
+            elif old_signature != signature:
+                changes.modified[path] = signature
+            snapshot[path] = signature
+            continue
+
+        if path in snapshot:
+            # A tracked file was removed, or replaced by a folder which is scanned below
+            changes.deleted[path] = snapshot.pop(path)
+            if stat_result is None:
+                continue
+
+        old_folder = {tracked_path: signature for tracked_path, signature in snapshot.items()
+            if tracked_path.startswith(folder_prefix)}
+        new_folder = {}
+        if stat_result is not None:
+            _scan_folder(path, path_relative + "/" if path_relative else "", new_folder, path_filter)
+        folder_changes = diff_snapshots(old_folder, new_folder)
+
+        for deleted_path in folder_changes.deleted:
+            del snapshot[deleted_path]
+        snapshot.update(new_folder)
+
+        changes.added.update(folder_changes.added)
+        changes.modified.update(folder_changes.modified)
+        changes.deleted.update(folder_changes.deleted)
+
+    changes.detect_moves()
+    return changes
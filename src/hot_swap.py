@@ -1,12 +1,71 @@
+import ast
+import concurrent.futures
 import importlib
 import importlib.util
 import os
 import shutil
 import sys
+import threading
+import traceback
+import addon_utils
 import bpy
 
+from .addon_sync import sync_addon
 from .console_messages.hotswap import HotswapMessages as message
+from .directory_snapshot import ChangeSet, stat_signature
 from .directory_monitor import monitor
+from .import_graph import ImportGraph, reload_order
+from .import_tracker import ImportTracker, package_modules
+from .main_thread import main_thread
+from .preflight import modules_to_check, preflight_compile
+from .swap_profiler import profiler
+from .workspace import Workspace, find_bl_info
+
+SYNC_WORKERS = 4        # Add-ons whose files are copied at once by a workspace hot swap
+
+_pool = None
+_pool_lock = threading.Lock()
+
+_import_graphs = {}     # Add-on folder -> ImportGraph, so unchanged modules are not parsed again on every hot swap
+
+_import_trackers = {}   # Add-on file name -> ImportTracker recording its imports from enabling until the next purge
+
+_workspaces = {}        # Workspace folder -> Workspace, so its add-ons are not searched for again on every hot swap
+
+_refused_changes = {}   # Add-on path -> ChangeSet of a hot swap refused for a compile error, or None to swap it all
+
+_bl_info_cache = {}     # __init__.py or single add-on file -> (stat signature, bl_info dictionary or None)
+
+def _literal_bl_info(file_path: str):
+    """Returns the `bl_info` dictionary assigned at the top level of the file, read with `ast.literal_eval` without
+    running any of the file. Returns None if there is no such assignment or its value is not a plain literal."""
+    try:
+        with open(file_path, "rb") as file:
+            tree = ast.parse(file.read(), file_path)
+    except (SyntaxError, ValueError, OSError):
+        return None
+
+    value = find_bl_info(tree)
+    if value is None:
+        return None
+    try:
+        bl_info = ast.literal_eval(value)
+    except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+        return None
+    return bl_info if isinstance(bl_info, dict) else None
+
+def _executed_bl_info(addon_name: str, file_path: str):
+    """Returns `bl_info` by loading the module, for add-ons that build it with code. Raises whatever the module
+    raises."""
+    spec = importlib.util.spec_from_file_location(addon_name, file_path)
+    mod = importlib.util.module_from_spec(spec)
+
+    sys.modules[addon_name] = mod
+    try:
+        spec.loader.exec_module(mod)
+        return mod.bl_info
+    finally:
+        del sys.modules[addon_name]
 
 def get_most_recent_bl_name_info(addon_path: str) -> str:
     """Returns the current `bl_info.name` for a Blender add-on.
@@ -17,8 +76,10 @@ def get_most_recent_bl_name_info(addon_path: str) -> str:
     If the add-on does NOT have this required property, it is missing `name`, the file or package just does not
     exist, or some other error occurs while reading it, then the function  will return an empty string.
 
-    This function works by using the `importlib.util` library to get a module spec based on the provided `addon_path`,
-    and then tries to load that module. It cleans up after itself once done.
+    This function reads the `bl_info` assignment with `ast.literal_eval`, without running the add-on. Only when
+    `bl_info` is not a plain literal does it fall back to using the `importlib.util` library to get a module spec based
+    on the provided `addon_path`, and loading that module. It cleans up after itself once done. The result is cached
+    against the file's stat signature, so unchanged metadata costs one `os.stat`.
 
     Errors:
     - If the path is to a file or folder that does not exist, it should log an error and return an empty string.
@@ -33,23 +94,35 @@ def get_most_recent_bl_name_info(addon_path: str) -> str:
     addon_name = str(os.path.splitext(os.path.basename(addon_path))[0])
 
     if os.path.isfile(addon_path):
-        spec = importlib.util.spec_from_file_location(addon_name, addon_path)
+        file_path = addon_path
     else:
-        spec = importlib.util.spec_from_file_location(addon_name, os.path.join(addon_path, "__init__.py"))
+        file_path = os.path.join(addon_path, "__init__.py")
 
-    mod = importlib.util.module_from_spec(spec)
+    try:
+        signature = stat_signature(os.stat(file_path))
+    except (OSError, ValueError) as error:
+        message.monitored_addon_must_have_valid_name_in_bl_info_single_file()
+        print("Python error message: ", error)
+        return ""
 
-    sys.modules[addon_name] = mod
+    cached = _bl_info_cache.get(file_path)
+    if cached is not None and cached[0] == signature:
+        bl_info = cached[1]
+    else:
+        bl_info = _literal_bl_info(file_path)
+        if bl_info is None:
+            try:
+                bl_info = _executed_bl_info(addon_name, file_path)
+            except Exception as error:
+                print("Python error message: ", error)
+                bl_info = None  # Cached too, so a broken add-on is not run again until it is edited
+        _bl_info_cache[file_path] = (signature, bl_info)
 
     try:
-        spec.loader.exec_module(mod)
-        given_name = mod.bl_info['name']
-    except Exception as error:
+        given_name = bl_info['name']
+    except Exception:
         message.monitored_addon_must_have_valid_name_in_bl_info_single_file()
-        print("Python error message: ", error)
         given_name = ""
-    
-    del sys.modules[addon_name]
 
     return given_name
 
@@ -77,28 +150,380 @@ def update_scripting_assistant_preference_addon_filename(addon_filename: str) ->
     prefs = bpy.context.preferences.addons["blender-scripting-assistant"].preferences
     prefs.monitor_addon_filename = addon_filename
 
-def reload_modules() -> None:
+def start_import_tracking(addon_filename: str) -> None:
+    """Starts recording every module the add-on imports. Called just before enabling it, and left running until the
+    next purge so modules imported later, from inside functions, are recorded too."""
+    stop_import_tracking(addon_filename)
+    tracker = _import_trackers[addon_filename] = ImportTracker(addon_filename)
+    tracker.install()
+
+def stop_import_tracking(addon_filename: str = None) -> set:
+    """Stops recording the add-on's imports, and returns the names of the modules that were recorded. Without an
+    `addon_filename`, every add-on's recording stops."""
+    if addon_filename is None:
+        modules = set()
+        for name in list(_import_trackers):
+            modules |= stop_import_tracking(name)
+        return modules
+    tracker = _import_trackers.pop(addon_filename, None)
+    return tracker.uninstall() if tracker is not None else set()
+
+def purge_addon_modules(addon_filename: str) -> list:
+    """Removes the add-on's modules from `sys.modules`, so enabling it again loads them fresh instead of reusing them.
+    Returns the names removed.
+
+    Uses the modules recorded since the add-on was last enabled when there is a record for it, which only costs a
+    lookup per module of the add-on. Otherwise, such as for an add-on Blender enabled at startup, `sys.modules` is
+    scanned for the package and its submodules.
+    """
+    if addon_filename in _import_trackers:
+        modules = stop_import_tracking(addon_filename) | {addon_filename}
+    else:
+        modules = package_modules(addon_filename)
+
+    purged = []
+    for name in sorted(modules):
+        if sys.modules.pop(name, None) is not None:
+            purged.append(name)
+    return purged
+
+def enable_addon(addon_filename: str, use_operator: bool = False) -> None:
+    """Enables an installed add-on. Raises the add-on's exception if it could not be enabled.
+
+    By default this goes straight through `addon_utils.enable`, which imports and registers just this one module. The
+    `bpy.ops.preferences.addon_enable` operator is used instead with `use_operator`, for add-ons Blender has only just
+    found with `addon_refresh()`.
+    """
+    if use_operator:
+        bpy.ops.preferences.addon_enable(module=addon_filename)
+        return
+
+    # The import system may still hold the add-ons folder listing from before the files were copied
+    importlib.invalidate_caches()
+
+    errors = []
+    def handle_error(error):
+        traceback.print_exc()   # The same report Blender prints when enabling from the preferences
+        errors.append(error)
+
+    if addon_utils.enable(addon_filename, default_set=True, handle_error=handle_error) is None:
+        raise errors[0] if errors else RuntimeError("Blender could not enable the add-on " + addon_filename)
+
+def get_module_name(addon_filename: str, addon_path: str, file_path: str) -> str:
+    """Returns the `sys.modules` key of a module file from the source folder `addon_path`, once it is installed as
+    `addon_filename`."""
+    module_path = os.path.splitext(os.path.relpath(file_path, addon_path))[0].split(os.sep)
+    if module_path[-1] == "__init__":
+        module_path = module_path[:-1]
+    return ".".join([addon_filename] + module_path)
+
+def partial_reload(addon_path: str, addon_filename: str, changed_paths, profile=None) -> bool:
+    """Reloads only the changed modules of an enabled package add-on, and the modules that import them.
+
+    The changed files are synced into the installed add-on, then each affected module is reloaded with
+    `importlib.reload` in dependency order. Blender's add-on list is never refreshed and the add-on stays enabled.
+
+    Returns False without changing anything if the change needs the full hot swap instead, for example when
+    `__init__.py` or registration code changed. See `import_graph.reload_order` for every case.
+
+    Pass the hot swap's `SwapProfile` as `profile` to record the time and work of each phase in it. Without one, the
+    reload is recorded in `swap_profiler.profiler` as a swap of its own.
+    """
+    if profile is not None:
+        return _partial_reload(addon_path, addon_filename, changed_paths, profile)
+
+    profile = profiler.start()
+    try:
+        reloaded = _partial_reload(addon_path, addon_filename, changed_paths, profile)
+        profile.outcome = "success" if reloaded else "skipped"
+        return reloaded
+    finally:
+        profiler.finish(profile)
+
+def _partial_reload(addon_path: str, addon_filename: str, changed_paths, profile) -> bool:
+    if not os.path.isdir(addon_path) or addon_filename not in bpy.context.preferences.addons.keys():
+        return False
+    installed_path = os.path.join(bpy.utils.script_path_user(), "addons", addon_filename)
+    if not os.path.isdir(installed_path):
+        return False
+
+    graph = _import_graphs.get(addon_path)
+    if graph is None:
+        graph = _import_graphs[addon_path] = ImportGraph(addon_path)
+    with profile.phase("plan"):
+        order = reload_order(graph, changed_paths,
+            lambda file_path: get_module_name(addon_filename, addon_path, file_path) in sys.modules)
+    if order is None:
+        message.partial_hotswap_fallback()
+        return False
+
+    profile.strategy = "partial"
+    with profile.phase("copy"):
+        profile.bytes_copied += sync_addon(addon_path, installed_path, changed_paths=changed_paths).bytes_copied
+
+    with profile.phase("reload"):
+        for file_path in order:
+            module = sys.modules.get(get_module_name(addon_filename, addon_path, file_path))
+            if module is not None:  # Not imported yet, so the next import loads the new version anyway
+                importlib.reload(module)
+                profile.modules_reloaded += 1
+    message.partial_hotswap_successful(profile.modules_reloaded)
+    return True
+
+def preview_addon_sync():
+    """Prints which files the next hot swap would copy into, or remove from, Blender's add-ons folder, without changing
+    anything. Returns the `SyncReport`, or None if the monitored add-on is not a package."""
+    prefs = bpy.context.preferences.addons[__package__].preferences
+    if not os.path.isdir(prefs.monitor_path):
+        message.sync_preview_needs_package()
+        return None
+
+    addon_filename = create_addon_name(get_most_recent_bl_name_info(prefs.monitor_path))
+    if addon_filename == "":
+        message.monitored_addon_must_have_valid_name_in_bl_info_single_file()
+        return None
+    installed_path = os.path.join(bpy.utils.script_path_user(), "addons", addon_filename)
+    report = sync_addon(prefs.monitor_path, installed_path, dry_run=True)
+    message.sync_preview(report, installed_path)
+    return report
+
+def _merge_change_sets(older, newer):
+    # A request without a `ChangeSet` is a full reload, and so is anything it is combined with
+    if older is None or newer is None:
+        return None
+    merged = ChangeSet(dict(older.added), dict(older.modified), dict(older.deleted), dict(older.moved))
+    merged.merge(newer)
+    return merged
+
+def merge_changes(older_args: tuple, newer_args: tuple) -> tuple:
+    """Combines the `(changes, compile_errors)` of two hot swap requests that are waiting on the main thread into one.
+    The newer request compiled its files again, so only the older errors in files it did not touch are kept."""
+    older, older_errors = older_args
+    newer, newer_errors = newer_args
+    if older_errors is None or newer_errors is None:
+        compile_errors = None
+    elif newer is None:
+        compile_errors = newer_errors
+    else:
+        touched = set(newer.paths())
+        compile_errors = [error for error in older_errors if error.file_path not in touched] + newer_errors
+    return (_merge_change_sets(older, newer), compile_errors)
+
+def queue_hot_swap(changes=None) -> None:
+    """Asks for a hot swap on Blender's main thread. This is what the monitor calls from its own thread, since
+    `reload_modules` uses `bpy.ops` and the preferences. Changes saved while an earlier request is still waiting are
+    added to it rather than starting another swap.
+
+    The changed modules are compiled here, on the calling thread, so Blender's main thread only waits for the swap
+    itself.
+    """
+    compile_errors = preflight_compile(modules_to_check(monitor.directory, changes)) if monitor.directory else None
+    main_thread.submit("Hotswap", run_hot_swap, changes, compile_errors, merge=merge_changes)
+
+def run_hot_swap(changes=None, compile_errors=None) -> None:
+    """Hot swaps the whole workspace when the `monitor_workspace` preference is on, otherwise the one monitored
+    add-on."""
+    if bpy.context.preferences.addons[__package__].preferences.monitor_workspace:
+        reload_workspace(changes, compile_errors)
+    else:
+        reload_modules(changes, compile_errors)
+
+def reload_workspace(changes=None, compile_errors=None) -> None:
+    """Hot swaps every add-on in the workspace folder `monitor_path` that `changes` touches, or all of them without
+    `changes`. The add-ons are found by `workspace.Workspace`, and each is swapped like `reload_modules` swaps one.
+
+    The add-ons are swapped together by `swap_addons`, so their files are copied at once. `compile_errors` from
+    `queue_hot_swap` are split between them. Without it, each add-on compiles its own changed modules.
+    """
+    workspace_path = bpy.context.preferences.addons[__package__].preferences.monitor_path
+    if not os.path.isdir(workspace_path):
+        message.workspace_must_be_folder()
+        return
+
+    workspace = _workspaces.get(workspace_path)
+    if workspace is None:
+        workspace = _workspaces[workspace_path] = Workspace(workspace_path)
+    if changes is None:
+        workspace.discover()
+        affected = {addon_path: None for addon_path in workspace.addons}
+    else:
+        affected = workspace.split_changes(changes)
+    if not affected:
+        return
+    message.workspace_hot_swap(affected)
+
+    addon_errors = {addon_path: [] if compile_errors is not None else None for addon_path in affected}
+    for error in compile_errors or ():
+        owner = workspace.owner(error.file_path)
+        if owner in addon_errors:   # Files outside the add-ons are never installed
+            addon_errors[owner].append(error)
+
+    installed = bpy.context.preferences.addons.keys()
+    requests = []
+    for addon_path, addon_changes in affected.items():
+        old_addon_name = workspace.installed.get(addon_path)
+        if old_addon_name is None:
+            # Not swapped since the workspace was opened, so it is enabled under its current name or not at all
+            old_addon_name = create_addon_name(get_most_recent_bl_name_info(addon_path))
+            old_addon_name = old_addon_name if old_addon_name in installed else ""
+        requests.append((addon_path, old_addon_name, addon_changes, addon_errors[addon_path]))
+
+    for (addon_path, _, _, _), addon_name in zip(requests, swap_addons(requests)):
+        if addon_name:
+            workspace.installed[addon_path] = create_addon_name(addon_name)
+
+def reload_modules(changes=None, compile_errors=None) -> None:
     """Reloads a specified add-on back into Blender by disabling, reinstalling, and enabling it again.
+
+    When `changes` (the monitor's `ChangeSet`) only touches modules without registration code, and the add-on is
+    already enabled under the same name, just those modules and the ones importing them are reloaded instead. This is
+    much faster on large add-ons. Turn it off with the `hot_swap_partial_reload` preference.
     
     Trying to hot swap an empty package or the debugger itself will throw an error message. Because these errors are
         uncorrectable without changing settings, monitoring stops.
     
+    Every changed module is compiled first, unless `compile_errors` already holds the result. If one has a syntax
+        error, its location is printed and the add-on that is already loaded is left alone.
+
     An error that occurs within a hot reloaded script will print the error to the console and continue to monitor. This
         allows the user to correct the script and try again.  
+
+    Every swap is timed phase by phase and recorded in `swap_profiler.profiler`.
+
+    Must run on Blender's main thread. Use `queue_hot_swap` to request one from another thread.
     """
 
-    try:
-        # Get the required information
-        addon_path = bpy.context.preferences.addons[__package__].preferences.monitor_path
-        old_addon_name = bpy.context.preferences.addons[__package__].preferences.monitor_addon_filename
+    prefs = bpy.context.preferences.addons[__package__].preferences
+    addon_name = swap_addon(prefs.monitor_path, prefs.monitor_addon_filename, changes, compile_errors)
+    if addon_name is None:
+        return
 
-        addon_name = get_most_recent_bl_name_info(addon_path)
-        addon_filename = create_addon_name(addon_name)
+    # Update the preferences for use in other parts of the add-on
+    addon_filename = create_addon_name(addon_name)
+    update_scripting_assistant_preference_addon_name(addon_name)
+    update_scripting_assistant_preference_addon_filename(addon_filename)
 
-        # Update the preferences for use in other parts of the add-on
-        update_scripting_assistant_preference_addon_name(addon_name)
-        update_scripting_assistant_preference_addon_filename(addon_filename)
+    if addon_filename == __package__ and prefs.monitor_path != "":
+        # Hot swapping the debugger is refused every time, so stop monitoring until the user picks another path
+        prefs.monitor_path = ""
+        monitor.secure()
 
+def swap_addon(addon_path: str, old_addon_name: str, changes=None, compile_errors=None):
+    """Hot swaps the add-on whose source is `addon_path`, and which is installed in Blender as `old_addon_name` (an
+    empty string if it is not installed yet). See `reload_modules` for how.
+
+    Pass `compile_errors` when the changed modules were already compiled, to skip compiling them again.
+
+    Returns the add-on's `bl_info` name, which is empty if it has none, or None if it did not compile and was left
+    alone. The changes of a swap that did not compile are kept, and added to the next swap of the same add-on.
+    """
+    return swap_addons([(addon_path, old_addon_name, changes, compile_errors)])[0]
+
+def swap_addons(requests) -> list:
+    """Hot swaps several add-ons at once. Each request is the `(addon_path, old_addon_name, changes, compile_errors)`
+    that `swap_addon` takes, and the `bl_info` names are returned in the same order.
+
+    Every add-on is disabled and purged first, then their files are copied together on the sync thread pool, and then
+    they are enabled again in the order requested. Only the copies leave the main thread, since they never touch
+    Blender's API. An add-on that does not compile or fails to enable never holds back the others.
+    """
+    swaps = [_AddonSwap(*request) for request in requests]
+    for swap in swaps:
+        swap.run(swap.prepare)
+        swap.run(swap.tear_down)
+
+    copying = [swap for swap in swaps if swap.pending]
+    if len(copying) == 1:
+        copying[0].run(copying[0].install)
+    elif copying:
+        list(_sync_pool().map(lambda swap: swap.run(swap.install), copying))
+
+    names = []
+    for swap in swaps:
+        swap.run(swap.enable)
+        names.append(swap.finish())
+    return names
+
+def _sync_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = concurrent.futures.ThreadPoolExecutor(max_workers=SYNC_WORKERS, thread_name_prefix="HotSwap-sync")
+        return _pool
+
+class _AddonSwap(object):
+    """The hot swap of one add-on, in the steps `swap_addons` runs. Only `install` may run off the main thread."""
+
+    def __init__(self, addon_path: str, old_addon_name: str, changes=None, compile_errors=None):
+        self.unchecked = []
+        if addon_path in _refused_changes:
+            refused = _refused_changes.pop(addon_path)
+            if changes is not None and compile_errors is not None:
+                # Only the new changes were compiled by the caller
+                checked = set(modules_to_check(addon_path, changes))
+                self.unchecked = [file_path for file_path in modules_to_check(addon_path, refused)
+                    if file_path not in checked]
+            changes = _merge_change_sets(refused, changes)
+
+        self.addon_path = addon_path
+        self.old_addon_name = old_addon_name
+        self.changes = changes
+        self.compile_errors = compile_errors
+        self.addon_name = None
+        self.addon_filename = ""
+        self.blender_addon_path = ""
+        self.refresh = False
+        self.pending = True     # False once the swap is over, whether it went through or stopped early
+        self.profile = profiler.start(changes)
+        self.profile.queue_wait = main_thread.current_wait()
+
+    def run(self, step) -> None:
+        """Runs one step, unless the swap is already over."""
+        if not self.pending:
+            return
+        try:
+            step()
+        except Exception as error:
+            # There is no need to capture and print the specific error here because Blender does that to the Console
+            #   anyway just before this except statement runs.
+            # HOWEVER, the monitor DOES NOT STOP. This allows the user to correct whatever problem they introduced and
+            #   get it easily reloaded once it works again.
+            self.pending = False
+            print("A general exception occurred during hot swap: ", error)
+            message.blender_error()
+
+    def finish(self):
+        """Records the profile, and returns what `swap_addon` returns."""
+        profiler.finish(self.profile)
+        return self.addon_name
+
+    def prepare(self) -> None:
+        profile = self.profile
+        addon_path = self.addon_path
+        # Make sure the new code at least compiles before anything is torn down. If it does not, the version that is
+        #   loaded now keeps working while the user fixes the error.
+        if addon_path != "":
+            compile_errors = self.compile_errors
+            if compile_errors is None:
+                with profile.phase("preflight"):
+                    compile_errors = preflight_compile(modules_to_check(addon_path, self.changes))
+            elif self.unchecked:
+                with profile.phase("preflight"):
+                    compile_errors = list(compile_errors) + preflight_compile(self.unchecked)
+            if compile_errors:
+                # Nothing of this swap is installed, so the valid changes in it must still be once the errors are fixed
+                _refused_changes[addon_path] = self.changes
+                profile.outcome = "compile error"
+                message.preflight_failed(compile_errors)
+                self.pending = False
+                return
+
+        with profile.phase("bl_info"):
+            self.addon_name = get_most_recent_bl_name_info(addon_path)
+        addon_filename = self.addon_filename = create_addon_name(self.addon_name)
+
+        self.pending = False    # Until the checks below pass
+        profile.outcome = "skipped"
         if addon_path == "":
             # No way to even begin monitoring in this condition, so we can stop here.
             message.monitor_path_cannot_be_empty()
@@ -117,15 +542,26 @@ def reload_modules() -> None:
             #   crash with no warning or indication of what went wrong. This check prevents that while informing the
             #   user why it won't let them do this within the terminal.
             message.cannot_hotswap_debugger()
-            bpy.context.preferences.addons[__package__].preferences.monitor_path = ""
-            monitor.secure()
             return
 
-        blender_addon_path = os.path.join(bpy.utils.script_path_user(), "addons")
+        profile.outcome = "error"     # Until the swap completes
+        partial_allowed = bpy.context.preferences.addons[__package__].preferences.hot_swap_partial_reload
+        if self.changes is not None and partial_allowed and self.old_addon_name == addon_filename \
+                and partial_reload(addon_path, addon_filename, self.changes.paths(), profile):
+            profile.outcome = "success"
+            return
+
+        self.blender_addon_path = os.path.join(bpy.utils.script_path_user(), "addons")
+        self.pending = True
+
+    def tear_down(self) -> None:
+        profile = self.profile
+        old_addon_name = self.old_addon_name
 
         # Disable the old add-on. MUST make sure to not delete the scripting assistant add-on itself.
         if old_addon_name in bpy.context.preferences.addons.keys() and old_addon_name != __package__:
-            bpy.ops.preferences.addon_disable(module=old_addon_name)
+            with profile.phase("disable"):
+                bpy.ops.preferences.addon_disable(module=old_addon_name)
             message.hotswap_omitted_disabled_addon()
 
         # After disabling within Blender, we have to remove any of the old files. Unfortunately, Python doesn't
@@ -134,15 +570,18 @@ def reload_modules() -> None:
         #   just move on.
         # Also, MUST make sure to not delete the scripting assistant add-on itself.
         if old_addon_name != "" and old_addon_name != __package__:
-            try:
-                os.remove(os.path.join(blender_addon_path, old_addon_name + ".py"))
-            except:
+            with profile.phase("remove"):
                 try:
-                    shutil.rmtree(os.path.join(blender_addon_path, old_addon_name))
+                    os.remove(os.path.join(self.blender_addon_path, old_addon_name + ".py"))
                 except:
-                    pass
-            else:
-                message.hotswap_omitted_disabling_unfound_addon()
+                    # A package add-on that kept its name stays installed, and only its changed files are synced below
+                    if old_addon_name != self.addon_filename or not os.path.isdir(self.addon_path):
+                        try:
+                            shutil.rmtree(os.path.join(self.blender_addon_path, old_addon_name))
+                        except:
+                            pass
+                else:
+                    message.hotswap_omitted_disabling_unfound_addon()
 
         # Figure out which modules this add-on has loaded. We have to delete them out of the `sys` object to make
         #   hot swap actually work. Otherwise, when we reload the add-on using `bpy.ops.preferences.addon_refresh()`,
@@ -151,34 +590,43 @@ def reload_modules() -> None:
         #   other submodules.
         # Inspiration for this solution taken from here:
         #   https://blender.stackexchange.com/questions/28504/blender-ignores-changes-to-python-scripts
-        addon_modules = []
-        for key in sys.modules.keys():
-            if key.startswith(old_addon_name) and old_addon_name != "":
-                # If old_addon_name is an empty string, this will end up deleting all modules and crash Blender.
-                addon_modules.append(key)
-
-        for module in addon_modules:    # Split logic from above to prevent issues with modifying an iterating for loop
-            del sys.modules[module]
-
-        # Install the current add-on by copying it into the correct Blender add-on directory
-        bpy.ops.preferences.addon_refresh()
-        if os.path.isfile(addon_path):
-            shutil.copy2(addon_path, blender_addon_path)
-        else:
-            shutil.copytree(addon_path, os.path.join(blender_addon_path, addon_filename), dirs_exist_ok=True)
+        if old_addon_name != "":
+            # If old_addon_name is an empty string, this would end up deleting all modules and crash Blender.
+            with profile.phase("purge"):
+                profile.modules_purged = len(purge_addon_modules(old_addon_name))
+
+        # Blender only has to rescan every installed add-on when this one shows up under a new file or folder name.
+        #   Otherwise it is enabled directly, which costs the same no matter how many add-ons are installed.
+        self.refresh = old_addon_name != self.addon_filename
+        if self.refresh:
+            with profile.phase("refresh"):
+                bpy.ops.preferences.addon_refresh()
+
+    def install(self) -> None:
+        # Install the current add-on by copying it into the correct Blender add-on directory. Only files are touched
+        #   here, so several add-ons may install at once on the sync thread pool.
+        profile = self.profile
+        with profile.phase("copy"):
+            if os.path.isfile(self.addon_path):
+                shutil.copy2(self.addon_path, self.blender_addon_path)
+                profile.bytes_copied = os.path.getsize(self.addon_path)
+            else:
+                report = sync_addon(self.addon_path, os.path.join(self.blender_addon_path, self.addon_filename))
+                profile.bytes_copied = report.bytes_copied
+                message.synced_addon_files(report)
 
-        # Refresh Blender's add-on list to pull in the new files, then enable the add-on
+    def enable(self) -> None:
+        # Refresh Blender's add-on list to pull in the new files if needed, then enable the add-on
+        profile = self.profile
         try:
-            bpy.ops.preferences.addon_refresh()
-            bpy.ops.preferences.addon_enable(module=addon_filename)
+            if self.refresh:
+                with profile.phase("refresh"):
+                    bpy.ops.preferences.addon_refresh()
+            start_import_tracking(self.addon_filename)
+            with profile.phase("enable"):
+                enable_addon(self.addon_filename, use_operator=self.refresh)
         except Exception as error:
             print("An exception occured while reenabling the add-on: ", error)
+        else:
+            profile.outcome = "success"
         message.hotswap_successful()
-
-    except Exception as error:
-        # There is no need to capture and print the specific error here because Blender does that to the Console anyway
-        #   just before this except statement runs.
-        # HOWEVER, the monitor DOES NOT STOP. This allows the user to correct whatever problem they introduced and get
-        #   it easily reloaded once it works again.
-        print("A general exception occurred during hot swap: ", error)
-        message.blender_error()
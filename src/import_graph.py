@@ -0,0 +1,328 @@
+"""
+Import Graph
+
+Finds which modules of a package add-on are actually imported, starting from its `__init__.py`. Only those modules can
+affect the add-on when it is reloaded, so the DirectoryMonitor can ignore everything else in the folder (tests, docs,
+build scripts) without the user listing it.
+
+Imports are read statically with `ast`, without running any code. Relative imports (`from . import x`,
+`from ..utils import y`) and absolute imports of the package by its own name (`import my_addon.utils`) are followed.
+Imports inside functions count too. Modules loaded by computed names, such as `importlib.import_module(name)`, cannot
+be seen and have to be declared as data patterns instead.
+
+The hot swap uses the same graph to reload only the modules a change affects, see `reload_order`.
+"""
+
+import ast
+import os
+
+from .directory_snapshot import relative_path, stat_signature
+from .path_filter import PathFilter
+
+PACKAGE_INIT = "__init__.py"
+
+
+def _module_file(package_root: str, module_parts) -> str:
+    # Returns the file for a module inside the package, or an empty string if there is none
+    base = os.path.join(package_root, *module_parts) if module_parts else package_root
+    if os.path.isfile(os.path.join(base, PACKAGE_INIT)):
+        return os.path.join(base, PACKAGE_INIT)
+    if module_parts and os.path.isfile(base + ".py"):
+        return base + ".py"
+    return ""
+
+
+def _read_imports(file_path: str, package_root: str) -> tuple:
+    # Returns (module files imported, module files that names are imported from with 'from module import name')
+    with open(file_path, "rb") as file:
+        tree = ast.parse(file.read(), file_path)
+
+    package_name = os.path.basename(package_root)
+    module_folder = os.path.relpath(os.path.dirname(file_path), package_root)
+    module_package = [] if module_folder == os.curdir else module_folder.split(os.sep)
+
+    imported = []   # Module paths relative to the package root, as lists of names. [] is the package itself.
+    name_sources = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                parts = alias.name.split(".")
+                if parts[0] == package_name:
+                    imported.append(parts[1:])
+            continue
+        if not isinstance(node, ast.ImportFrom):
+            continue
+
+        if node.level:
+            if node.level - 1 > len(module_package):
+                continue    # Reaches above the package
+            module = module_package[:len(module_package) - (node.level - 1)]
+            module += node.module.split(".") if node.module else []
+        elif node.module and node.module.split(".")[0] == package_name:
+            module = node.module.split(".")[1:]
+        else:
+            continue
+
+        if module:
+            imported.append(module)
+        for alias in node.names:
+            if alias.name != "*" and _module_file(package_root, module + [alias.name]):
+                imported.append(module + [alias.name])  # 'from . import operators' imports a submodule
+            else:
+                name_sources.append(module)
+                if not module:
+                    imported.append(module)     # 'from . import bl_info' reads a name from the package itself
+
+    def module_files(modules) -> set:
+        files = set()
+        for module in modules:
+            if not module:
+                files.add(os.path.join(package_root, PACKAGE_INIT))
+            for depth in range(1, len(module) + 1):
+                module_file = _module_file(package_root, module[:depth])
+                if module_file:
+                    files.add(module_file)
+        files.discard(file_path)
+        return files
+
+    return module_files(imported), {_module_file(package_root, module) for module in name_sources} - {"", file_path}
+
+
+def module_imports(file_path: str, package_root: str) -> set:
+    """Returns the files inside the package at `package_root` that `file_path` imports.
+
+    Importing a submodule also imports every package above it, so their `__init__.py` files are included. Raises
+    SyntaxError or OSError if the file cannot be read and parsed.
+    """
+    return _read_imports(file_path, package_root)[0]
+
+
+_REGISTRATION_CALLS = {"register_class", "unregister_class", "register_module", "unregister_module",
+    "register_classes_factory"}
+
+
+def _dotted_name(node) -> str:
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        base = _dotted_name(node.value)
+        return base + "." + node.attr if base else ""
+    return ""
+
+
+def defines_registration(file_path: str) -> bool:
+    """Returns True if the module takes part in registering with Blender: it has top level `register()` or
+    `unregister()` functions, subclasses a `bpy.types` class, or calls `bpy.utils.register_class` and friends.
+
+    Reloading such a module leaves Blender holding the classes from before, so it needs the full disable and enable
+    cycle. A file that cannot be parsed counts as registration code too.
+    """
+    try:
+        with open(file_path, "rb") as file:
+            tree = ast.parse(file.read(), file_path)
+    except (SyntaxError, ValueError, OSError):
+        return True
+
+    bpy_type_names = set()
+    for node in tree.body:
+        if isinstance(node, ast.FunctionDef) and node.name in ("register", "unregister"):
+            return True
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom) and node.module == "bpy.types":
+            bpy_type_names.update(alias.asname or alias.name for alias in node.names)
+        elif isinstance(node, ast.ClassDef):
+            for base in node.bases:
+                base_name = _dotted_name(base)
+                if base_name.startswith("bpy.types.") or base_name.startswith("types.") \
+                        or base_name in bpy_type_names:
+                    return True
+        elif isinstance(node, ast.Call):
+            if _dotted_name(node.func).split(".")[-1] in _REGISTRATION_CALLS:
+                return True
+    return False
+
+
+class ImportGraph(object):
+    """The static import graph of the package at `package_root`, and the set of files reachable from its
+    `__init__.py`.
+
+    Parsed imports are cached against each file's stat signature, so `update()` only re-reads modules that changed.
+    """
+
+    def __init__(self, package_root: str):
+        self.package_root = package_root
+        self.imports = {}           # Module file -> set of module files it imports
+        self.files = frozenset()    # Every module reachable from the package's __init__.py
+        self.folders = frozenset()  # Relative paths of the folders that contain a reachable module
+        self.relative_files = frozenset()
+        self._signatures = {}       # Module file -> stat signature its imports were read at
+
+    @staticmethod
+    def is_package(folder_path: str) -> bool:
+        return os.path.isfile(os.path.join(folder_path, PACKAGE_INIT))
+
+    def _read(self, file_path: str) -> None:
+        try:
+            signature = stat_signature(os.stat(file_path))
+        except OSError:
+            self.imports.pop(file_path, None)
+            self._signatures.pop(file_path, None)
+            return
+        if self._signatures.get(file_path) == signature:
+            return
+
+        try:
+            self.imports[file_path] = module_imports(file_path, self.package_root)
+        except (SyntaxError, ValueError, OSError):
+            # Usually a file saved part way through an edit. Keep what it imported before until it parses again.
+            self.imports.setdefault(file_path, set())
+        self._signatures[file_path] = signature
+
+    def build(self) -> bool:
+        """Walks the imports from `__init__.py` and updates the reachable set. Returns True if the set changed."""
+        root_file = os.path.join(self.package_root, PACKAGE_INIT)
+        reachable = set()
+        pending_files = [root_file] if os.path.isfile(root_file) else []
+        while pending_files:
+            file_path = pending_files.pop()
+            if file_path in reachable:
+                continue
+            reachable.add(file_path)
+            self._read(file_path)
+            pending_files.extend(self.imports.get(file_path, ()))
+
+        for file_path in list(self.imports):
+            if file_path not in reachable:
+                del self.imports[file_path]
+                self._signatures.pop(file_path, None)
+
+        if reachable == self.files:
+            return False
+
+        relative_files = set()
+        folders = set()
+        for file_path in reachable:
+            file_relative = relative_path(file_path, self.package_root)
+            relative_files.add(file_relative)
+            parts = file_relative.split("/")
+            for depth in range(1, len(parts)):
+                folders.add("/".join(parts[:depth]))
+
+        # Replaced rather than changed in place, so threads reading them always see a complete set
+        self.relative_files = frozenset(relative_files)
+        self.folders = frozenset(folders)
+        self.files = frozenset(reachable)
+        return True
+
+    def update(self, changed_paths) -> bool:
+        """Re-reads the imports of any reachable module in `changed_paths`. Returns True if the reachable set
+        changed."""
+        if not any(path in self.files for path in changed_paths):
+            return False
+        return self.build()
+
+    def importers(self, file_path: str) -> set:
+        """Returns every reachable module that imports `file_path` directly."""
+        return {importer for importer, imported in self.imports.items() if file_path in imported}
+
+
+def reload_order(graph: ImportGraph, changed_paths, is_loaded=None):
+    """Returns the modules to reload for a change to `changed_paths`, dependencies before the modules that import
+    them, or None if the change needs the full disable and enable cycle instead.
+
+    `is_loaded(file_path)` tells whether a module is imported right now. Without it, every module is assumed to be.
+
+    The changed modules are reloaded along with every module that imports them, directly or not, since those hold
+    references to the old versions. The package's `__init__.py` is never reloaded on its own. The full cycle is needed
+    when:
+    - `__init__.py` changed, or it imports names (rather than modules) from a module that is reloaded
+    - A reloaded module contains registration code (see `defines_registration`)
+    - A file other than a Python module changed, since the add-on may have read it while registering
+    - The reloaded modules import each other in a cycle
+    - A changed module is loaded, but no import the graph can follow reaches it. It was imported some other way, such
+      as with `importlib.import_module`, so what holds on to it is unknown.
+    Changed modules that are not loaded are skipped, since the next import reads the new version anyway.
+    """
+    root_file = os.path.join(graph.package_root, PACKAGE_INIT)
+    graph.build()
+
+    changed_modules = set()
+    for file_path in changed_paths:
+        if file_path == root_file or not file_path.endswith(".py"):
+            return None
+        if file_path in graph.files:
+            changed_modules.add(file_path)
+        elif is_loaded is None or is_loaded(file_path):
+            return None
+    if not changed_modules:
+        return []
+
+    affected = set(changed_modules)
+    pending_modules = list(changed_modules)
+    while pending_modules:
+        for importer in graph.importers(pending_modules.pop()):
+            if importer != root_file and importer not in affected:
+                affected.add(importer)
+                pending_modules.append(importer)
+
+    if any(defines_registration(file_path) for file_path in affected):
+        return None
+    try:
+        if _read_imports(root_file, graph.package_root)[1] & affected:
+            return None
+    except (SyntaxError, ValueError, OSError):
+        return None
+
+    order = []
+    remaining = set(affected)
+    while remaining:
+        ready = sorted(file_path for file_path in remaining
+            if not (graph.imports.get(file_path, set()) & remaining) - {file_path})
+        if not ready:
+            return None
+        order.extend(ready)
+        remaining.difference_update(ready)
+    return order
+
+
+class ReachableFilter(object):
+    """A `PathFilter` that only tracks the modules an `ImportGraph` can reach, plus files matching `data_patterns`.
+
+    The rules of `base_filter` still apply first. Without data patterns, folders that hold no reachable module are
+    never descended into. With data patterns the whole tree is listed, but only matching files are stat'ed.
+    """
+
+    def __init__(self, base_filter: PathFilter, graph: ImportGraph, data_patterns=()):
+        self.base_filter = base_filter
+        self.graph = graph
+        self.data_patterns = tuple(data_patterns)
+        self._data_filter = PathFilter(include=self.data_patterns, exclude=()) if self.data_patterns else None
+
+        # The daemon backend starts its own watcher with these rules
+        self.include = base_filter.include
+        self.exclude = base_filter.exclude
+        self.ignore_file = base_filter.ignore_file
+
+    def key(self) -> str:
+        return repr((self.base_filter.key(), "import reachable", self.data_patterns))
+
+    def excludes_folder(self, relative_path: str, name: str) -> bool:
+        if self.base_filter.excludes_folder(relative_path, name):
+            return True
+        return self._data_filter is None and relative_path not in self.graph.folders
+
+    def includes_file(self, relative_path: str, name: str) -> bool:
+        if not self.base_filter.includes_file(relative_path, name):
+            return False
+        if relative_path in self.graph.relative_files:
+            return True
+        return self._data_filter is not None and self._data_filter.includes_file(relative_path, name)
+
+    def includes_path(self, relative_path: str, is_folder: bool) -> bool:
+        parts = relative_path.split("/")
+        for depth in range(len(parts) - 1):
+            if self.excludes_folder("/".join(parts[:depth + 1]), parts[depth]):
+                return False
+        if is_folder:
+            return not self.excludes_folder(relative_path, parts[-1])
+        return self.includes_file(relative_path, parts[-1])
@@ -0,0 +1,57 @@
+"""
+Import Tracker
+
+Records exactly which modules of one package get imported, so a hot swap can purge them from `sys.modules` without
+scanning every loaded module, and without touching other add-ons whose names merely start the same way (`foo` and
+`foobar`).
+
+The tracker is a `sys.meta_path` finder that never finds anything itself. Python asks it about every module that is
+not imported yet, it notes the names that belong to the package, and the regular finders then load the module as
+usual.
+"""
+
+import importlib.abc
+import sys
+import threading
+
+
+class ImportTracker(importlib.abc.MetaPathFinder):
+    """Records the names of `package_name` and its submodules as they are imported, while installed."""
+
+    def __init__(self, package_name: str):
+        self.package_name = package_name
+        self._prefix = package_name + "."
+        self._modules = set()
+        self._lock = threading.Lock()
+
+    def find_spec(self, fullname, path, target=None):
+        if fullname == self.package_name or fullname.startswith(self._prefix):
+            with self._lock:
+                self._modules.add(fullname)
+        return None     # Leave the loading to the finders after this one
+
+    @property
+    def installed(self) -> bool:
+        return self in sys.meta_path
+
+    def install(self) -> None:
+        """Starts recording. Goes first in `sys.meta_path` so no other finder can hide an import from it."""
+        if not self.installed:
+            sys.meta_path.insert(0, self)
+
+    def uninstall(self) -> set:
+        """Stops recording, and returns the module names recorded while installed."""
+        while self in sys.meta_path:
+            sys.meta_path.remove(self)
+        return self.modules()
+
+    def modules(self) -> set:
+        with self._lock:
+            return set(self._modules)
+
+
+def package_modules(package_name: str) -> list:
+    """Returns the loaded modules of `package_name` by scanning `sys.modules`. For when nothing was tracked, e.g. an
+    add-on Blender enabled at startup. Only the package itself and names under `package_name.` match."""
+    prefix = package_name + "."
+    return [name for name in list(sys.modules) if name == package_name or name.startswith(prefix)]
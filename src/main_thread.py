@@ -0,0 +1,164 @@
+"""
+Main Thread
+
+Blender's API is only safe to use from its main thread, but the monitor notices changes on its own background thread.
+This module hands work from one to the other. Background threads `submit()` jobs, and a timer registered with
+`bpy.app.timers` runs them on the main thread between redraws:
+
+    from .main_thread import main_thread
+    main_thread.submit("Hotswap", run_hot_swap, changes, compile_errors, merge=merge_changes)
+
+A job submitted under a key that is already waiting is coalesced with it, so a burst of saves still runs one hot swap.
+Nothing runs while Blender is rendering or, from Blender 4.2, while a modal operator (a transform, a file browser,
+...) is active. Those jobs wait until Blender is idle again. How long each job waited is recorded, and a long wait is
+printed.
+"""
+
+import collections
+import threading
+import time
+import traceback
+
+import bpy
+
+from .console_messages.main_thread import MainThreadMessages as message
+
+PUMP_INTERVAL = .1          # Seconds between checks for waiting jobs
+REPORT_WAIT = 1.0           # Jobs that waited longer than this many seconds are reported
+HISTORY_LENGTH = 50         # Number of recent job runs kept
+
+# One run of a job. `wait` is the seconds from its first submission to when it started, and `duration` how long it ran.
+#   `coalesced` counts the extra submissions folded into it.
+JobRun = collections.namedtuple("JobRun", ["key", "wait", "duration", "coalesced", "error"])
+
+
+def blender_busy_reason() -> str:
+    """Returns why Blender should not be interrupted right now ('rendering' or 'modal operator'), or an empty string
+    if it is idle.
+
+    Windows only list their running modal operators from Blender 4.2. Earlier versions only wait for renders, and a job
+    may run while a modal operator is active.
+    """
+    is_job_running = getattr(bpy.app, "is_job_running", None)
+    if is_job_running is not None and is_job_running("RENDER"):
+        return "rendering"
+    window_manager = getattr(bpy.context, "window_manager", None)
+    if window_manager is not None:
+        for window in window_manager.windows:
+            if getattr(window, "modal_operators", None):    # Missing before Blender 4.2
+                return "modal operator"
+    return ""
+
+
+class _Job(object):
+    __slots__ = ("function", "args", "merge", "queued", "coalesced")
+
+    def __init__(self, function, args, merge):
+        self.function = function
+        self.args = args
+        self.merge = merge
+        self.queued = time.perf_counter()
+        self.coalesced = 0
+
+
+class MainThreadQueue(object):
+    """Jobs waiting to run on Blender's main thread, in the order they were first submitted."""
+
+    def __init__(self, busy_reason=blender_busy_reason, history_length: int = HISTORY_LENGTH):
+        self.busy_reason = busy_reason      # Returns a non-empty reason while jobs must wait
+        self._jobs = collections.OrderedDict()  # Key -> _Job
+        self._lock = threading.Lock()
+        self._history = collections.deque(maxlen=history_length)
+        self._running = None
+        self._deferred_for = ""         # The busy reason already printed, so it is only printed once per wait
+        self._timer = self._pump        # Timers are told apart by the function object, so it is read only once
+
+    def submit(self, key: str, function, *args, merge=None) -> None:
+        """Queues `function(*args)` to run on the main thread. Safe to call from any thread.
+
+        If a job with the same `key` is still waiting, the two are coalesced. Without `merge`, the newer arguments
+        replace the older ones. With it, `merge(older_args, newer_args)` returns the arguments to run with. The job
+        keeps its place in the queue, and its wait is measured from the first submission.
+        """
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is None:
+                self._jobs[key] = _Job(function, args, merge)
+                return
+            job.function = function
+            job.args = merge(job.args, args) if merge is not None else args
+            job.coalesced += 1
+
+    def pending(self) -> list:
+        """Returns the keys of the jobs waiting to run, oldest first."""
+        with self._lock:
+            return list(self._jobs)
+
+    def cancel(self, key: str) -> bool:
+        """Drops a waiting job. Returns False if there was none."""
+        with self._lock:
+            return self._jobs.pop(key, None) is not None
+
+    def current_wait(self) -> float:
+        """Returns how many seconds the job that is running now waited in the queue, or 0 outside of a job."""
+        running = self._running
+        return running[1] if running is not None else 0.0
+
+    def run_pending(self) -> int:
+        """Runs every job that is waiting, unless Blender is busy. Must be called on the main thread. Returns the
+        number of jobs run. A job that raises is reported and does not stop the ones after it."""
+        with self._lock:
+            if not self._jobs:
+                return 0
+        reason = self.busy_reason()
+        if reason:
+            if reason != self._deferred_for:
+                self._deferred_for = reason
+                message.jobs_deferred(self.pending(), reason)
+            return 0
+        self._deferred_for = ""
+
+        with self._lock:
+            jobs = list(self._jobs.items())
+            self._jobs.clear()
+        for key, job in jobs:
+            wait = time.perf_counter() - job.queued
+            if wait > REPORT_WAIT:
+                message.job_waited(key, wait, job.coalesced)
+            error = None
+            self._running = (key, wait)
+            start = time.perf_counter()
+            try:
+                job.function(*job.args)
+            except Exception as exception:
+                error = exception
+                message.job_failed(key)
+                traceback.print_exc()
+            finally:
+                self._running = None
+            self._history.append(JobRun(key, wait, time.perf_counter() - start, job.coalesced, error))
+        return len(jobs)
+
+    def history(self) -> list:
+        """Returns the recorded `JobRun`s, oldest first."""
+        return list(self._history)
+
+    def _pump(self):
+        self.run_pending()
+        return PUMP_INTERVAL
+
+    def start(self) -> None:
+        """Registers the timer that runs the queue. Call it from the main thread, when the add-on is registered."""
+        if not bpy.app.timers.is_registered(self._timer):
+            bpy.app.timers.register(self._timer, first_interval=PUMP_INTERVAL, persistent=True)
+                # Persistent, so loading another .blend file does not stop hot swapping
+
+    def stop(self) -> None:
+        """Unregisters the timer. Jobs that are still waiting are dropped."""
+        if bpy.app.timers.is_registered(self._timer):
+            bpy.app.timers.unregister(self._timer)
+        with self._lock:
+            self._jobs.clear()
+
+
+main_thread = MainThreadQueue()
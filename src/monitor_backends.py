@@ -0,0 +1,442 @@
+"""
+Monitor Backends
+
+Event driven alternatives to polling for the DirectoryMonitor. A backend is told which path to watch and calls back
+with the paths the operating system reports as changed, so the monitor never has to rescan the whole tree while idle.
+
+Backends that cannot be used (wrong platform, watch limit exhausted, network share) raise `BackendUnavailable` from
+`start()`, and the monitor falls back to polling.
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import multiprocessing
+import multiprocessing.connection
+import os
+import select
+import struct
+import sys
+import threading
+import time
+
+from .directory_snapshot import relative_path
+from . import watcher_daemon
+
+
+class BackendUnavailable(Exception):
+    """Raised when an event backend cannot watch the requested path. The message explains why."""
+
+
+class EventBackend(object):
+    """Base class for event driven monitor backends.
+
+    `on_changes(paths)` is called from the backend thread with a set of paths that changed. `on_overflow()` is called
+    when the operating system dropped events, which means the monitor has to rescan everything. `on_unavailable(reason)`
+    is called if the backend has to stop on its own while running, so the monitor can fall back to polling.
+
+    Backends should not watch folders that the optional `path_filter` excludes.
+    """
+
+    name = ""
+    automatic = True    # Whether the 'auto' backend setting may pick this backend
+
+    def __init__(self, file_or_folder_path: str, on_changes, on_overflow, on_unavailable, path_filter=None):
+        self.path = file_or_folder_path
+        self._on_changes = on_changes
+        self._on_overflow = on_overflow
+        self._on_unavailable = on_unavailable
+        self._path_filter = path_filter
+        self._thread = None
+
+    @staticmethod
+    def is_supported() -> bool:
+        return False
+
+    def start(self) -> None:
+        raise BackendUnavailable("The '" + self.name + "' backend is not implemented.")
+
+    def stop(self) -> None:
+        pass
+
+    def is_alive(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+
+###############################################################
+# Linux inotify
+###############################################################
+
+# Values from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+
+_EVENT_HEADER = struct.Struct("iIII")    # wd, mask, cookie, len
+
+# A single save produces several events (create, modify, close). Keep reading while events arrive within this many
+#   seconds of each other so they are reported together, up to the maximum.
+EVENT_GROUPING_DELAY = .005
+EVENT_GROUPING_MAXIMUM = .05
+
+# inotify only sees changes made through the local kernel. Edits made on another machine never generate events.
+NETWORK_FILESYSTEMS = {"nfs", "nfs4", "cifs", "smb3", "smbfs", "ncpfs", "afs", "9p", "drvfs", "ceph", "glusterfs",
+    "fuse.sshfs", "fuse.rclone", "davfs", "fuse.davfs2"}
+
+_libc = None
+
+def _load_libc():
+    global _libc
+    if _libc is None:
+        _libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        _libc.inotify_init1.argtypes = [ctypes.c_int]
+        _libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        _libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+    return _libc
+
+def filesystem_type(path: str) -> str:
+    """Returns the filesystem type of the mount that holds `path`, or an empty string if it cannot be determined."""
+    try:
+        with open("/proc/self/mounts", "r") as mounts:
+            mount_table = [line.split() for line in mounts]
+    except OSError:
+        return ""
+
+    real_path = os.path.realpath(path)
+    best_mount = ""
+    best_type = ""
+    for fields in mount_table:
+        if len(fields) < 3:
+            continue
+        mount_point = fields[1].replace("\\040", " ")
+        if (real_path == mount_point or real_path.startswith(os.path.join(mount_point, ""))) \
+                and len(mount_point) > len(best_mount):
+            best_mount = mount_point
+            best_type = fields[2]
+    return best_type
+
+
+class InotifyBackend(EventBackend):
+    """Watches a file or folder tree with the Linux inotify API, loaded directly from libc through `ctypes`.
+
+    Every folder in the tree gets its own watch, and folders created or moved in later are picked up as they appear.
+    A single file is watched through its parent folder so that atomic saves (which replace the file) are still seen.
+    """
+
+    name = "inotify"
+
+    def __init__(self, file_or_folder_path: str, on_changes, on_overflow, on_unavailable, path_filter=None):
+        super().__init__(file_or_folder_path, on_changes, on_overflow, on_unavailable, path_filter)
+        self._fd = -1
+        self._wake_read = -1
+        self._wake_write = -1
+        self._watches = {}      # Watch descriptor -> folder path
+        self._single_file = ""
+        self._stopping = False
+
+    @staticmethod
+    def is_supported() -> bool:
+        if not sys.platform.startswith("linux"):
+            return False
+        try:
+            return hasattr(_load_libc(), "inotify_init1")
+        except OSError:
+            return False
+
+    def start(self) -> None:
+        if not self.is_supported():
+            raise BackendUnavailable("inotify is only available on Linux.")
+
+        fs_type = filesystem_type(self.path)
+        if fs_type in NETWORK_FILESYSTEMS:
+            raise BackendUnavailable("'" + self.path + "' is on a network filesystem (" + fs_type + ").")
+
+        libc = _load_libc()
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise BackendUnavailable("inotify_init1 failed: " + os.strerror(ctypes.get_errno()))
+
+        try:
+            if os.path.isfile(self.path):
+                self._single_file = self.path
+                self._add_watch(os.path.dirname(self.path) or ".")
+            else:
+                self._add_tree(self.path)
+        except BackendUnavailable:
+            self._close()
+            raise
+
+        self._wake_read, self._wake_write = os.pipe()
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="DirectoryMonitor-inotify", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopping = True
+        if self._wake_write >= 0:
+            try:
+                os.write(self._wake_write, b"x")
+            except OSError:
+                pass
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+    def _close(self) -> None:
+        for fd in (self._fd, self._wake_read, self._wake_write):
+            if fd >= 0:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+        self._fd = self._wake_read = self._wake_write = -1
+        self._watches.clear()
+
+    def _add_watch(self, folder_path: str) -> None:
+        wd = _load_libc().inotify_add_watch(self._fd, os.fsencode(folder_path), WATCH_MASK)
+        if wd < 0:
+            error_number = ctypes.get_errno()
+            if error_number == errno.ENOSPC:
+                raise BackendUnavailable("The inotify watch limit is exhausted. Raise fs.inotify.max_user_watches"
+                    + " to use event monitoring on this tree.")
+            if error_number in (errno.ENOENT, errno.ENOTDIR):
+                return  # Removed before we got to it. The parent's events already cover it.
+            raise BackendUnavailable("inotify_add_watch failed for '" + folder_path + "': "
+                + os.strerror(error_number))
+        self._watches[wd] = folder_path
+
+    def _add_tree(self, folder_path: str) -> None:
+        if self._path_filter is not None:
+            folder_relative = relative_path(folder_path, self.path)
+            if folder_relative and not self._path_filter.includes_path(folder_relative, True):
+                return
+            folder_relative = folder_relative + "/" if folder_relative else ""
+        else:
+            folder_relative = ""
+
+        pending_folders = [(folder_path, folder_relative)]
+        while pending_folders:
+            folder, folder_relative = pending_folders.pop()
+            self._add_watch(folder)
+            try:
+                with os.scandir(folder) as entries:
+                    for entry in entries:
+                        if not entry.is_dir(follow_symlinks=False):
+                            continue
+                        entry_relative = folder_relative + entry.name
+                        if self._path_filter is None or not self._path_filter.excludes_folder(entry_relative,
+                                entry.name):
+                            pending_folders.append((entry.path, entry_relative + "/"))
+            except OSError:
+                continue
+
+    def _read_events(self) -> tuple:
+        """Drains the inotify descriptor. Returns the set of changed paths, and whether events were lost."""
+        changed_paths = set()
+        overflow = False
+
+        while True:
+            try:
+                buffer = os.read(self._fd, 65536)
+            except BlockingIOError:
+                break
+            if not buffer:
+                break
+
+            offset = 0
+            while offset + _EVENT_HEADER.size <= len(buffer):
+                wd, mask, cookie, name_length = _EVENT_HEADER.unpack_from(buffer, offset)
+                offset += _EVENT_HEADER.size
+                name = buffer[offset:offset + name_length].split(b"\0", 1)[0]
+                offset += name_length
+
+                if mask & IN_Q_OVERFLOW:
+                    overflow = True
+                    continue
+
+                folder = self._watches.get(wd)
+                if folder is None:
+                    continue
+                if mask & IN_IGNORED:
+                    del self._watches[wd]
+                    continue
+
+                path = os.path.join(folder, os.fsdecode(name)) if name else folder
+                if self._single_file and path != self._single_file:
+                    continue
+
+                if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                    # Watch new folders right away. Files created before the watch existed are found when the
+                    #   monitor rescans the new folder.
+                    self._add_tree(path)
+                changed_paths.add(path)
+
+        return changed_paths, overflow
+
+    def _run(self) -> None:
+        try:
+            while not self._stopping:
+                readable, _, _ = select.select([self._fd, self._wake_read], [], [])
+                if self._stopping or self._wake_read in readable:
+                    break
+
+                changed_paths, overflow = self._read_events()
+                grouping_deadline = time.monotonic() + EVENT_GROUPING_MAXIMUM
+                while not self._stopping and time.monotonic() < grouping_deadline:
+                    readable, _, _ = select.select([self._fd], [], [], EVENT_GROUPING_DELAY)
+                    if not readable:
+                        break
+                    more_paths, more_overflow = self._read_events()
+                    changed_paths |= more_paths
+                    overflow = overflow or more_overflow
+
+                if overflow:
+                    self._on_overflow()
+                elif changed_paths:
+                    self._on_changes(changed_paths)
+        except BackendUnavailable as error:
+            self._on_unavailable(str(error))
+        finally:
+            self._close()
+
+
+###############################################################
+# Shared watcher daemon
+###############################################################
+
+class DaemonBackend(EventBackend):
+    """Receives changes from a `watcher_daemon` process that several Blender sessions share, starting it if needed.
+
+    The daemon does all of the scanning. This session only re-checks the paths the daemon reports. It is never picked
+    by 'auto', since it starts a separate process.
+    """
+
+    name = "daemon"
+    automatic = False
+
+    def __init__(self, file_or_folder_path: str, on_changes, on_overflow, on_unavailable, path_filter=None):
+        super().__init__(file_or_folder_path, on_changes, on_overflow, on_unavailable, path_filter)
+        self._connection = None
+        self._wake_receive = None
+        self._wake_send = None
+        self._stopping = False
+
+    @staticmethod
+    def is_supported() -> bool:
+        return True
+
+    def start(self) -> None:
+        include, exclude, ignore_file, filter_key = (), None, "", ""
+        if self._path_filter is not None:
+            # The daemon only knows the plain path rules, so a filter built on top of them (such as import reachable
+            #   mode) still shares the daemon for those rules. This session applies the rest to what is reported.
+            base_filter = getattr(self._path_filter, "base_filter", self._path_filter)
+            include = base_filter.include
+            exclude = base_filter.exclude
+            ignore_file = base_filter.ignore_file
+            filter_key = base_filter.key()
+
+        try:
+            self._connection = watcher_daemon.connect_or_start(self.path, include, exclude, ignore_file, filter_key)
+            greeting = self._connection.recv()
+        except (OSError, EOFError) as error:
+            self._close()
+            raise BackendUnavailable("Unable to reach the watcher daemon: " + str(error))
+        if greeting != ("hello", watcher_daemon.PROTOCOL_VERSION):
+            self._close()
+            raise BackendUnavailable("The running watcher daemon is a different version. Stop it and try again.")
+
+        self._wake_receive, self._wake_send = multiprocessing.Pipe(duplex=False)
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="DirectoryMonitor-daemon", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopping = True
+        if self._wake_send is not None:
+            try:
+                self._wake_send.send(None)
+            except OSError:
+                pass
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+    def _close(self) -> None:
+        for connection in (self._connection, self._wake_receive, self._wake_send):
+            if connection is not None:
+                try:
+                    connection.close()
+                except OSError:
+                    pass
+        self._connection = self._wake_receive = self._wake_send = None
+
+    def _run(self) -> None:
+        try:
+            while not self._stopping:
+                ready = multiprocessing.connection.wait([self._connection, self._wake_receive])
+                if self._stopping or self._wake_receive in ready:
+                    break
+                try:
+                    message = self._connection.recv()
+                except (OSError, EOFError):
+                    if not self._stopping:
+                        self._on_unavailable("The watcher daemon stopped.")
+                    break
+                if message[0] == "changes" and message[1]:
+                    self._on_changes(set(message[1]))
+        finally:
+            self._close()
+
+
+BACKENDS = {
+    InotifyBackend.name: InotifyBackend,
+    DaemonBackend.name: DaemonBackend,
+}
+
+def supported_backends(automatic_only: bool = False) -> list:
+    """Returns the names of the event backends that can run on this platform. With `automatic_only`, only the ones the
+    'auto' setting may choose."""
+    return [name for name, backend in BACKENDS.items()
+        if backend.is_supported() and (backend.automatic or not automatic_only)]
+
+def create_event_backend(name: str, file_or_folder_path: str, on_changes, on_overflow, on_unavailable,
+        path_filter=None) -> EventBackend:
+    """Creates and starts the event backend called `name`, or the best supported one when `name` is 'auto'.
+
+    Raises `BackendUnavailable` if no event backend can watch the path.
+    """
+    if name == "auto":
+        candidates = [BACKENDS[backend_name] for backend_name in supported_backends(automatic_only=True)]
+        if not candidates:
+            raise BackendUnavailable("No event backend is supported on this platform.")
+    elif name in BACKENDS:
+        candidates = [BACKENDS[name]]
+    else:
+        raise BackendUnavailable("Unknown backend '" + str(name) + "'.")
+
+    reasons = []
+    for backend_class in candidates:
+        backend = backend_class(file_or_folder_path, on_changes, on_overflow, on_unavailable, path_filter)
+        try:
+            backend.start()
+            return backend
+        except BackendUnavailable as error:
+            reasons.append(str(error))
+
+    raise BackendUnavailable(" ".join(reasons))
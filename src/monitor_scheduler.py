@@ -0,0 +1,99 @@
+"""
+Monitor Scheduler
+
+One background thread that runs the polls and delayed work for every DirectoryMonitor instance. Watching more folders
+adds entries to a queue instead of adding timer threads, so the overhead stays flat as the number of monitors grows.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+import traceback
+
+
+class ScheduledCall(object):
+    """A function waiting to run on the scheduler thread. Returned by `MonitorScheduler.call_later`."""
+
+    __slots__ = ("due", "function", "cancelled", "finished")
+
+    def __init__(self, due: float, function):
+        self.due = due
+        self.function = function
+        self.cancelled = False
+        self.finished = False
+
+    def cancel(self) -> None:
+        """Prevents the call from running if it has not started yet."""
+        self.cancelled = True
+
+    def pending(self) -> bool:
+        """True while the call is waiting to run or is running."""
+        return not self.cancelled and not self.finished
+
+
+class MonitorScheduler(object):
+    """Runs scheduled calls in due order on a single, long-lived daemon thread.
+
+    Calls run one at a time. An exception raised by one call is printed and does not affect any other call.
+    """
+
+    def __init__(self):
+        self._queue = []        # Heap of (due time, sequence number, ScheduledCall)
+        self._sequence = itertools.count()  # Keeps calls that are due at the same time in the order they were added
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self.current_call = None    # The call that is running right now, if any
+
+    def call_later(self, delay: float, function) -> ScheduledCall:
+        """Runs `function()` on the scheduler thread after `delay` seconds."""
+        call = ScheduledCall(time.monotonic() + max(delay, 0), function)
+        with self._lock:
+            heapq.heappush(self._queue, (call.due, next(self._sequence), call))
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="DirectoryMonitor-scheduler", daemon=True)
+                self._thread.start()
+        self._wake.set()
+        return call
+
+    def on_scheduler_thread(self) -> bool:
+        return threading.current_thread() is self._thread
+
+    def pending_calls(self) -> int:
+        with self._lock:
+            return sum(1 for _, _, call in self._queue if call.pending())
+
+    def _next_call(self):
+        # Returns (call to run now, seconds to wait otherwise)
+        with self._lock:
+            while self._queue and self._queue[0][2].cancelled:
+                heapq.heappop(self._queue)
+            if not self._queue:
+                return None, None
+
+            wait = self._queue[0][0] - time.monotonic()
+            if wait > 0:
+                return None, wait
+            return heapq.heappop(self._queue)[2], None
+
+    def _run(self) -> None:
+        while True:
+            # Clear before looking at the queue, so a call added while we look still wakes the wait below
+            self._wake.clear()
+            call, wait = self._next_call()
+            if call is None:
+                self._wake.wait(wait)
+                continue
+
+            self.current_call = call
+            try:
+                call.function()
+            except Exception:
+                traceback.print_exc()
+            finally:
+                call.finished = True
+                self.current_call = None
+
+
+scheduler = MonitorScheduler()
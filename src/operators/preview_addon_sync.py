@@ -0,0 +1,13 @@
+import bpy
+
+from ..hot_swap import preview_addon_sync
+
+class PreviewAddonSync(bpy.types.Operator):
+    bl_idname = "scriptingassistant.preview_addon_sync"
+    bl_label = "Hot Swap: Preview Add-on Sync"
+    bl_description = "Lists the files the next hot swap would copy into or remove from Blender's add-on directory"
+
+    def execute(self, context):
+        preview_addon_sync()
+
+        return {'FINISHED'}
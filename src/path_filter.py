@@ -0,0 +1,202 @@
+"""
+Path Filter
+
+Compiles include and exclude glob rules, plus an optional `.gitignore` style ignore file, into a matcher that the
+DirectoryMonitor applies while it walks the monitored folder. Excluded folders are never descended into, so their
+contents cost nothing to scan and can never trigger a hot swap.
+
+Rules follow the `.gitignore` conventions:
+- Blank lines and lines starting with `#` are ignored.
+- A rule without a `/` matches a file or folder name at any depth, e.g. `__pycache__` or `*.pyc`.
+- A rule containing a `/` matches relative to the monitored folder, e.g. `/build` or `docs/*.md`.
+- A trailing `/` only matches folders, e.g. `build/`.
+- `**` matches across folders, e.g. `icons/**` or `**/tests`.
+- A leading `!` re-includes something an earlier rule excluded. The last matching rule wins.
+
+Relative paths always use `/` as the separator, regardless of the operating system.
+"""
+
+import hashlib
+import os
+import re
+
+# Version control data, caches, virtual environments, and editor scratch files. None of these are ever part of an
+#   add-on, and all of them get written to constantly while working.
+DEFAULT_EXCLUDE_PATTERNS = (
+    ".git/", ".hg/", ".svn/",
+    "__pycache__/", "*.pyc", "*.pyo",
+    ".venv/", "venv/", ".mypy_cache/", ".pytest_cache/", ".tox/", "*.egg-info/",
+    ".vscode/", ".idea/",
+    "*.swp", "*.swo", "*.swx", "*~", ".#*", "#*#", "*.tmp", ".DS_Store", "Thumbs.db",
+)
+
+
+def _glob_to_regex(pattern: str) -> str:
+    """Translates a single glob pattern into a regular expression string. `*` and `?` never match a `/`."""
+    regex = ""
+    index = 0
+    length = len(pattern)
+
+    while index < length:
+        char = pattern[index]
+        if char == "*":
+            if pattern.startswith("**", index):
+                index += 2
+                if pattern.startswith("/", index):
+                    regex += "(?:.*/)?"     # '**/' matches zero or more folders
+                    index += 1
+                else:
+                    regex += ".*"
+                continue
+            regex += "[^/]*"
+        elif char == "?":
+            regex += "[^/]"
+        elif char == "[":
+            closing = pattern.find("]", index + 1)
+            if closing == -1:
+                regex += re.escape(char)
+            else:
+                contents = pattern[index + 1:closing]
+                negate = contents.startswith("!")
+                if negate:
+                    contents = contents[1:]
+                # Escape everything inside the brackets except the dashes that form ranges
+                contents = "-".join(re.escape(part) for part in contents.split("-"))
+                regex += "[" + ("^" if negate else "") + contents + "]"
+                index = closing
+        else:
+            regex += re.escape(char)
+        index += 1
+
+    return regex
+
+
+class _Rule(object):
+    __slots__ = ("regex", "negate", "folders_only", "match_name")
+
+    def __init__(self, pattern: str):
+        self.negate = pattern.startswith("!")
+        if self.negate:
+            pattern = pattern[1:]
+
+        self.folders_only = pattern.endswith("/")
+        pattern = pattern.rstrip("/")
+
+        # Rules without a slash (other than a trailing one) only look at the name, which is the common fast case
+        self.match_name = "/" not in pattern
+        pattern = pattern.lstrip("/")
+        try:
+            self.regex = re.compile(_glob_to_regex(pattern) + r"\Z")
+        except re.error:
+            # Something like an inverted range. Match the text literally instead of failing the whole filter.
+            self.regex = re.compile(re.escape(pattern) + r"\Z")
+
+    def matches(self, relative_path: str, name: str, is_folder: bool) -> bool:
+        if self.folders_only and not is_folder:
+            return False
+        return self.regex.match(name if self.match_name else relative_path) is not None
+
+
+def read_ignore_file(ignore_file: str) -> list:
+    """Returns the rules in a `.gitignore` style file, without blank lines or comments."""
+    rules = []
+    with open(ignore_file, "r", encoding="utf-8", errors="replace") as file:
+        for line in file:
+            line = line.rstrip("\n").rstrip("\r")
+            if line.endswith(" ") and not line.endswith("\\ "):
+                line = line.rstrip(" ")
+            if line == "" or line.startswith("#"):
+                continue
+            if line.startswith("\\#") or line.startswith("\\!"):
+                line = line[1:]
+            rules.append(line)
+    return rules
+
+
+class PathFilter(object):
+    """Decides which files and folders below the monitored folder are tracked.
+
+    `include` limits tracked files to those matching at least one pattern. An empty `include` tracks every file.
+    `exclude` and the rules read from `ignore_file` remove files and folders, in that order.
+    """
+
+    def __init__(self, include=(), exclude=DEFAULT_EXCLUDE_PATTERNS, ignore_file: str = ""):
+        self.include = tuple(include)
+        self.exclude = tuple(exclude)
+        self.ignore_file = ignore_file
+
+        ignore_rules = read_ignore_file(ignore_file) if ignore_file and os.path.isfile(ignore_file) else []
+        exclude_rules = list(self.exclude) + ignore_rules
+        # Stands for the ignore file's contents in `key()`, since the file can change while its path stays the same
+        self._ignore_digest = hashlib.sha1("\n".join(ignore_rules).encode("utf-8")).hexdigest()
+
+        self._include_rules = [_Rule(pattern) for pattern in self.include if pattern]
+        self._exclude_rules = [_Rule(pattern) for pattern in exclude_rules if pattern]
+
+        # Without negated rules, the order does not matter and every rule can be folded into one regular expression
+        self._ordered = any(rule.negate for rule in self._exclude_rules)
+        self._combined_name = None
+        self._combined_path = None
+        self._combined_folder_name = None
+        self._combined_folder_path = None
+        if not self._ordered:
+            self._combined_name = self._combine(rule for rule in self._exclude_rules
+                if rule.match_name and not rule.folders_only)
+            self._combined_path = self._combine(rule for rule in self._exclude_rules
+                if not rule.match_name and not rule.folders_only)
+            self._combined_folder_name = self._combine(rule for rule in self._exclude_rules
+                if rule.match_name and rule.folders_only)
+            self._combined_folder_path = self._combine(rule for rule in self._exclude_rules
+                if not rule.match_name and rule.folders_only)
+
+    def key(self) -> str:
+        """A string that is equal for two filters built from the same rules, including those read from the ignore
+        file."""
+        return repr((self.include, self.exclude, self.ignore_file, self._ignore_digest))
+
+    @staticmethod
+    def _combine(rules):
+        patterns = ["(?:" + rule.regex.pattern + ")" for rule in rules]
+        if not patterns:
+            return None
+        return re.compile("|".join(patterns))
+
+    def _is_excluded(self, relative_path: str, name: str, is_folder: bool) -> bool:
+        if not self._ordered:
+            if self._combined_name is not None and self._combined_name.match(name):
+                return True
+            if self._combined_path is not None and self._combined_path.match(relative_path):
+                return True
+            if is_folder:
+                if self._combined_folder_name is not None and self._combined_folder_name.match(name):
+                    return True
+                if self._combined_folder_path is not None and self._combined_folder_path.match(relative_path):
+                    return True
+            return False
+
+        for rule in reversed(self._exclude_rules):
+            if rule.matches(relative_path, name, is_folder):
+                return not rule.negate
+        return False
+
+    def excludes_folder(self, relative_path: str, name: str) -> bool:
+        """True if the folder, and everything inside it, should be skipped."""
+        return self._is_excluded(relative_path, name, True)
+
+    def includes_file(self, relative_path: str, name: str) -> bool:
+        """True if the file should be tracked. Its parent folders are assumed to have been checked already."""
+        if self._is_excluded(relative_path, name, False):
+            return False
+        if not self._include_rules:
+            return True
+        return any(rule.matches(relative_path, name, False) for rule in self._include_rules)
+
+    def includes_path(self, relative_path: str, is_folder: bool) -> bool:
+        """Checks a relative path from scratch, including every folder above it."""
+        parts = relative_path.split("/")
+        for depth in range(len(parts) - 1):
+            if self.excludes_folder("/".join(parts[:depth + 1]), parts[depth]):
+                return False
+        if is_folder:
+            return not self.excludes_folder(relative_path, parts[-1])
+        return self.includes_file(relative_path, parts[-1])
@@ -3,6 +3,16 @@ import os
 import bpy
 
 from .debug_server import check_for_debugpy
+from .directory_monitor import monitor
+from .swap_profiler import profiler
+
+def update_monitor_scan_budget(self, context):
+    # Applies right away. The next poll uses the new budget.
+    monitor.scan_budget_entries = self.monitor_scan_budget_entries
+    monitor.scan_budget_time = self.monitor_scan_budget_time
+
+def update_hot_swap_latency_budget(self, context):
+    profiler.latency_budget = self.hot_swap_latency_budget
 
 class DebuggerPreferences(bpy.types.AddonPreferences):
     """This class holds all debugger preferences for the add-on."""
@@ -45,3 +55,42 @@ class DebuggerPreferences(bpy.types.AddonPreferences):
         default= "blender-scripting-assistant",
         subtype='FILE_PATH',
     ) # type: ignore
+
+    monitor_workspace: bpy.props.BoolProperty(
+        name="Workspace Mode",
+        description="Treat the monitored folder as a workspace holding many add-ons. Each change only hot swaps the"
+            + " add-ons it touches",
+        default=False
+    ) # type: ignore
+
+    hot_swap_partial_reload: bpy.props.BoolProperty(
+        name="Partial Reload",
+        description="Only reload the changed modules and the modules importing them, when the change allows it."
+            + " Changes to __init__.py or registration code always reload the whole add-on",
+        default=True
+    ) # type: ignore
+
+    hot_swap_latency_budget: bpy.props.FloatProperty(
+        name="Hot Swap Latency Budget (Seconds)",
+        description="Warn when a hot swap takes longer than this from saving a file to the add-on being live again."
+            + " 0 turns the warning off",
+        min=0,
+        default=0,
+        update=update_hot_swap_latency_budget
+    ) # type: ignore
+
+    monitor_scan_budget_entries: bpy.props.IntProperty(
+        name="Scan Budget (Entries per Poll)",
+        description="Most files and folders one poll may scan before pausing until the next poll. 0 for no limit",
+        min=0,
+        default=0,
+        update=update_monitor_scan_budget
+    ) # type: ignore
+
+    monitor_scan_budget_time: bpy.props.IntProperty(
+        name="Scan Budget (Microseconds per Poll)",
+        description="Longest one poll may scan before pausing until the next poll. 0 for no limit",
+        min=0,
+        default=0,
+        update=update_monitor_scan_budget
+    ) # type: ignore
@@ -0,0 +1,75 @@
+"""
+Pre-flight
+
+Compiles the changed modules of the monitored add-on before the hot swap tears the running copy down. If any of them
+does not compile, the hot swap stops there: the add-on that is loaded stays loaded and working, and the error location
+is reported so it can be fixed and saved again.
+
+Compiling only parses the code into bytecode. Nothing is run and no `.pyc` files are written.
+"""
+
+import collections
+import concurrent.futures
+import os
+import threading
+
+from .directory_snapshot import take_snapshot
+from .path_filter import PathFilter
+
+# One module that failed to compile. `line` and `column` start at 1, and are 0 when unknown. `text` is the offending
+#   source line, if there is one.
+CompileError = collections.namedtuple("CompileError", ["file_path", "line", "column", "message", "text"])
+
+PREFLIGHT_WORKERS = 4
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _preflight_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = concurrent.futures.ThreadPoolExecutor(max_workers=PREFLIGHT_WORKERS,
+                thread_name_prefix="HotSwap-preflight")
+        return _pool
+
+
+def compile_module(file_path: str):
+    """Compiles one module. Returns None if it compiles, otherwise a `CompileError`."""
+    try:
+        with open(file_path, "rb") as file:
+            source = file.read()
+    except OSError as error:
+        return CompileError(file_path, 0, 0, str(error), "")
+
+    try:
+        compile(source, file_path, "exec", dont_inherit=True)
+    except SyntaxError as error:    # IndentationError and TabError are SyntaxErrors too
+        return CompileError(file_path, error.lineno or 0, error.offset or 0, error.msg, (error.text or "").rstrip())
+    except ValueError as error:     # e.g. null bytes in the source
+        return CompileError(file_path, 0, 0, str(error), "")
+    return None
+
+
+def modules_to_check(addon_path: str, changes=None) -> list:
+    """Returns the Python files to compile before hot swapping `addon_path`. With the monitor's `ChangeSet`, that is
+    the added, modified, and moved modules. Without one, it is every module of the add-on."""
+    if changes is None:
+        if os.path.isfile(addon_path):
+            return [addon_path]
+        return sorted(take_snapshot(addon_path, PathFilter(include=("*.py",))))
+
+    file_paths = list(changes.added) + list(changes.modified) + [new_path for new_path, _ in changes.moved.values()]
+    return sorted(file_path for file_path in file_paths if file_path.endswith(".py") and os.path.isfile(file_path))
+
+
+def preflight_compile(file_paths) -> list:
+    """Compiles every file in `file_paths`, on a background thread pool when there is more than one. Returns the
+    `CompileError`s in the order of `file_paths`, or an empty list when everything compiles."""
+    file_paths = list(file_paths)
+    if len(file_paths) <= 1:
+        results = [compile_module(file_path) for file_path in file_paths]
+    else:
+        results = list(_preflight_pool().map(compile_module, file_paths))
+    return [error for error in results if error is not None]
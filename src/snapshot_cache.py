@@ -0,0 +1,71 @@
+"""
+Snapshot Cache
+
+Saves the DirectoryMonitor's snapshot to disk between Blender sessions. On the next launch, the first scan compares
+against the saved snapshot instead of starting from nothing, so edits made while Blender was closed show up as one
+initial change set instead of being absorbed into a fresh baseline.
+
+The file is zlib compressed JSON. Paths are stored relative to the monitored folder, which keeps the file small and
+the format readable when decompressed.
+"""
+
+import json
+import os
+import zlib
+
+CACHE_FORMAT_VERSION = 1
+
+
+def _root_prefix(directory: str) -> str:
+    # Every tracked path starts with this prefix. A single file is stored relative to its folder.
+    root = os.path.dirname(directory) if os.path.isfile(directory) else directory
+    return os.path.join(root, "")
+
+
+def save_snapshot(cache_file: str, directory: str, filter_key: str, snapshot: dict) -> bool:
+    """Writes `snapshot` for `directory` to `cache_file`. Returns False if it could not be written.
+
+    `filter_key` identifies the include and exclude rules the snapshot was taken with. A snapshot taken with different
+    rules tracks different files, so it is never loaded for another set of rules. The file is replaced atomically, so
+    a crash part way through leaves the previous cache intact.
+    """
+    prefix = _root_prefix(directory)
+    files = [[path[len(prefix):], signature[0], signature[1], signature[2]]
+        for path, signature in snapshot.items() if path.startswith(prefix)]
+    contents = {
+        "version": CACHE_FORMAT_VERSION,
+        "directory": directory,
+        "filter": filter_key,
+        "files": files,
+    }
+
+    temporary_file = cache_file + ".tmp"
+    try:
+        with open(temporary_file, "wb") as file:
+            file.write(zlib.compress(json.dumps(contents, separators=(",", ":")).encode("utf-8")))
+        os.replace(temporary_file, cache_file)
+    except OSError:
+        return False
+    return True
+
+
+def load_snapshot(cache_file: str, directory: str, filter_key: str):
+    """Returns the snapshot saved for `directory` with the same `filter_key`, or None if there is no usable cache.
+
+    A missing, unreadable, corrupt, or outdated cache file is treated the same as no cache at all.
+    """
+    try:
+        with open(cache_file, "rb") as file:
+            contents = json.loads(zlib.decompress(file.read()).decode("utf-8"))
+    except (OSError, ValueError, zlib.error):
+        return None
+
+    if not isinstance(contents, dict) or contents.get("version") != CACHE_FORMAT_VERSION \
+            or contents.get("directory") != directory or contents.get("filter") != filter_key:
+        return None
+
+    prefix = _root_prefix(directory)
+    try:
+        return {prefix + relative: (mtime_ns, size, inode) for relative, mtime_ns, size, inode in contents["files"]}
+    except (KeyError, TypeError, ValueError):
+        return None
@@ -0,0 +1,192 @@
+"""
+Subscribers
+
+A callback registered with the DirectoryMonitor, along with the paths it cares about. Subscriptions with patterns are
+only run when a matching file changes, and can receive the matching part of the `ChangeSet` so they know exactly what
+changed instead of rescanning on their own.
+
+The `SubscriberExecutor` runs the subscriptions for each change. It orders them by priority, keeps one failing
+callback from stopping the others, and records how long every call took so slow hooks are easy to find.
+"""
+
+import collections
+import concurrent.futures
+import os
+import threading
+import time
+import traceback
+
+from .directory_snapshot import ChangeSet, relative_path
+from .path_filter import PathFilter
+
+# Number of recent subscriber calls kept for `SubscriberExecutor.timings()`
+TIMING_HISTORY_LENGTH = 256
+
+# One finished subscriber call. `started` is a time.time() timestamp, `duration` is wall time in seconds, and `error` is
+#   the formatted traceback if the callback raised, otherwise an empty string.
+SubscriberRun = collections.namedtuple("SubscriberRun", ["script", "function", "started", "duration", "error"])
+
+
+class Subscription(object):
+    """A subscribed callback.
+
+    `patterns` are glob rules with the same syntax as `DirectoryMonitor.include_patterns`, matched against paths
+    relative to the monitored folder (e.g. `*.py` or `icons/**`). Without patterns, every change runs the callback.
+
+    With `pass_changes`, the callback is called with a `ChangeSet` holding only the matching changes. Otherwise it is
+    called without arguments, which is how the original subscribers work.
+
+    Subscriptions with a higher `priority` run first. `thread_safe` subscriptions may run on the executor's thread pool,
+    at the same time as other subscribers.
+    """
+
+    __slots__ = ("function", "patterns", "pass_changes", "priority", "thread_safe", "_path_filter")
+
+    def __init__(self, function, patterns=(), pass_changes: bool = False, priority: int = 0,
+            thread_safe: bool = False):
+        self.function = function
+        self.patterns = tuple(patterns)
+        self.pass_changes = pass_changes
+        self.priority = priority
+        self.thread_safe = thread_safe
+        self._path_filter = PathFilter(include=self.patterns, exclude=()) if self.patterns else None
+
+    def __call__(self, *args):
+        # Lets a subscription still be called like the plain function it wraps
+        return self.function(*args)
+
+    def __eq__(self, other):
+        if isinstance(other, Subscription):
+            return self.function == other.function and self.patterns == other.patterns
+        return self.function == other
+
+    def __hash__(self):
+        return hash(self.function)
+
+    def matches(self, file_path: str, root: str) -> bool:
+        if self._path_filter is None:
+            return True
+        file_relative = relative_path(file_path, root) or os.path.basename(file_path)
+        return self._path_filter.includes_path(file_relative, False)
+
+    def matching_changes(self, changes: ChangeSet, root: str) -> ChangeSet:
+        """Returns the part of `changes` this subscription is interested in. `root` is the monitored folder."""
+        if self._path_filter is None:
+            return changes
+        return changes.filtered(lambda file_path: self.matches(file_path, root))
+
+    def arguments(self, changes, root: str):
+        """Returns the arguments to call the callback with for `changes`, or None if it should not run at all.
+
+        `changes` is None when the reason for running is unknown, which runs every subscription.
+        """
+        if changes is not None:
+            changes = self.matching_changes(changes, root)
+            if not changes:
+                return None
+        return (changes,) if self.pass_changes else ()
+
+    def run(self, changes, root: str) -> bool:
+        """Runs the callback if any of `changes` match. Returns True if the callback ran."""
+        arguments = self.arguments(changes, root)
+        if arguments is None:
+            return False
+        self.function(*arguments)
+        return True
+
+
+class SubscriberExecutor(object):
+    """Runs subscriptions in priority order, isolating failures and timing every call.
+
+    Subscriptions that are not thread safe run one after another on the calling thread, highest priority first, the
+    same as registration order for equal priorities. Thread safe subscriptions are handed to a thread pool of
+    `max_workers` threads (in the same priority order) before the others start, and the call returns without waiting
+    for them.
+
+    An exception raised by a callback is reported through `on_error(script, formatted_traceback)` and recorded in its
+    `SubscriberRun`. The remaining subscribers still run.
+    """
+
+    def __init__(self, on_error=None, max_workers: int = 4):
+        self.on_error = on_error
+        self.max_workers = max_workers
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._timings = collections.deque(maxlen=TIMING_HISTORY_LENGTH)
+        self._timings_lock = threading.Lock()
+
+    def run(self, subscribers: dict, changes, root: str) -> int:
+        """Runs every subscription in `subscribers` (script -> list of `Subscription`) that matches `changes`.
+
+        Returns the number of callbacks that were started.
+        """
+        calls = []
+        for script, subscriptions in list(subscribers.items()):
+            for subscription in list(subscriptions):
+                arguments = subscription.arguments(changes, root)
+                if arguments is not None:
+                    calls.append((subscription, script, arguments))
+        # sorted() is stable, so equal priorities keep their registration order
+        calls = sorted(calls, key=lambda call: -call[0].priority)
+
+        for subscription, script, arguments in calls:
+            if subscription.thread_safe:
+                self._thread_pool().submit(self._call, subscription, script, arguments)
+        for subscription, script, arguments in calls:
+            if not subscription.thread_safe:
+                self._call(subscription, script, arguments)
+        return len(calls)
+
+    def _thread_pool(self):
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers,
+                    thread_name_prefix="DirectoryMonitor-subscriber")
+            return self._pool
+
+    def resize(self, max_workers: int) -> None:
+        """Changes the thread pool size. Calls already submitted finish on the old pool."""
+        with self._pool_lock:
+            self.max_workers = max_workers
+            old_pool = self._pool
+            self._pool = None
+        if old_pool is not None:
+            old_pool.shutdown(wait=False)
+
+    def _call(self, subscription: Subscription, script: str, arguments: tuple) -> None:
+        error = ""
+        started = time.time()
+        start = time.perf_counter()
+        try:
+            subscription.function(*arguments)
+        except Exception:
+            error = traceback.format_exc()
+        duration = time.perf_counter() - start
+
+        function_name = getattr(subscription.function, "__qualname__", repr(subscription.function))
+        with self._timings_lock:
+            self._timings.append(SubscriberRun(script, function_name, started, duration, error))
+        if error and self.on_error is not None:
+            self.on_error(script, error)
+
+    def timings(self, script: str = "") -> list:
+        """Returns the most recent `SubscriberRun` records, oldest first. Limit them to one script with `script`."""
+        with self._timings_lock:
+            return [run for run in self._timings if not script or run.script == script]
+
+    def timing_summary(self) -> dict:
+        """Returns `{script: {'calls', 'errors', 'total', 'mean', 'max'}}` over the recorded runs, in seconds."""
+        summary = {}
+        for run in self.timings():
+            entry = summary.setdefault(run.script, {"calls": 0, "errors": 0, "total": 0.0, "mean": 0.0, "max": 0.0})
+            entry["calls"] += 1
+            entry["errors"] += 1 if run.error else 0
+            entry["total"] += run.duration
+            entry["max"] = max(entry["max"], run.duration)
+        for entry in summary.values():
+            entry["mean"] = entry["total"] / entry["calls"]
+        return summary
+
+    def clear_timings(self) -> None:
+        with self._timings_lock:
+            self._timings.clear()
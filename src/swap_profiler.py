@@ -0,0 +1,141 @@
+"""
+Swap Profiler
+
+Times each phase of every hot swap (compile check, bl_info read, disable, file removal, module purge, add-on refresh,
+copy, enable) and keeps the last `HISTORY_LENGTH` swaps in memory. From Blender's Python console:
+
+    from <add-on module>.swap_profiler import profiler
+    profiler.history()[-1].phases       # Seconds per phase of the last swap
+    profiler.summary()                  # Mean and max per phase over the history
+    profiler.export_json("/tmp/swaps.json")
+
+A latency budget turns the history into a check. Any swap whose save-to-live latency (from the newest changed file's
+modified time to the add-on being live again) goes over it prints a warning naming its slowest phase.
+"""
+
+import collections
+import contextlib
+import json
+import threading
+import time
+
+from .console_messages.hotswap import HotswapMessages as message
+
+HISTORY_LENGTH = 50     # Number of recent hot swaps kept
+
+
+class SwapProfile(object):
+    """The timings of one hot swap. Phase durations and `total` are in seconds, measured with `time.perf_counter()`."""
+
+    def __init__(self, changes=None):
+        self.started = time.time()
+        self.strategy = "full"      # 'full' or 'partial'
+        self.outcome = "error"      # 'success', 'compile error', 'skipped', or 'error'
+        self.phases = {}            # Phase name -> seconds, in the order the phases first ran
+        self.bytes_copied = 0
+        self.modules_purged = 0
+        self.modules_reloaded = 0
+        self.changed_files = len(changes.paths()) if changes is not None else 0
+        self.total = 0.0
+        self.queue_wait = 0.0       # Seconds the swap waited for Blender's main thread before it started
+        self._saved = None          # When the newest changed file was saved, for the whole save-to-live latency
+        if changes is not None:
+            signatures = list(changes.added.values()) + list(changes.modified.values()) \
+                + [signature for _, signature in changes.moved.values()]
+            self._saved = max((signature[0] / 1e9 for signature in signatures), default=None)
+        self.save_to_live = None
+        self._start = time.perf_counter()
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        """Times the enclosed block as phase `name`. A phase that runs more than once adds up."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+    def finish(self) -> None:
+        self.total = time.perf_counter() - self._start
+        if self._saved is not None:
+            self.save_to_live = max(time.time() - self._saved, 0.0)
+
+    def slowest_phase(self) -> str:
+        return max(self.phases, key=self.phases.get) if self.phases else ""
+
+    def to_dict(self) -> dict:
+        return {
+            "started": self.started,
+            "strategy": self.strategy,
+            "outcome": self.outcome,
+            "total": self.total,
+            "save_to_live": self.save_to_live,
+            "queue_wait": self.queue_wait,
+            "phases": dict(self.phases),
+            "bytes_copied": self.bytes_copied,
+            "modules_purged": self.modules_purged,
+            "modules_reloaded": self.modules_reloaded,
+            "changed_files": self.changed_files,
+        }
+
+
+class SwapProfiler(object):
+    """Keeps the `SwapProfile` of the most recent hot swaps, and checks them against `latency_budget`."""
+
+    def __init__(self, on_over_budget=None, history_length: int = HISTORY_LENGTH):
+        self.latency_budget = 0     # Seconds from save to live. 0 turns the check off.
+        self.on_over_budget = on_over_budget    # Called with the SwapProfile and the budget when a swap goes over it
+        self._history = collections.deque(maxlen=history_length)
+        self._lock = threading.Lock()
+
+    def start(self, changes=None) -> SwapProfile:
+        """Returns a new profile for a hot swap triggered by `changes`. Pass it to `finish()` once the swap is done."""
+        return SwapProfile(changes)
+
+    def finish(self, profile: SwapProfile) -> None:
+        profile.finish()
+        with self._lock:
+            self._history.append(profile)
+        if self.over_budget(profile) and self.on_over_budget is not None:
+            self.on_over_budget(profile, self.latency_budget)
+
+    def over_budget(self, profile: SwapProfile) -> bool:
+        """Returns True if a swap that made changes took longer than the latency budget. Swaps that stopped early, for
+        example on a compile error, never count."""
+        if self.latency_budget <= 0 or profile.outcome != "success":
+            return False
+        latency = profile.save_to_live if profile.save_to_live is not None else profile.total
+        return latency > self.latency_budget
+
+    def history(self) -> list:
+        """Returns the recorded profiles, oldest first."""
+        with self._lock:
+            return list(self._history)
+
+    def summary(self) -> dict:
+        """Returns `{phase: {'count', 'mean', 'max'}}` in seconds over the recorded swaps, plus the same for 'total'."""
+        durations = collections.defaultdict(list)
+        for profile in self.history():
+            for name, seconds in profile.phases.items():
+                durations[name].append(seconds)
+            durations["total"].append(profile.total)
+        return {name: {"count": len(values), "mean": sum(values) / len(values), "max": max(values)}
+            for name, values in durations.items()}
+
+    def export_json(self, file_path: str = "") -> str:
+        """Returns the history as JSON, and also writes it to `file_path` if one is given."""
+        contents = json.dumps({
+            "latency_budget": self.latency_budget,
+            "swaps": [profile.to_dict() for profile in self.history()],
+        }, indent=2)
+        if file_path:
+            with open(file_path, "w", encoding="utf-8") as file:
+                file.write(contents)
+        return contents
+
+    def clear(self) -> None:
+        with self._lock:
+            self._history.clear()
+
+
+profiler = SwapProfiler(message.over_latency_budget)
@@ -116,9 +116,11 @@ class HotSwapPanel(bpy.types.Panel):
     )
 
     def draw(self, context):
+        monitor.reset_backoff()     # The panel redraws as the user returns to Blender
         layout = self.layout
         row = layout.box()
         row.prop(context.scene, "monitor_path")
+        row.prop(context.preferences.addons[__package__].preferences, "monitor_workspace")
         row = layout.row()
         if monitor.active:
             row.operator("scriptingassistant.monitor_stop", text="Stop Monitoring", icon='PAUSE')
@@ -126,3 +128,5 @@ class HotSwapPanel(bpy.types.Panel):
             row.operator("scriptingassistant.monitor_start", text="Start Monitoring", icon='PLAY')
         row = layout.row()
         row.operator("scriptingassistant.open_monitor_source_directory", text="Open Source Directory")
+        row = layout.row()
+        row.operator("scriptingassistant.preview_addon_sync", text="Preview Add-on Sync")
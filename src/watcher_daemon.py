@@ -0,0 +1,277 @@
+"""
+Watcher Daemon
+
+An optional watcher process that owns the scanning of one tree for any number of Blender sessions. It runs the normal
+DirectoryMonitor outside of Blender, and sends the paths that changed to every connected session over a local socket
+(a Unix domain socket, or a named pipe on Windows). Each session then only re-checks those paths, instead of every
+session scanning the same files inside its own GIL.
+
+Sessions connect through the 'daemon' monitor backend, which starts the daemon the first time it is needed. The daemon
+exits on its own once no session has been connected for `DAEMON_IDLE_TIMEOUT` seconds.
+
+Run directly as a script, this file loads its sibling modules as a package without running the add-on's `__init__`,
+which needs `bpy`:
+
+    python watcher_daemon.py <file or folder> [--include JSON] [--exclude JSON] [--ignore-file PATH]
+"""
+
+import argparse
+import getpass
+import hashlib
+import importlib
+import json
+import multiprocessing.connection
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import types
+
+PROTOCOL_VERSION = 1
+DAEMON_IDLE_TIMEOUT = 60    # Seconds without any connected session before the daemon exits
+DAEMON_START_TIMEOUT = 5    # Seconds a session waits for a daemon it started to accept connections
+
+_KEY_FILE_NAME = "daemon.key"
+
+
+def runtime_folder() -> str:
+    """Returns the per user folder that holds the daemon sockets and the connection key, creating it if needed."""
+    try:
+        user = getpass.getuser()
+    except Exception:
+        user = "user"
+    folder = os.path.join(tempfile.gettempdir(), "scripting_assistant-" + user)
+    os.makedirs(folder, mode=0o700, exist_ok=True)
+    return folder
+
+def daemon_authkey() -> bytes:
+    """Returns the secret both sides prove they know before any data is exchanged. It is created once per user, and
+    only that user can read it."""
+    key_file = os.path.join(runtime_folder(), _KEY_FILE_NAME)
+    try:
+        descriptor = os.open(key_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        pass
+    else:
+        with os.fdopen(descriptor, "wb") as file:
+            file.write(os.urandom(32).hex().encode("ascii"))
+
+    # Another process may have just created the file and not finished writing it yet
+    deadline = time.monotonic() + 1
+    while True:
+        with open(key_file, "rb") as file:
+            key = file.read().strip()
+        if len(key) == 64 or time.monotonic() > deadline:
+            return key
+        time.sleep(.01)
+
+def daemon_address(file_or_folder_path: str, filter_key: str = ""):
+    """Returns the socket address of the daemon for this path and filter. Sessions that track the same files with the
+    same rules share a daemon. Sessions with different rules get their own."""
+    identity = os.path.normcase(os.path.abspath(file_or_folder_path)) + "\n" + filter_key
+    digest = hashlib.sha1(identity.encode("utf-8")).hexdigest()[:16]
+    if sys.platform == "win32":
+        return r"\\.\pipe\scripting_assistant-" + digest
+    return os.path.join(runtime_folder(), digest + ".sock")
+
+def _address_family(address) -> str:
+    return "AF_PIPE" if sys.platform == "win32" else "AF_UNIX"
+
+def connect(address):
+    """Connects to the daemon at `address`. Raises OSError if no daemon is listening there."""
+    try:
+        return multiprocessing.connection.Client(address, _address_family(address), authkey=daemon_authkey())
+    except (EOFError, multiprocessing.AuthenticationError) as error:
+        raise OSError(str(error))
+
+def start_daemon(file_or_folder_path: str, include=(), exclude=None, ignore_file: str = "") -> None:
+    """Starts a daemon process for the path in the background. It keeps running after this process exits."""
+    arguments = [sys.executable, os.path.abspath(__file__), file_or_folder_path, "--include", json.dumps(list(include)),
+        "--ignore-file", ignore_file]
+    if exclude is not None:
+        arguments += ["--exclude", json.dumps(list(exclude))]
+
+    options = {}
+    if sys.platform == "win32":
+        options["creationflags"] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        options["start_new_session"] = True
+    subprocess.Popen(arguments, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        close_fds=True, **options)
+
+def connect_or_start(file_or_folder_path: str, include=(), exclude=None, ignore_file: str = "", filter_key: str = ""):
+    """Connects to the daemon for the path, starting one first if none is running. Raises OSError if that fails."""
+    address = daemon_address(file_or_folder_path, filter_key)
+    try:
+        return connect(address)
+    except OSError:
+        pass
+
+    start_daemon(file_or_folder_path, include, exclude, ignore_file)
+    deadline = time.monotonic() + DAEMON_START_TIMEOUT
+    while True:
+        try:
+            return connect(address)
+        except OSError:
+            if time.monotonic() > deadline:
+                raise OSError("The watcher daemon did not start within " + str(DAEMON_START_TIMEOUT) + " seconds.")
+            time.sleep(.05)
+
+def stop_daemon(file_or_folder_path: str, filter_key: str = "") -> bool:
+    """Asks the daemon for the path to exit. Returns False if there was no daemon running."""
+    try:
+        connection = connect(daemon_address(file_or_folder_path, filter_key))
+    except OSError:
+        return False
+    try:
+        connection.recv()   # The greeting. Closing before it arrives would make the daemon drop the request.
+        connection.send(("shutdown",))
+    except (OSError, EOFError):
+        return False
+    finally:
+        connection.close()
+    return True
+
+
+###############################################################
+# Daemon Process
+###############################################################
+
+def _load_directory_monitor():
+    if __package__:
+        from . import directory_monitor
+        return directory_monitor
+
+    # Running as a script. Import the sibling modules as a package of their own, so relative imports work and the
+    #   add-on's __init__ (which imports bpy) never runs.
+    package_name = "_scripting_assistant_watcher"
+    package = types.ModuleType(package_name)
+    package.__path__ = [os.path.dirname(os.path.abspath(__file__))]
+    sys.modules[package_name] = package
+    return importlib.import_module(package_name + ".directory_monitor")
+
+
+class WatcherDaemon(object):
+    """Watches one path and forwards every change to the connected sessions."""
+
+    def __init__(self, file_or_folder_path: str, include=(), exclude=None, ignore_file: str = "",
+            idle_timeout: float = DAEMON_IDLE_TIMEOUT):
+        self.path = file_or_folder_path
+        self.idle_timeout = idle_timeout
+        self._clients = []
+        self._clients_lock = threading.Lock()
+        self._last_client = time.monotonic()
+        self._stopping = threading.Event()
+
+        directory_monitor = _load_directory_monitor()
+        self.monitor = directory_monitor.DirectoryMonitor(file_or_folder_path)
+        self.monitor.include_patterns = list(include)
+        if exclude is not None:
+            self.monitor.exclude_patterns = list(exclude)
+        if ignore_file:
+            self.monitor.ignore_file = ignore_file
+        self.filter_key = self.monitor._path_filter.key()
+
+    def _publish(self, changes) -> None:
+        message = ("changes", changes.paths())
+        with self._clients_lock:
+            for client in list(self._clients):
+                try:
+                    client.send(message)
+                except (OSError, ValueError):
+                    self._drop_client(client)
+
+    def _drop_client(self, client) -> None:
+        # Called with '_clients_lock' held
+        if client in self._clients:
+            self._clients.remove(client)
+            self._last_client = time.monotonic()
+        try:
+            client.close()
+        except OSError:
+            pass
+
+    def _accept_clients(self, listener) -> None:
+        while not self._stopping.is_set():
+            try:
+                client = listener.accept()
+            except (OSError, EOFError, multiprocessing.AuthenticationError):
+                if self._stopping.is_set():
+                    return
+                continue
+            try:
+                client.send(("hello", PROTOCOL_VERSION))
+            except OSError:
+                continue
+            with self._clients_lock:
+                self._clients.append(client)
+
+    def _read_clients(self) -> None:
+        # Sessions only send a request to shut down. Reading also notices sessions that closed.
+        with self._clients_lock:
+            clients = list(self._clients)
+        for client in multiprocessing.connection.wait(clients, timeout=1) if clients else ():
+            try:
+                request = client.recv()
+            except (OSError, EOFError):
+                with self._clients_lock:
+                    self._drop_client(client)
+                continue
+            if request and request[0] == "shutdown":
+                self._stopping.set()
+        if not clients:
+            time.sleep(1)
+
+    def run(self) -> None:
+        address = daemon_address(self.path, self.filter_key)
+        try:
+            connect(address).close()
+            return  # Another daemon is already watching this path
+        except OSError:
+            pass
+        if sys.platform != "win32" and os.path.exists(address):
+            os.remove(address)  # Left behind by a daemon that did not exit cleanly
+
+        listener = multiprocessing.connection.Listener(address, _address_family(address), authkey=daemon_authkey())
+        threading.Thread(target=self._accept_clients, args=(listener,), name="WatcherDaemon-accept",
+            daemon=True).start()
+        self.monitor.watch()
+        # Subscribed after the first scan, so sessions are not sent every file in the tree. They scan for themselves
+        #   once when they start watching.
+        self.monitor.subscribe("WatcherDaemon", self._publish, pass_changes=True)
+
+        try:
+            while not self._stopping.is_set():
+                self._read_clients()
+                with self._clients_lock:
+                    idle = not self._clients and time.monotonic() - self._last_client > self.idle_timeout
+                if idle:
+                    break
+        finally:
+            self._stopping.set()
+            self.monitor.secure()
+            with self._clients_lock:
+                for client in list(self._clients):
+                    self._drop_client(client)
+            listener.close()
+
+
+def main(arguments=None) -> None:
+    parser = argparse.ArgumentParser(description="Watches a file or folder and publishes changes to Blender sessions.")
+    parser.add_argument("path", help="The file or folder to watch.")
+    parser.add_argument("--include", default="[]", help="JSON list of include patterns.")
+    parser.add_argument("--exclude", default=None, help="JSON list of exclude patterns. Uses the defaults if omitted.")
+    parser.add_argument("--ignore-file", default="", help="A .gitignore style file with more exclude rules.")
+    parser.add_argument("--idle-timeout", type=float, default=DAEMON_IDLE_TIMEOUT,
+        help="Seconds without connected sessions before exiting.")
+    options = parser.parse_args(arguments)
+
+    exclude = json.loads(options.exclude) if options.exclude is not None else None
+    WatcherDaemon(options.path, json.loads(options.include), exclude, options.ignore_file,
+        options.idle_timeout).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+Workspace
+
+Lets one monitor serve a whole folder of add-ons, such as a repository holding many of them. Every add-on root below the
+workspace folder is discovered: a package whose `__init__.py` defines `bl_info`, or a single `.py` file that does. The
+roots go into a path-prefix trie, so the add-on owning any changed file is found by walking its path once, in time
+proportional to its depth rather than to the number of add-ons.
+
+A change to the workspace is then split into one `ChangeSet` per affected add-on, and only those add-ons are hot
+swapped.
+"""
+
+import ast
+import os
+
+from .directory_snapshot import ChangeSet
+from .path_filter import PathFilter
+
+PACKAGE_INIT = "__init__.py"
+
+
+def find_bl_info(tree: ast.Module):
+    """Returns the value assigned to `bl_info` at the top level of a parsed module, as an `ast` node, or None if it is
+    never assigned there."""
+    for node in tree.body:
+        if isinstance(node, ast.Assign):
+            targets = node.targets
+        elif isinstance(node, ast.AnnAssign) and node.value is not None:
+            targets = [node.target]
+        else:
+            continue
+        if any(isinstance(target, ast.Name) and target.id == "bl_info" for target in targets):
+            return node.value
+    return None
+
+
+def defines_bl_info(file_path: str) -> bool:
+    """True if the module assigns `bl_info` at its top level. Only files that mention it are parsed."""
+    try:
+        with open(file_path, "rb") as file:
+            source = file.read()
+    except OSError:
+        return False
+    if b"bl_info" not in source:
+        return False
+    try:
+        tree = ast.parse(source, file_path)
+    except (SyntaxError, ValueError):
+        return True     # Still an add-on, just one that does not compile right now
+    return find_bl_info(tree) is not None
+
+
+def discover_addons(workspace_path: str, path_filter: PathFilter = None) -> list:
+    """Returns the sorted paths of every add-on root below `workspace_path`. Nothing inside a package add-on is
+    searched, since its modules and subpackages belong to it."""
+    path_filter = path_filter if path_filter is not None else PathFilter()
+    roots = []
+    folders = [(workspace_path, "")]
+    while folders:
+        folder, relative_folder = folders.pop()
+        try:
+            entries = list(os.scandir(folder))
+        except OSError:
+            continue
+        subfolders = []
+        single_files = []
+        for entry in entries:
+            relative_path = relative_folder + "/" + entry.name if relative_folder else entry.name
+            try:
+                is_folder = entry.is_dir(follow_symlinks=False)     # A linked folder could loop back in
+            except OSError:
+                continue
+            if is_folder:
+                if not path_filter.excludes_folder(relative_path, entry.name):
+                    subfolders.append((entry.path, relative_path))
+            elif entry.name.endswith(".py") and entry.name != PACKAGE_INIT \
+                    and path_filter.includes_file(relative_path, entry.name):
+                single_files.append(entry.path)
+
+        init_file = os.path.join(folder, PACKAGE_INIT)
+        if folder != workspace_path and os.path.isfile(init_file) and defines_bl_info(init_file):
+            roots.append(folder)
+            continue
+        roots.extend(file_path for file_path in single_files if defines_bl_info(file_path))
+        folders.extend(subfolders)
+    return sorted(roots)
+
+
+def _path_parts(path: str) -> list:
+    return [part for part in os.path.normcase(os.path.normpath(path)).split(os.sep) if part]
+
+
+class PathTrie(object):
+    """Maps paths to values, and finds the value of the longest stored path that is a prefix of any path."""
+
+    _VALUE = None   # Key of the value stored on a node. Path parts are never None, so it cannot collide.
+
+    def __init__(self):
+        self._root = {}
+        self._length = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    def insert(self, path: str, value) -> None:
+        node = self._root
+        for part in _path_parts(path):
+            node = node.setdefault(part, {})
+        if self._VALUE not in node:
+            self._length += 1
+        node[self._VALUE] = value
+
+    def remove(self, path: str) -> bool:
+        """Removes the value stored for exactly `path`. Returns False if there was none."""
+        nodes = [self._root]
+        parts = _path_parts(path)
+        for part in parts:
+            node = nodes[-1].get(part)
+            if node is None:
+                return False
+            nodes.append(node)
+        if self._VALUE not in nodes[-1]:
+            return False
+        del nodes[-1][self._VALUE]
+        self._length -= 1
+        # Drop the nodes that no longer lead anywhere
+        for depth in range(len(parts), 0, -1):
+            if nodes[depth]:
+                break
+            del nodes[depth - 1][parts[depth - 1]]
+        return True
+
+    def owner(self, path: str, default=None):
+        """Returns the value of the longest stored path that is `path` itself or a folder containing it."""
+        found = default
+        node = self._root
+        for part in _path_parts(path):
+            node = node.get(part)
+            if node is None:
+                break
+            found = node.get(self._VALUE, found)
+        return found
+
+
+class Workspace(object):
+    """The add-ons below one workspace folder, and which of them a change affects."""
+
+    def __init__(self, workspace_path: str, path_filter: PathFilter = None):
+        self.path = workspace_path
+        self.path_filter = path_filter if path_filter is not None else PathFilter()
+        self.addons = []            # Add-on root paths, sorted
+        self.installed = {}         # Add-on root path -> file name it was last installed under in Blender
+        self._trie = PathTrie()
+
+    def discover(self) -> bool:
+        """Finds the add-on roots again. Returns True if they changed."""
+        addons = discover_addons(self.path, self.path_filter)
+        if addons == self.addons:
+            return False
+        self.addons = addons
+        trie = PathTrie()
+        for root in addons:
+            trie.insert(root, root)
+        self._trie = trie
+        return True
+
+    def owner(self, path: str):
+        """Returns the root of the add-on that `path` belongs to, or None if it is not part of any add-on."""
+        return self._trie.owner(path)
+
+    def _changes_layout(self, changes: ChangeSet) -> bool:
+        """True if `changes` may have added or removed an add-on: any `__init__.py`, or a `.py` file no add-on owns."""
+        for path in changes.paths():
+            name = os.path.basename(path)
+            if name == PACKAGE_INIT or (name.endswith(".py") and self.owner(path) is None):
+                return True
+        return False
+
+    def split_changes(self, changes: ChangeSet) -> dict:
+        """Returns `{add-on root: ChangeSet}` for every add-on that `changes` touches, finding the add-ons again first
+        if the change may have created or removed one. Files outside every add-on are dropped. A file moved from one
+        add-on to another is a deletion in the first and an addition in the second."""
+        if not self.addons or self._changes_layout(changes):
+            self.discover()
+
+        split = {}
+        def changes_for(path):
+            root = self.owner(path)
+            if root is None:
+                return None
+            if root not in split:
+                split[root] = ChangeSet()
+            return split[root]
+
+        for kind in ("added", "modified", "deleted"):
+            for path, signature in getattr(changes, kind).items():
+                owner_changes = changes_for(path)
+                if owner_changes is not None:
+                    getattr(owner_changes, kind)[path] = signature
+        for old_path, (new_path, signature) in changes.moved.items():
+            old_changes = changes_for(old_path)
+            new_changes = changes_for(new_path)
+            if old_changes is not None and old_changes is new_changes:
+                old_changes.moved[old_path] = (new_path, signature)
+                continue
+            if old_changes is not None:
+                old_changes.deleted[old_path] = signature
+            if new_changes is not None:
+                new_changes.added[new_path] = signature
+        return split
@@ -7,9 +7,28 @@ takes care of running all tests.
 import unittest
 
 from tests.test_directory_monitor import TestDirectoryMonitor
+from tests.test_directory_snapshot import TestDirectorySnapshot
+from tests.test_path_filter import TestPathFilter
+from tests.test_content_hash import TestContentHash
+from tests.test_snapshot_cache import TestSnapshotCache
+from tests.test_compact_snapshot import TestCompactSnapshot
+from tests.test_import_graph import TestImportGraph
+from tests.test_addon_sync import TestAddonSync
+from tests.test_import_tracker import TestImportTracker
+from tests.test_preflight import TestPreflight
+from tests.test_swap_profiler import TestSwapProfiler
+from tests.test_main_thread import TestMainThreadQueue
+from tests.test_workspace import TestWorkspace
 from tests.test_bundler import TestBundler
 from tests.test_hot_swap import TestHotSwap_create_addon_name
 from tests.test_hot_swap import TestHotSwap_get_most_recent_bl_name_info
+from tests.test_hot_swap import TestHotSwap_partial_reload
+from tests.test_hot_swap import TestHotSwap_purge_addon_modules
+from tests.test_hot_swap import TestHotSwap_swap_addon
+from tests.test_hot_swap import TestHotSwap_queue_hot_swap
+from tests.test_hot_swap import TestHotSwap_reload_workspace
+from tests.test_hot_swap import TestHotSwap_swap_addons
+from tests.test_hot_swap import TestHotSwap_enable_addon
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,11 @@
+"""
+Helpers shared by the unit tests.
+"""
+import os
+
+def write_file(path, text="Test text. "):
+    # Creates any missing folders, and replaces what was in the file before
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    testfile = open(path, "w")
+    testfile.write(text)
+    testfile.close()
@@ -0,0 +1,112 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from src.addon_sync import MANIFEST_FILE_NAME, load_manifest, sync_addon
+from tests.helpers import write_file
+
+def touch_later(path):
+    later = time.time_ns() + 10 ** 9
+    os.utime(path, ns=(later, later))
+
+class TestAddonSync(unittest.TestCase):
+    def setUp(self):
+        self.test_folder = tempfile.mkdtemp(prefix="_____addon_sync_test")
+        self.source = os.path.join(self.test_folder, "source")
+        self.target = os.path.join(self.test_folder, "installed", "my-addon")
+        os.makedirs(os.path.join(self.source, "icons"))
+        os.makedirs(os.path.join(self.source, "__pycache__"))
+        write_file(os.path.join(self.source, "__init__.py"), "bl_info = {'name': 'My Addon'}\n")
+        write_file(os.path.join(self.source, "operators.py"))
+        write_file(os.path.join(self.source, "icons", "icon.png"), "Image bytes")
+        write_file(os.path.join(self.source, "__pycache__", "operators.cpython-311.pyc"))
+
+    def tearDown(self):
+        shutil.rmtree(self.test_folder, ignore_errors=True)
+
+    ###############################################################
+    # Syncing
+    ###############################################################
+    def test_first_sync_copies_everything(self):
+        report = sync_addon(self.source, self.target)
+        self.assertEqual(report.added, ["__init__.py", "icons/icon.png", "operators.py"])
+        self.assertTrue(os.path.isfile(os.path.join(self.target, "icons", "icon.png")))
+        self.assertFalse(os.path.exists(os.path.join(self.target, "__pycache__")))
+        self.assertEqual(set(load_manifest(self.target)), {"__init__.py", "icons/icon.png", "operators.py"})
+
+    def test_only_changes_are_copied(self):
+        sync_addon(self.source, self.target)
+        write_file(os.path.join(self.source, "operators.py"), "Changed")
+        touch_later(os.path.join(self.source, "operators.py"))
+        write_file(os.path.join(self.source, "panels.py"))
+        os.remove(os.path.join(self.source, "icons", "icon.png"))
+
+        report = sync_addon(self.source, self.target)
+        self.assertEqual(report.added, ["panels.py"])
+        self.assertEqual(report.updated, ["operators.py"])
+        self.assertEqual(report.removed, ["icons/icon.png"])
+        self.assertEqual(report.unchanged, 1)
+        with open(os.path.join(self.target, "operators.py")) as file:
+            self.assertEqual(file.read(), "Changed")
+        self.assertFalse(os.path.exists(os.path.join(self.target, "icons")))    # Emptied folders are removed
+
+        self.assertFalse(sync_addon(self.source, self.target))
+
+    def test_dry_run_changes_nothing(self):
+        report = sync_addon(self.source, self.target, dry_run=True)
+        self.assertEqual(len(report.added), 3)
+        self.assertIn("+ icons/icon.png", report.lines())
+        self.assertEqual(report.bytes_copied, sum(os.path.getsize(os.path.join(self.source, path))
+            for path in ("__init__.py", "operators.py", os.path.join("icons", "icon.png"))))
+        self.assertFalse(os.path.exists(self.target))
+
+    def test_changed_paths_only(self):
+        sync_addon(self.source, self.target)
+        write_file(os.path.join(self.source, "operators.py"), "Changed")
+        touch_later(os.path.join(self.source, "operators.py"))
+        os.remove(os.path.join(self.source, "icons", "icon.png"))
+
+        report = sync_addon(self.source, self.target, changed_paths=[os.path.join(self.source, "operators.py")])
+        self.assertEqual(report.updated, ["operators.py"])
+        self.assertEqual(report.removed, [])    # Not in the changed paths, so not looked at
+        report = sync_addon(self.source, self.target,
+            changed_paths=[os.path.join(self.source, "icons", "icon.png")])
+        self.assertEqual(report.removed, ["icons/icon.png"])
+
+    def test_verify_hash_skips_touched_files(self):
+        sync_addon(self.source, self.target, verify_hash=True)
+        touch_later(os.path.join(self.source, "operators.py"))
+        self.assertTrue(sync_addon(self.source, self.target, dry_run=True))     # Without hashing it looks changed
+        self.assertFalse(sync_addon(self.source, self.target, verify_hash=True))
+        self.assertFalse(sync_addon(self.source, self.target))      # The manifest has the new time now
+
+    def test_unlisted_installed_files_are_kept(self):
+        sync_addon(self.source, self.target)
+        write_file(os.path.join(self.target, "user_settings.json"))
+        sync_addon(self.source, self.target)
+        self.assertTrue(os.path.isfile(os.path.join(self.target, "user_settings.json")))
+
+    def test_existing_copy_is_adopted(self):
+        # An install copied before manifests existed is not copied again
+        shutil.copytree(self.source, self.target)
+        report = sync_addon(self.source, self.target)
+        self.assertFalse(report)
+        self.assertEqual(report.unchanged, 3)
+        self.assertTrue(os.path.isfile(os.path.join(self.target, MANIFEST_FILE_NAME)))
+
+    def test_first_sync_removes_stale_files(self):
+        # An install copied before manifests existed may hold files since deleted from the source
+        shutil.copytree(self.source, self.target)
+        write_file(os.path.join(self.target, "old_module.py"))
+        write_file(os.path.join(self.target, "old_icons", "icon.png"))
+        report = sync_addon(self.source, self.target, changed_paths=[os.path.join(self.source, "operators.py")])
+        self.assertEqual(report.removed, ["old_icons/icon.png", "old_module.py"])
+        self.assertFalse(os.path.exists(os.path.join(self.target, "old_module.py")))
+        self.assertFalse(os.path.exists(os.path.join(self.target, "old_icons")))
+        self.assertTrue(os.path.isdir(os.path.join(self.target, "__pycache__")))    # Skipped by the path filter
+        self.assertEqual(set(load_manifest(self.target)), {"__init__.py", "operators.py", "icons/icon.png"})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from src.compact_snapshot import CompactSnapshot, benchmark_snapshot, diff_compact, take_compact_snapshot
+from src.directory_snapshot import diff_snapshots, take_snapshot, update_snapshot
+from tests.helpers import write_file
+
+class TestCompactSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.test_folder = tempfile.mkdtemp(prefix="_____compact_test")
+        self.subfolder = os.path.join(self.test_folder, "subfolder")
+        os.mkdir(self.subfolder)
+        self.file1 = os.path.join(self.test_folder, "_____testfile1.txt")
+        self.file2 = os.path.join(self.subfolder, "_____testfile2.txt")
+        self.file3 = os.path.join(self.subfolder, "_____testfile3.txt")
+        write_file(self.file1)
+        write_file(self.file2)
+        write_file(self.file3)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_folder, ignore_errors=True)
+
+    ###############################################################
+    # Mapping Behavior
+    ###############################################################
+    def test_matches_dictionary_snapshot(self):
+        snapshot = take_snapshot(self.test_folder)
+        compact = take_compact_snapshot(self.test_folder)
+        self.assertEqual(len(compact), len(snapshot))
+        self.assertEqual(dict(compact.items()), snapshot)
+        self.assertEqual(compact[self.file2], snapshot[self.file2])
+        self.assertIn(self.file3, compact)
+        self.assertNotIn(self.file3 + "abcd", compact)
+
+    def test_set_and_delete(self):
+        compact = CompactSnapshot(self.test_folder, take_snapshot(self.test_folder))
+        compact[self.file2] = (1, 2, 3)
+        self.assertEqual(compact[self.file2], (1, 2, 3))
+        del compact[self.file1]
+        self.assertNotIn(self.file1, compact)
+        self.assertEqual(len(compact), 2)
+        outside_path = os.path.join(os.path.dirname(self.test_folder), "_____outside.txt")
+        compact[outside_path] = (4, 5, 6)
+        self.assertEqual(compact.get(outside_path), (4, 5, 6))
+        self.assertEqual(len(compact), 3)
+
+    def test_updates_in_a_large_flat_folder(self):
+        # Every change is looked up by name, so updating each file of a big folder stays fast and matches a dictionary
+        file_paths = [os.path.join(self.subfolder, "file" + str(index) + ".png") for index in range(20000)]
+        snapshot = {file_path: (index, index, index) for index, file_path in enumerate(file_paths)}
+        compact = CompactSnapshot(self.test_folder)
+        compact.add_folder(self.subfolder, snapshot)
+        start = time.perf_counter()
+        for index, file_path in enumerate(file_paths):
+            if index % 3 == 0:
+                del compact[file_path]
+                del snapshot[file_path]
+            else:
+                compact[file_path] = snapshot[file_path] = (index, index + 1, index)
+        self.assertLess(time.perf_counter() - start, 2)
+        self.assertEqual(dict(compact.items()), snapshot)
+        self.assertEqual(len(compact), len(snapshot))
+        compact[file_paths[0]] = (0, 0, 0)      # Deleted, so added back at the end
+        self.assertEqual(compact[file_paths[0]], (0, 0, 0))
+
+    ###############################################################
+    # Comparing Snapshots
+    ###############################################################
+    def test_diff_matches_dictionary_diff(self):
+        before = take_snapshot(self.test_folder)
+        compact_before = take_compact_snapshot(self.test_folder)
+        write_file(self.file2, "Additional Test Text. ")
+        os.remove(self.file3)
+        new_folder = os.path.join(self.test_folder, "new_folder")
+        os.mkdir(new_folder)
+        write_file(os.path.join(new_folder, "_____testfile4.txt"))
+
+        changes = diff_snapshots(before, take_snapshot(self.test_folder))
+        compact_changes = diff_compact(compact_before, take_compact_snapshot(self.test_folder))
+        self.assertEqual(compact_changes.added, changes.added)
+        self.assertEqual(compact_changes.modified, changes.modified)
+        self.assertEqual(compact_changes.deleted, changes.deleted)
+
+    def test_diff_removed_folder(self):
+        compact_before = take_compact_snapshot(self.test_folder)
+        shutil.rmtree(self.subfolder)
+        changes = diff_compact(compact_before, take_compact_snapshot(self.test_folder))
+        self.assertEqual(sorted(changes.deleted), sorted([self.file2, self.file3]))
+
+    def test_update_snapshot_accepts_compact(self):
+        compact = take_compact_snapshot(self.test_folder)
+        write_file(self.file2, "Additional Test Text. ")
+        changes = update_snapshot(compact, [self.file2], self.test_folder)
+        self.assertEqual(list(changes.modified), [self.file2])
+        self.assertEqual(compact[self.file2], take_snapshot(self.file2)[self.file2])
+
+    def test_benchmark_reports_memory_and_time(self):
+        results = benchmark_snapshot(self.test_folder, repeat=1)
+        self.assertEqual(results["files"], 3)
+        self.assertGreater(results["dict_bytes_per_file"], 0)
+        self.assertGreater(results["compact_bytes_per_file"], 0)
+        self.assertGreaterEqual(results["compact_diff_seconds"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from src.content_hash import ContentHashCache
+from src.directory_snapshot import ChangeSet, take_snapshot
+from tests.helpers import write_file
+
+def bump_modified_time(path):
+    # Same effect as `touch`: a new modified time, but identical contents
+    stat_result = os.stat(path)
+    os.utime(path, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 1000000000))
+
+class TestContentHash(unittest.TestCase):
+    def setUp(self):
+        self.test_folder = tempfile.mkdtemp(prefix="_____content_hash_test")
+        self.file1 = os.path.join(self.test_folder, "_____testfile1.txt")
+        write_file(self.file1, "Test text. ")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_folder, ignore_errors=True)
+
+    def wait_for_digest(self, cache, path):
+        counter = 0
+        while counter < 50 and path not in cache._digests:
+            counter += 1
+            time.sleep(.01)
+
+    def test_touched_file_is_dropped(self):
+        cache = ContentHashCache()
+        cache.prime(take_snapshot(self.file1))
+        self.wait_for_digest(cache, self.file1)
+
+        bump_modified_time(self.file1)
+        changes = ChangeSet(modified=take_snapshot(self.file1))
+        verified, dropped = cache.filter_changes(changes)
+
+        self.assertFalse(verified)
+        self.assertEqual(dropped, 1)
+
+    def test_changed_contents_are_kept(self):
+        cache = ContentHashCache()
+        cache.prime(take_snapshot(self.file1))
+        self.wait_for_digest(cache, self.file1)
+
+        write_file(self.file1, "Different text. ")
+        changes = ChangeSet(modified=take_snapshot(self.file1))
+        verified, dropped = cache.filter_changes(changes)
+
+        self.assertEqual(list(verified.modified), [self.file1])
+        self.assertEqual(dropped, 0)
+
+    def test_unknown_previous_contents_are_kept(self):
+        """Without a digest to compare against, a modification has to be treated as real."""
+        cache = ContentHashCache()
+        bump_modified_time(self.file1)
+        verified, dropped = cache.filter_changes(ChangeSet(modified=take_snapshot(self.file1)))
+
+        self.assertEqual(list(verified.modified), [self.file1])
+        self.assertEqual(dropped, 0)
+
+    def test_digest_is_cached_by_signature(self):
+        cache = ContentHashCache()
+        signature = take_snapshot(self.file1)[self.file1]
+        first_digest = cache.digest(self.file1, signature)
+        cache._digests[self.file1] = (signature, b"cached")
+        self.assertEqual(cache.digest(self.file1, signature), b"cached")
+        self.assertNotEqual(first_digest, b"cached")
+
+
+if __name__ == '__main__':
+    unittest.main()
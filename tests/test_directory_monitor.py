@@ -1,8 +1,14 @@
 import os
+import shutil
+import tempfile
+import threading
 import time
 import unittest
 
 from src.directory_monitor import monitor, DirectoryMonitor
+from src.monitor_backends import DaemonBackend, InotifyBackend
+from src.path_filter import PathFilter
+from src.watcher_daemon import stop_daemon
 
 # Verify good file and folder works (The test file and folder have to exist)
 good_file_path = os.path.abspath(__file__)
@@ -13,9 +19,9 @@ bad_folder_path = os.path.dirname(__file__) + 'abcd'    # Nonsense path
 
 # These filenames and paths should be obscure enough to not exist outside this test suite
 testfile_name = "_____testfile.txt"
-testfile_path = os.path.join(good_folder_path, "tests\\", testfile_name)
+testfile_path = os.path.join(good_folder_path, "tests", testfile_name)
 testfile2_name = "_____testfile2.txt"
-testfile2_path = os.path.join(good_folder_path, "src\\", testfile2_name)
+testfile2_path = os.path.join(good_folder_path, "src", testfile2_name)
     
 def create_test_files():
     testfile = open(testfile_path, "w")
@@ -47,6 +53,16 @@ class TestDirectoryMonitor(unittest.TestCase):
     def setUp(self):
         monitor._directory = ""
         monitor._polling_delay = .15
+        monitor._backend_name = "auto"
+        monitor._debounce_delay = 0
+        monitor._verify_content = False
+        monitor._max_polling_delay = 2
+        monitor._backoff_factor = 1.5
+        monitor._backoff_idle_time = 5
+
+    def tearDown(self):
+        # The test files are written inside the repository, so never leave them behind
+        delete_test_files()
 
     ###############################################################
     # Verify Default Properties
@@ -60,6 +76,9 @@ class TestDirectoryMonitor(unittest.TestCase):
     def test_default_directory(self):
         self.assertEqual(monitor.directory, "")
 
+    def test_default_backend(self):
+        self.assertEqual(monitor.backend, "auto")
+
     ###############################################################
     # Verify Property Setting/Getting Methods
     ###############################################################
@@ -112,6 +131,83 @@ class TestDirectoryMonitor(unittest.TestCase):
         self.assertEqual(monitor.directory, good_folder_path)
 
 
+    def test_prop_update_debounce(self):
+        # The debounce delay can be 0 (turned off), but the maximum latency has to be greater than 0
+        monitor.debounce_delay = .5
+        self.assertEqual(monitor.debounce_delay, .5)
+        monitor.debounce_delay = 0
+        self.assertEqual(monitor.debounce_delay, 0)
+        monitor.debounce_delay = -1
+        self.assertEqual(monitor.debounce_delay, 0)
+        monitor.debounce_delay = 'abc'
+        self.assertEqual(monitor.debounce_delay, 0)
+
+        monitor.max_debounce_latency = 5
+        self.assertEqual(monitor.max_debounce_latency, 5)
+        monitor.max_debounce_latency = 0
+        self.assertEqual(monitor.max_debounce_latency, 5)
+        monitor.max_debounce_latency = 2   # Reset to default
+
+    def test_prop_update_backoff(self):
+        monitor.max_polling_delay = 10
+        self.assertEqual(monitor.max_polling_delay, 10)
+        monitor.max_polling_delay = 0
+        self.assertEqual(monitor.max_polling_delay, 10)
+        monitor.max_polling_delay = 2   # Reset to default
+
+        # A factor of exactly 1 turns the backoff off, anything smaller would speed up polling while idle
+        monitor.backoff_factor = 1
+        self.assertEqual(monitor.backoff_factor, 1)
+        monitor.backoff_factor = .5
+        self.assertEqual(monitor.backoff_factor, 1)
+        monitor.backoff_factor = 1.5    # Reset to default
+
+        monitor.backoff_idle_time = 0
+        self.assertEqual(monitor.backoff_idle_time, 0)
+        monitor.backoff_idle_time = -1
+        self.assertEqual(monitor.backoff_idle_time, 0)
+        monitor.backoff_idle_time = 5   # Reset to default
+
+    def test_prop_update_verify_content(self):
+        monitor.verify_content = True
+        self.assertTrue(monitor.verify_content)
+        monitor.verify_content = 1
+        self.assertTrue(monitor.verify_content)
+        monitor.verify_content = False
+        self.assertFalse(monitor.verify_content)
+
+    def test_prop_update_backend(self):
+        monitor.backend = "polling"
+        self.assertEqual(monitor.backend, "polling")
+        monitor.backend = "inotify"
+        self.assertEqual(monitor.backend, "inotify")
+        # Unknown backends should do nothing
+        monitor.backend = "not a backend"
+        self.assertEqual(monitor.backend, "inotify")
+        monitor.backend = 123
+        self.assertEqual(monitor.backend, "inotify")
+        monitor.backend = "auto"   # Reset to default
+
+    def test_prop_update_patterns(self):
+        monitor.include_patterns = ["*.py"]
+        self.assertEqual(monitor.include_patterns, ("*.py",))
+        monitor.include_patterns = "*.py"   # Must be a list, not a single string
+        self.assertEqual(monitor.include_patterns, ("*.py",))
+        monitor.include_patterns = []
+        self.assertEqual(monitor.include_patterns, ())
+
+        default_excludes = monitor.exclude_patterns
+        monitor.exclude_patterns = [123]
+        self.assertEqual(monitor.exclude_patterns, default_excludes)
+
+        monitor.ignore_file = bad_file_path
+        self.assertEqual(monitor.ignore_file, "")
+        monitor.ignore_file = good_file_path
+        self.assertEqual(monitor.ignore_file, good_file_path)
+        monitor.ignore_file = ""
+        self.assertEqual(monitor.ignore_file, "")
+
+
     ###############################################################
     # Subscribe and Unsubscribe
     ###############################################################
@@ -594,15 +690,720 @@ class TestDirectoryMonitor(unittest.TestCase):
         self.assertEqual(testval, 11)
 
 
+    def test_add_and_delete_files_in_same_poll(self):
+        # Adding one file and deleting another before the next scan leaves the file count unchanged. Both changes
+        #   should still be detected and reported.
+        test_folder = tempfile.mkdtemp(prefix="_____monitor_test")
+        original_path = os.path.join(test_folder, testfile_name)
+        renamed_path = os.path.join(test_folder, testfile2_name)
+        open(original_path, "w").close()
+        monitor.directory = test_folder
+
+        testval = 1
+        def test():
+            nonlocal testval
+            testval += 10
+
+        monitor.clear_subscribers()
+        monitor.subscribe('test', test)
+        monitor._scan_and_update(monitor.directory)   # Establish the baseline without starting the timer
+        open(renamed_path, "w").close()     # A new file rather than a rename, which would be reported as a move
+        os.remove(original_path)
+        monitor._scan_and_update(monitor.directory)
+        changes = monitor.last_change_set
+        monitor.secure()
+        monitor.clear_subscribers()
+        shutil.rmtree(test_folder, ignore_errors=True)
+
+        self.assertEqual(testval, 21)
+        self.assertEqual(list(changes.added), [renamed_path])
+        self.assertEqual(list(changes.deleted), [original_path])
+
+    @unittest.skipUnless(InotifyBackend.is_supported(), "inotify is only available on Linux")
+    def test_inotify_backend_detects_files_in_new_folder(self):
+        # The event backend has to start watching folders created after monitoring began
+        test_folder = tempfile.mkdtemp(prefix="_____monitor_test")
+        monitor.directory = test_folder
+        monitor.backend = "inotify"
+
+        testval = 1
+        def test():
+            nonlocal testval
+            testval += 10
+
+        monitor.clear_subscribers()
+        monitor.subscribe('test', test)
+        monitor.watch()
+        self.assertIsNotNone(monitor._backend)
+        new_folder = os.path.join(test_folder, "new_folder")
+        os.mkdir(new_folder)
+        time.sleep(monitor.polling_delay)
+        open(os.path.join(new_folder, testfile_name), "w").close()
+        counter = 0
+        while counter < 5 and testval < 11:
+            counter += 1
+            time.sleep(monitor.polling_delay)
+        monitor.secure()
+        monitor.clear_subscribers()
+        shutil.rmtree(test_folder, ignore_errors=True)
+
+        self.assertEqual(testval, 11)   # The folder started empty, so only the new file runs the scripts
+        self.assertFalse(monitor.active)
+
+    @unittest.skipUnless(InotifyBackend.is_supported(), "inotify is only available on Linux")
+    def test_inotify_backend_follows_new_exclude_rules(self):
+        # A folder excluded when the backend started is watched as soon as the rules stop excluding it
+        test_folder = tempfile.mkdtemp(prefix="_____monitor_test")
+        skipped_folder = os.path.join(test_folder, "skipped")
+        os.mkdir(skipped_folder)
+        test_monitor = DirectoryMonitor(test_folder)
+        test_monitor.backend = "inotify"
+        test_monitor.exclude_patterns = ["skipped/"]
+
+        added = []
+        test_monitor.subscribe('test', lambda changes: added.extend(changes.added), pass_changes=True)
+        test_monitor.watch()
+        backend = test_monitor._backend
+        test_monitor.exclude_patterns = []
+        time.sleep(test_monitor.polling_delay)
+        new_path = os.path.join(skipped_folder, testfile_name)
+        open(new_path, "w").close()
+        counter = 0
+        while counter < 10 and new_path not in added:
+            counter += 1
+            time.sleep(test_monitor.polling_delay)
+        restarted = test_monitor._backend is not backend
+        test_monitor.secure()
+        shutil.rmtree(test_folder, ignore_errors=True)
+
+        self.assertTrue(restarted)
+        self.assertIn(new_path, added)
+
+    @unittest.skipUnless(InotifyBackend.is_supported(), "inotify is only available on Linux")
+    def test_inotify_backend_follows_new_directory(self):
+        # Changing the directory of a running monitor watches the new folder, and no longer the old one
+        test_folder = tempfile.mkdtemp(prefix="_____monitor_test")
+        old_folder = os.path.join(test_folder, "a")
+        new_folder = os.path.join(test_folder, "b")
+        os.mkdir(old_folder)
+        os.mkdir(new_folder)
+        test_monitor = DirectoryMonitor(old_folder)
+        test_monitor.backend = "inotify"
+
+        added = []
+        test_monitor.subscribe('test', lambda changes: added.extend(changes.added), pass_changes=True)
+        test_monitor.watch()
+        backend = test_monitor._backend
+        test_monitor.directory = new_folder
+        time.sleep(test_monitor.polling_delay)
+        old_path = os.path.join(old_folder, testfile_name)
+        new_path = os.path.join(new_folder, testfile_name)
+        open(old_path, "w").close()
+        open(new_path, "w").close()
+        counter = 0
+        while counter < 10 and new_path not in added:
+            counter += 1
+            time.sleep(test_monitor.polling_delay)
+        restarted = test_monitor._backend is not backend
+        test_monitor.secure()
+        shutil.rmtree(test_folder, ignore_errors=True)
+
+        self.assertTrue(restarted)
+        self.assertIn(new_path, added)
+        self.assertNotIn(old_path, added)
+
+    def test_relative_ignore_file_changes_apply(self):
+        # Editing the ignore file applies its new rules, even when it was given relative to the working directory
+        test_folder = tempfile.mkdtemp(prefix="_____monitor_test")
+        ignore_file = os.path.join(test_folder, ".monitorignore")
+        open(ignore_file, "w").write("*.log\n")
+        log_path = os.path.join(test_folder, "build.log")
+        test_monitor = DirectoryMonitor(test_folder)
+        test_monitor.backend = "polling"
+        test_monitor.ignore_file = os.path.relpath(ignore_file)
+
+        test_monitor._scan_and_update(test_folder)
+        open(log_path, "w").close()
+        open(ignore_file, "w").write("# Nothing ignored anymore\n")
+        test_monitor._scan_and_update(test_folder)
+        changes = test_monitor._scan_and_update(test_folder)
+        shutil.rmtree(test_folder, ignore_errors=True)
+
+        self.assertEqual(list(changes.added), [log_path])
+
+    def test_changes_in_excluded_folders_do_not_fire(self):
+        # Files in excluded folders are never scanned, so writing to them should not run any scripts
+        test_folder = tempfile.mkdtemp(prefix="_____monitor_test")
+        os.mkdir(os.path.join(test_folder, "__pycache__"))
+        open(os.path.join(test_folder, testfile_name), "w").close()
+        monitor.directory = test_folder
+        monitor.backend = "polling"
+
+        testval = 1
+        def test():
+            nonlocal testval
+            testval += 10
+
+        monitor.clear_subscribers()
+        monitor.subscribe('test', test)
+        monitor.watch()
+        open(os.path.join(test_folder, "__pycache__", "module.cpython-310.pyc"), "w").close()
+        open(os.path.join(test_folder, "module.py.swp"), "w").close()
+        time.sleep(monitor.polling_delay * 2)
+        monitor.secure()
+        monitor.clear_subscribers()
+        shutil.rmtree(test_folder, ignore_errors=True)
+
+        self.assertEqual(testval, 11)
+
+    def test_debounce_merges_burst_into_one_run(self):
+        # Writing several files across multiple polls should only run the scripts once, after the burst is over
+        test_folder = tempfile.mkdtemp(prefix="_____monitor_test")
+        monitor.directory = test_folder
+        monitor.backend = "polling"
+        monitor.polling_delay = .05
+        monitor.debounce_delay = .4
+
+        testval = 1
+        def test():
+            nonlocal testval
+            testval += 10
+
+        monitor.clear_subscribers()
+        monitor.subscribe('test', test)
+        monitor.watch()
+        for index in range(4):
+            open(os.path.join(test_folder, str(index) + testfile_name), "w").close()
+            time.sleep(monitor.polling_delay * 2)
+        os.remove(os.path.join(test_folder, "0" + testfile_name))
+        counter = 0
+        while counter < 20 and testval < 11:
+            counter += 1
+            time.sleep(monitor.polling_delay)
+        changes = monitor.last_change_set
+        monitor.secure()
+        monitor.clear_subscribers()
+        shutil.rmtree(test_folder, ignore_errors=True)
+
+        self.assertEqual(testval, 11)
+        self.assertEqual(sorted(os.path.basename(path) for path in changes.added),
+            ["1" + testfile_name, "2" + testfile_name, "3" + testfile_name])
+        self.assertEqual(changes.deleted, {})
+
+    def test_idle_polling_backs_off_and_resets(self):
+        # Without changes, polling slows down toward the maximum. A change or reset brings it right back.
+        test_folder = tempfile.mkdtemp(prefix="_____monitor_test")
+        monitor.directory = test_folder
+        monitor.backend = "polling"
+        monitor.polling_delay = .02
+        monitor.max_polling_delay = .16
+        monitor.backoff_factor = 2
+        monitor.backoff_idle_time = 0
+
+        testval = 1
+        def test():
+            nonlocal testval
+            testval += 10
+
+        monitor.clear_subscribers()
+        monitor.subscribe('test', test)
+        monitor.watch()
+        time.sleep(.5)
+        backed_off_delay = monitor.current_polling_delay
+        monitor.reset_backoff()
+        reset_delay = monitor.current_polling_delay
+        open(os.path.join(test_folder, testfile_name), "w").close()
+        counter = 0
+        while counter < 20 and testval < 11:
+            counter += 1
+            time.sleep(monitor.polling_delay)
+        monitor.secure()
+        monitor.clear_subscribers()
+        shutil.rmtree(test_folder, ignore_errors=True)
+
+        self.assertEqual(backed_off_delay, .16)
+        self.assertEqual(reset_delay, .02)
+        self.assertEqual(testval, 11)
+
+    def test_verify_content_ignores_touched_file(self):
+        # Changing only the modified time should not run the scripts when verifying content, but real edits should
+        test_folder = tempfile.mkdtemp(prefix="_____monitor_test")
+        test_file = os.path.join(test_folder, testfile_name)
+        with open(test_file, "w") as file:
+            file.write("Test text. ")
+        monitor.directory = test_folder
+        monitor.backend = "polling"
+        monitor.verify_content = True
+
+        testval = 1
+        def test():
+            nonlocal testval
+            testval += 10
+
+        monitor.clear_subscribers()
+        monitor.subscribe('test', test)
+        monitor.watch()
+        time.sleep(monitor.polling_delay * 2)   # Give the background hashing time to finish
+        stat_result = os.stat(test_file)
+        os.utime(test_file, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 1000000000))
+        time.sleep(monitor.polling_delay * 2)
+        touched_testval = testval
+        with open(test_file, "a") as file:
+            file.write("Additional Test Text. ")
+        counter = 0
+        while counter < 5 and testval < 21:
+            counter += 1
+            time.sleep(monitor.polling_delay)
+        monitor.secure()
+        monitor.clear_subscribers()
+        shutil.rmtree(test_folder, ignore_errors=True)
+
+        self.assertEqual(touched_testval, 11)
+        self.assertEqual(testval, 21)
+
     ###############################################################
-    # Test Singleton
+    # Pattern Subscriptions
     ###############################################################
-    def test_singleton(self):
-        # Call a new instance of DirectoryMonitor. In a normal class inheritance,
-        #   the new instance would get default values. With this singleton, it should
-        #    be the same as the original (which we modified away from default above).
+    def test_pattern_subscription_only_runs_on_matching_changes(self):
+        test_folder = tempfile.mkdtemp(prefix="_____monitor_test")
+        os.mkdir(os.path.join(test_folder, "icons"))
+        open(os.path.join(test_folder, "_____start.txt"), "w").close()
+        test_monitor = DirectoryMonitor(test_folder)
+        test_monitor.backend = "polling"
+
+        received = []
+        def python_changes(changes):
+            received.append(changes)
+
+        plain_runs = 0
+        def any_change():
+            nonlocal plain_runs
+            plain_runs += 1
+
+        test_monitor.subscribe('python', python_changes, ['*.py', 'icons/**'], pass_changes=True)
+        test_monitor.subscribe('plain', any_change)
+        test_monitor.watch()    # No matching files yet, so only 'any_change' runs
+
+        open(os.path.join(test_folder, "_____notes.txt"), "w").close()
+        counter = 0
+        while counter < 10 and plain_runs < 2:
+            counter += 1
+            time.sleep(test_monitor.polling_delay)
+        python_file = os.path.join(test_folder, "_____module.py")
+        open(python_file, "w").close()
+        counter = 0
+        while counter < 10 and not received:
+            counter += 1
+            time.sleep(test_monitor.polling_delay)
+        test_monitor.secure()
+        shutil.rmtree(test_folder, ignore_errors=True)
+
+        self.assertEqual(plain_runs, 3)
+        self.assertEqual(len(received), 1)
+        self.assertEqual(list(received[0].added), [python_file])
+
+    def test_subscribe_invalid_patterns(self):
+        def test():
+            pass
+        monitor.clear_subscribers()
+        monitor.subscribe('test', test, "*.py")
+        self.assertEqual(len(monitor._subscribers), 0)
+
+    ###############################################################
+    # Snapshot Cache
+    ###############################################################
+    def test_cache_reports_offline_changes_as_initial_change_set(self):
+        test_folder = tempfile.mkdtemp(prefix="_____monitor_test")
+        cache_folder = tempfile.mkdtemp(prefix="_____monitor_test")
+        unchanged_path = os.path.join(test_folder, testfile_name)
+        offline_path = os.path.join(test_folder, testfile2_name)
+        open(unchanged_path, "w").close()
+
+        first_session = DirectoryMonitor(test_folder)
+        first_session.backend = "polling"
+        first_session.cache_file = os.path.join(cache_folder, "snapshot.cache")
+        first_session.watch()
+        first_session.secure()  # Saves the cache
+
+        open(offline_path, "w").close()     # Edited while "Blender was closed"
+
+        received = []
+        second_session = DirectoryMonitor(test_folder)
+        second_session.backend = "polling"
+        second_session.cache_file = os.path.join(cache_folder, "snapshot.cache")
+        second_session.subscribe('test', received.append, pass_changes=True)
+        second_session.watch()
+        second_session.secure()
+        shutil.rmtree(test_folder, ignore_errors=True)
+        shutil.rmtree(cache_folder, ignore_errors=True)
+
+        self.assertEqual(len(received), 1)
+        self.assertEqual(list(received[0].added), [offline_path])
+
+    def test_cache_is_not_loaded_after_ignore_file_edit(self):
+        # The ignore file keeps its path, but a snapshot taken with its old rules no longer applies
+        test_folder = tempfile.mkdtemp(prefix="_____monitor_test")
+        cache_folder = tempfile.mkdtemp(prefix="_____monitor_test")
+        ignore_file = os.path.join(test_folder, ".monitorignore")
+        cache_file = os.path.join(cache_folder, "snapshot.cache")
+        open(ignore_file, "w").write("*.log\n")
+        open(os.path.join(test_folder, "debug.log"), "w").close()
+
+        first_session = DirectoryMonitor(test_folder)
+        first_session.backend = "polling"
+        first_session.ignore_file = ignore_file
+        first_session.cache_file = cache_file
+        first_session.watch()
+        first_session.secure()  # Saves the cache
+
+        open(ignore_file, "w").write("# Nothing ignored any more\n")
+        second_session = DirectoryMonitor(test_folder)
+        second_session.ignore_file = ignore_file
+        second_session.cache_file = cache_file
+        second_session._load_snapshot_cache()
+        loaded = dict(second_session._snapshot)
+        shutil.rmtree(test_folder, ignore_errors=True)
+        shutil.rmtree(cache_folder, ignore_errors=True)
+
+        self.assertEqual(loaded, {})
+
+    def test_cache_file_property(self):
+        test_monitor = DirectoryMonitor()
+        test_monitor.cache_file = os.path.join(bad_folder_path, "snapshot.cache")
+        self.assertEqual(test_monitor.cache_file, "")
+        test_monitor.cache_file = os.path.join(good_folder_path, "snapshot.cache")
+        self.assertEqual(test_monitor.cache_file, os.path.join(good_folder_path, "snapshot.cache"))
+
+    ###############################################################
+    # Parallel and Budgeted Scans
+    ###############################################################
+    def test_scan_worker_properties(self):
+        test_monitor = DirectoryMonitor()
+        test_monitor.scan_workers = 8
+        test_monitor.scan_queue_depth = 16
+        self.assertEqual(test_monitor.scan_workers, 8)
+        self.assertEqual(test_monitor.scan_queue_depth, 16)
+        test_monitor.scan_workers = 0
+        test_monitor.scan_queue_depth = "abc"
+        self.assertEqual(test_monitor.scan_workers, 8)
+        self.assertEqual(test_monitor.scan_queue_depth, 16)
+
+    def test_budgeted_scan_detects_changes(self):
+        test_folder = tempfile.mkdtemp(prefix="_____monitor_test")
+        for folder_number in range(5):
+            os.mkdir(os.path.join(test_folder, "folder" + str(folder_number)))
+        test_monitor = DirectoryMonitor(test_folder)
+        test_monitor.backend = "polling"
+        test_monitor.polling_delay = .05
+        test_monitor.scan_budget_entries = 2    # Each sweep takes several polls
+
+        testval = 1
+        def test():
+            nonlocal testval
+            testval += 10
+
+        test_monitor.subscribe('test', test)
+        test_monitor.watch()
+        open(os.path.join(test_folder, "folder3", testfile_name), "w").close()
+        counter = 0
+        while counter < 40 and testval < 11:
+            counter += 1
+            time.sleep(test_monitor.polling_delay)
+        sweep_time = test_monitor.sweep_time
+        test_monitor.secure()
+        shutil.rmtree(test_folder, ignore_errors=True)
+
+        self.assertEqual(testval, 11)
+        self.assertGreater(sweep_time, test_monitor.polling_delay)  # Spread across polls
+
+    def test_scan_budget_properties(self):
+        test_monitor = DirectoryMonitor()
+        test_monitor.scan_budget_entries = 500
+        test_monitor.scan_budget_time = 2000
+        test_monitor.scan_budget_entries = -1
+        test_monitor.scan_budget_time = 1.5
+        self.assertEqual(test_monitor.scan_budget_entries, 500)
+        self.assertEqual(test_monitor.scan_budget_time, 2000)
+
+    ###############################################################
+    # Compact Snapshot
+    ###############################################################
+    def test_compact_snapshot_detects_changes(self):
+        test_folder = tempfile.mkdtemp(prefix="_____monitor_test")
+        test_monitor = DirectoryMonitor(test_folder)
+        test_monitor.backend = "polling"
+        test_monitor.compact_snapshot = True
+
+        received = []
+        test_monitor.subscribe('test', received.append, pass_changes=True)
+        test_monitor.watch()
+        new_file = os.path.join(test_folder, testfile_name)
+        open(new_file, "w").close()
+        counter = 0
+        while counter < 10 and not received:
+            counter += 1
+            time.sleep(test_monitor.polling_delay)
+        test_monitor.secure()
+        shutil.rmtree(test_folder, ignore_errors=True)
+
+        self.assertEqual(len(received), 1)
+        self.assertEqual(list(received[0].added), [new_file])
+
+    ###############################################################
+    # Stop and Wake
+    ###############################################################
+    def test_wake_scans_immediately(self):
+        test_folder = tempfile.mkdtemp(prefix="_____monitor_test")
+        test_monitor = DirectoryMonitor(test_folder)
+        test_monitor.backend = "polling"
+        test_monitor.polling_delay = 30     # Long enough that only 'wake()' can find the change in time
+
+        testval = 1
+        def test():
+            nonlocal testval
+            testval += 10
+
+        test_monitor.subscribe('test', test)
+        test_monitor.watch()
+        open(os.path.join(test_folder, testfile_name), "w").close()
+        test_monitor.wake()
+        counter = 0
+        while counter < 20 and testval < 11:
+            counter += 1
+            time.sleep(.05)
+        test_monitor.secure()
+        shutil.rmtree(test_folder, ignore_errors=True)
+
+        self.assertEqual(testval, 11)   # The folder started empty, so watching did not run the subscriber
+
+    def test_wake_while_secured_does_nothing(self):
+        test_monitor = DirectoryMonitor(good_folder_path)
+        test_monitor.wake()
+        self.assertFalse(test_monitor.active)
+
+    def test_secure_does_not_wait_for_full_scan(self):
+        # Securing stops a running scan at the next folder instead of waiting for it to finish the tree
+        test_folder = tempfile.mkdtemp(prefix="_____monitor_test")
+        for folder_number in range(50):
+            os.mkdir(os.path.join(test_folder, "folder" + str(folder_number)))
+
+        class SlowFilter(PathFilter):
+            def excludes_folder(self, relative_path, name):
+                time.sleep(.02)     # Like a slow network drive
+                return super().excludes_folder(relative_path, name)
+
+        test_monitor = DirectoryMonitor(test_folder)
+        test_monitor._path_filter = SlowFilter()
+        test_monitor._stopped.clear()   # As if watching, without the first scan
+        results = []
+        scan_thread = threading.Thread(target=lambda: results.append(test_monitor._scan_and_update(test_folder)))
+        scan_thread.start()
+        time.sleep(.1)
+        secure_start = time.monotonic()
+        test_monitor.secure()
+        secure_time = time.monotonic() - secure_start
+        scan_thread.join()
+        shutil.rmtree(test_folder, ignore_errors=True)
+
+        self.assertLess(secure_time, .5)    # The whole scan takes at least a second
+        self.assertEqual(results, [None])
+        self.assertEqual(test_monitor._snapshot, {})
+
+    def test_secure_cancels_scheduled_poll(self):
+        test_folder = tempfile.mkdtemp(prefix="_____monitor_test")
+        test_monitor = DirectoryMonitor(test_folder)
+        test_monitor.backend = "polling"
+        test_monitor.watch()
+        poll_call = test_monitor._poll_call
+        test_monitor.secure()
+        shutil.rmtree(test_folder, ignore_errors=True)
+
+        self.assertFalse(poll_call.pending())
+        self.assertFalse(test_monitor.active)
+
+    ###############################################################
+    # Subscriber Execution
+    ###############################################################
+    def test_subscribers_run_in_priority_order(self):
+        order = []
+        monitor.clear_subscribers()
+        monitor.subscribe('low', lambda: order.append('low'), priority=-1)
+        monitor.subscribe('first', lambda: order.append('first'))
+        monitor.subscribe('high', lambda: order.append('high'), priority=5)
+        monitor.subscribe('second', lambda: order.append('second'))
+        monitor.run_scripts()
+        monitor.clear_subscribers()
+
+        self.assertEqual(order, ['high', 'first', 'second', 'low'])
+
+    def test_failing_subscriber_does_not_stop_others(self):
+        testval = 1
+        def failing():
+            raise RuntimeError("Subscriber failure test")
+
+        def test():
+            nonlocal testval
+            testval += 10
+
+        monitor.clear_subscribers()
+        monitor.clear_subscriber_timings()
+        monitor.subscribe('failing', failing, priority=1)
+        monitor.subscribe('test', test)
+        monitor.run_scripts()
+        timings = monitor.subscriber_timings('failing')
+        summary = monitor.subscriber_timing_summary()
+        monitor.clear_subscribers()
+
+        self.assertEqual(testval, 11)
+        self.assertEqual(len(timings), 1)
+        self.assertIn("Subscriber failure test", timings[0].error)
+        self.assertEqual(summary['failing']['errors'], 1)
+        self.assertEqual(summary['test']['calls'], 1)
+
+    def test_thread_safe_subscriber_runs_on_pool(self):
+        finished = threading.Event()
+        thread_names = []
+        def test():
+            thread_names.append(threading.current_thread().name)
+            finished.set()
+
+        monitor.clear_subscribers()
+        monitor.subscribe('test', test, thread_safe=True)
+        monitor.run_scripts()
+        finished.wait(2)
+        monitor.clear_subscribers()
+
+        self.assertEqual(len(thread_names), 1)
+        self.assertTrue(thread_names[0].startswith("DirectoryMonitor-subscriber"))
+
+    def test_subscriber_timings_record_duration(self):
+        def test():
+            time.sleep(.02)
+
+        monitor.clear_subscribers()
+        monitor.clear_subscriber_timings()
+        monitor.subscribe('test', test)
+        monitor.run_scripts()
+        timings = monitor.subscriber_timings()
+        monitor.clear_subscribers()
+
+        self.assertEqual(len(timings), 1)
+        self.assertEqual(timings[0].script, 'test')
+        self.assertGreaterEqual(timings[0].duration, .02)
+        self.assertEqual(timings[0].error, "")
+
+    def test_subscriber_threads_property(self):
+        monitor.subscriber_threads = 2
+        self.assertEqual(monitor.subscriber_threads, 2)
+        monitor.subscriber_threads = 0
+        self.assertEqual(monitor.subscriber_threads, 2)
+        monitor.subscriber_threads = "abc"
+        self.assertEqual(monitor.subscriber_threads, 2)
+        monitor.subscriber_threads = 4
+        self.assertEqual(monitor.subscriber_threads, 4)
+
+    def test_subscribe_invalid_priority(self):
+        def test():
+            pass
+        monitor.clear_subscribers()
+        monitor.subscribe('test', test, priority="high")
+        self.assertEqual(len(monitor._subscribers), 0)
+
+    ###############################################################
+    # Watcher Daemon
+    ###############################################################
+    def test_daemon_backend_receives_changes(self):
+        # Two monitors on the same folder share one daemon process, and both hear about a change it finds
+        test_folder = tempfile.mkdtemp(prefix="_____monitor_test")
+        monitor1 = DirectoryMonitor(test_folder)
+        monitor2 = DirectoryMonitor(test_folder)
+        monitor1.backend = "daemon"
+        monitor2.backend = "daemon"
+
+        testval1 = 1
+        testval2 = 2
+        def test1():
+            nonlocal testval1
+            testval1 += 10
+
+        def test2():
+            nonlocal testval2
+            testval2 += 10
+
+        monitor1.subscribe('test', test1)
+        monitor2.subscribe('test', test2)
+        monitor1.watch()
+        monitor2.watch()
+        backends = (monitor1._backend, monitor2._backend)
+        open(os.path.join(test_folder, testfile_name), "w").close()
+        counter = 0
+        while counter < 50 and (testval1 < 11 or testval2 < 12):
+            counter += 1
+            time.sleep(.1)
+        monitor1.secure()
+        monitor2.secure()
+        stop_daemon(test_folder, monitor1._path_filter.key())
+        shutil.rmtree(test_folder, ignore_errors=True)
+
+        self.assertIsInstance(backends[0], DaemonBackend)
+        self.assertIsInstance(backends[1], DaemonBackend)
+        self.assertEqual(testval1, 11)
+        self.assertEqual(testval2, 12)
+
+    ###############################################################
+    # Multiple Instances
+    ###############################################################
+    def test_instances_are_independent(self):
+        # Each DirectoryMonitor has its own settings. Creating a new one should not change the shared 'monitor'.
         monitor2 = DirectoryMonitor()
-        self.assertEqual(monitor.polling_delay, monitor2.polling_delay)
+        monitor2.polling_delay = 1
+        self.assertIsNot(monitor, monitor2)
+        self.assertEqual(monitor.polling_delay, .15)
+        self.assertEqual(monitor2.directory, "")
+
+    def test_multiple_instances_share_one_scheduler_thread(self):
+        # Two polling monitors watching different folders both detect their own changes, without adding threads
+        test_folder1 = tempfile.mkdtemp(prefix="_____monitor_test")
+        test_folder2 = tempfile.mkdtemp(prefix="_____monitor_test")
+        monitor1 = DirectoryMonitor(test_folder1)
+        monitor2 = DirectoryMonitor(test_folder2)
+        monitor1.backend = "polling"
+        monitor2.backend = "polling"
+
+        testval1 = 1
+        testval2 = 2
+        def test1():
+            nonlocal testval1
+            testval1 += 10
+
+        def test2():
+            nonlocal testval2
+            testval2 += 10
+
+        monitor1.subscribe('test', test1)
+        monitor2.subscribe('test', test2)
+        monitor1.watch()
+        threads_watching_one = threading.active_count()
+        monitor2.watch()
+        threads_watching_two = threading.active_count()
+        open(os.path.join(test_folder1, testfile_name), "w").close()
+        counter = 0
+        while counter < 5 and testval1 < 11:
+            counter += 1
+            time.sleep(monitor1.polling_delay)
+        open(os.path.join(test_folder2, testfile_name), "w").close()
+        counter = 0
+        while counter < 5 and testval2 < 12:
+            counter += 1
+            time.sleep(monitor2.polling_delay)
+        monitor1.secure()
+        monitor2.secure()
+        shutil.rmtree(test_folder1, ignore_errors=True)
+        shutil.rmtree(test_folder2, ignore_errors=True)
+
+        self.assertEqual(testval1, 11)
+        self.assertEqual(testval2, 12)
+        self.assertEqual(threads_watching_one, threads_watching_two)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,235 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from src.directory_snapshot import ChangeSet, IncrementalScan, diff_snapshots, take_snapshot, update_snapshot
+from tests.helpers import write_file
+
+class TestDirectorySnapshot(unittest.TestCase):
+    def setUp(self):
+        self.test_folder = tempfile.mkdtemp(prefix="_____snapshot_test")
+        self.subfolder = os.path.join(self.test_folder, "subfolder")
+        os.mkdir(self.subfolder)
+        self.file1 = os.path.join(self.test_folder, "_____testfile1.txt")
+        self.file2 = os.path.join(self.subfolder, "_____testfile2.txt")
+        write_file(self.file1)
+        write_file(self.file2)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_folder, ignore_errors=True)
+
+    ###############################################################
+    # Taking Snapshots
+    ###############################################################
+    def test_snapshot_includes_nested_files(self):
+        snapshot = take_snapshot(self.test_folder)
+        self.assertEqual(sorted(snapshot.keys()), sorted([self.file1, self.file2]))
+
+    def test_snapshot_signature_is_mtime_size_inode(self):
+        snapshot = take_snapshot(self.file1)
+        stat_result = os.stat(self.file1)
+        self.assertEqual(snapshot[self.file1], (stat_result.st_mtime_ns, stat_result.st_size, stat_result.st_ino))
+
+    def test_snapshot_of_single_file_only_tracks_that_file(self):
+        self.assertEqual(list(take_snapshot(self.file1).keys()), [self.file1])
+
+    def test_snapshot_of_missing_path_is_empty(self):
+        self.assertEqual(take_snapshot(self.file1 + "abcd"), {})
+
+    def test_parallel_snapshots_with_different_worker_counts(self):
+        # Monitors with different scan_workers settings scan at the same time without shutting down each other's pool
+        expected = take_snapshot(self.test_folder)
+        results = []
+        def scan(workers):
+            for _ in range(20):
+                results.append(take_snapshot(self.test_folder, workers=workers) == expected)
+
+        threads = [threading.Thread(target=scan, args=(workers,)) for workers in (2, 3, 4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, [True] * 60)
+
+    def test_stopped_snapshot_returns_none(self):
+        stop = threading.Event()
+        stop.set()
+        self.assertIsNone(take_snapshot(self.test_folder, stop=stop))
+        self.assertIsNone(take_snapshot(self.test_folder, workers=4, stop=stop))
+        self.assertEqual(take_snapshot(self.file1, stop=stop), take_snapshot(self.file1))   # A single file is one stat
+
+    def test_parallel_snapshot_matches_serial(self):
+        for folder_number in range(20):
+            folder = os.path.join(self.subfolder, "folder" + str(folder_number))
+            os.mkdir(folder)
+            os.mkdir(os.path.join(folder, "nested"))
+            write_file(os.path.join(folder, "_____file.txt"))
+            write_file(os.path.join(folder, "nested", "_____file.txt"))
+        serial = take_snapshot(self.test_folder)
+        parallel = take_snapshot(self.test_folder, workers=4, queue_depth=3)
+        self.assertEqual(parallel, serial)
+        self.assertEqual(list(parallel), list(take_snapshot(self.test_folder, workers=3, queue_depth=50)))
+
+    def test_incremental_scan_resumes_until_complete(self):
+        scan = IncrementalScan(self.test_folder)
+        steps = 1
+        while not scan.step(max_entries=1):
+            steps += 1
+        self.assertEqual(scan.snapshot, take_snapshot(self.test_folder))
+        self.assertEqual(scan.entries_scanned, 3)   # Two files and one folder
+        self.assertGreaterEqual(steps, 3)
+        self.assertTrue(scan.complete)
+
+    def test_incremental_scan_time_budget_always_progresses(self):
+        scan = IncrementalScan(self.test_folder)
+        steps = 0
+        while not scan.step(max_seconds=1e-9) and steps < 100:
+            steps += 1
+        self.assertTrue(scan.complete)
+        self.assertEqual(scan.snapshot, take_snapshot(self.test_folder))
+
+    ###############################################################
+    # Comparing Snapshots
+    ###############################################################
+    def test_no_changes_is_empty(self):
+        changes = diff_snapshots(take_snapshot(self.test_folder), take_snapshot(self.test_folder))
+        self.assertFalse(changes)
+        self.assertEqual(len(changes), 0)
+
+    def test_everything_is_added_against_empty_snapshot(self):
+        changes = diff_snapshots({}, take_snapshot(self.test_folder))
+        self.assertEqual(sorted(changes.added), sorted([self.file1, self.file2]))
+        self.assertEqual(changes.modified, {})
+        self.assertEqual(changes.deleted, {})
+
+    def test_modified_file_detected(self):
+        before = take_snapshot(self.test_folder)
+        write_file(self.file2, "Additional Test Text. ")
+        changes = diff_snapshots(before, take_snapshot(self.test_folder))
+        self.assertEqual(list(changes.modified), [self.file2])
+        self.assertEqual(changes.added, {})
+        self.assertEqual(changes.deleted, {})
+
+    def test_added_and_deleted_in_same_scan_both_detected(self):
+        """The file count stays the same, but both changes still have to be found."""
+        before = take_snapshot(self.test_folder)
+        file3 = os.path.join(self.subfolder, "_____testfile3.txt")
+        write_file(file3)
+        os.remove(self.file1)
+        changes = diff_snapshots(before, take_snapshot(self.test_folder))
+        self.assertEqual(list(changes.added), [file3])
+        self.assertEqual(list(changes.deleted), [self.file1])
+        self.assertEqual(changes.paths(), sorted([file3, self.file1]))
+
+    def test_deleted_folder_reports_all_files(self):
+        before = take_snapshot(self.test_folder)
+        shutil.rmtree(self.subfolder)
+        changes = diff_snapshots(before, take_snapshot(self.test_folder))
+        self.assertEqual(list(changes.deleted), [self.file2])
+
+    def test_empty_change_set(self):
+        self.assertFalse(ChangeSet())
+        self.assertEqual(ChangeSet().paths(), [])
+
+    ###############################################################
+    # Moved Files
+    ###############################################################
+    def test_renamed_file_is_moved(self):
+        before = take_snapshot(self.test_folder)
+        renamed = os.path.join(self.test_folder, "_____renamed.txt")
+        os.rename(self.file2, renamed)
+        changes = diff_snapshots(before, take_snapshot(self.test_folder))
+        self.assertEqual(changes.moved, {self.file2: (renamed, before[self.file2])})
+        self.assertEqual(changes.added, {})
+        self.assertEqual(changes.deleted, {})
+        self.assertEqual(changes.paths(), sorted([self.file2, renamed]))
+        self.assertEqual(changes.stat(renamed), before[self.file2])
+
+    def test_update_renamed_file_is_moved(self):
+        snapshot = take_snapshot(self.test_folder)
+        renamed = os.path.join(self.test_folder, "_____renamed.txt")
+        os.rename(self.file1, renamed)
+        changes = update_snapshot(snapshot, [self.file1, renamed])
+        self.assertEqual(list(changes.moved), [self.file1])
+        self.assertIn(renamed, snapshot)
+
+    def test_no_inode_is_never_moved(self):
+        changes = ChangeSet(added={"b": (1, 1, 0)}, deleted={"a": (1, 1, 0)})
+        changes.detect_moves()
+        self.assertEqual(changes.moved, {})
+
+    def test_merge_moved_then_moved_again(self):
+        changes = ChangeSet(moved={"a": ("b", (1, 1, 1))})
+        changes.merge(ChangeSet(moved={"b": ("c", (1, 1, 1))}))
+        self.assertEqual(changes.moved, {"a": ("c", (1, 1, 1))})
+        self.assertEqual(len(changes), 1)
+
+    def test_filtered_keeps_matching_paths(self):
+        changes = ChangeSet(added={"a.py": (1, 1, 1)}, modified={"b.txt": (1, 1, 2)},
+            moved={"c.txt": ("c.py", (1, 1, 3))})
+        kept = changes.filtered(lambda path: path.endswith(".py"))
+        self.assertEqual(kept.paths(), ["a.py", "c.py", "c.txt"])
+        self.assertEqual(kept.modified, {})
+
+    ###############################################################
+    # Merging Change Sets
+    ###############################################################
+    def test_merge_added_then_deleted_cancels_out(self):
+        changes = ChangeSet(added={"a": (1, 1, 1)})
+        changes.merge(ChangeSet(deleted={"a": (1, 1, 1)}))
+        self.assertFalse(changes)
+
+    def test_merge_deleted_then_added_is_modified(self):
+        """An atomic save removes the file and writes a new one in its place."""
+        changes = ChangeSet(deleted={"a": (1, 1, 1)})
+        changes.merge(ChangeSet(added={"a": (2, 1, 2)}))
+        self.assertEqual(changes.modified, {"a": (2, 1, 2)})
+        self.assertEqual(changes.added, {})
+        self.assertEqual(changes.deleted, {})
+
+    def test_merge_added_then_modified_is_added(self):
+        changes = ChangeSet(added={"a": (1, 1, 1)})
+        changes.merge(ChangeSet(modified={"a": (2, 5, 1)}))
+        self.assertEqual(changes.added, {"a": (2, 5, 1)})
+        self.assertEqual(changes.modified, {})
+
+    def test_merge_modified_then_deleted_is_deleted(self):
+        changes = ChangeSet(modified={"a": (2, 1, 1)}, added={"b": (1, 1, 2)})
+        changes.merge(ChangeSet(deleted={"a": (2, 1, 1)}, modified={"c": (3, 1, 3)}))
+        self.assertEqual(changes.deleted, {"a": (2, 1, 1)})
+        self.assertEqual(changes.added, {"b": (1, 1, 2)})
+        self.assertEqual(changes.modified, {"c": (3, 1, 3)})
+
+    ###############################################################
+    # Updating Only Changed Paths
+    ###############################################################
+    def test_update_only_checks_given_paths(self):
+        snapshot = take_snapshot(self.test_folder)
+        write_file(self.file1, "Additional Test Text. ")
+        write_file(self.file2, "Additional Test Text. ")
+        changes = update_snapshot(snapshot, [self.file1])
+        self.assertEqual(list(changes.modified), [self.file1])
+        self.assertEqual(snapshot[self.file1], take_snapshot(self.file1)[self.file1])
+
+    def test_update_new_folder_adds_its_files(self):
+        snapshot = take_snapshot(self.test_folder)
+        new_folder = os.path.join(self.test_folder, "new_folder")
+        os.mkdir(new_folder)
+        file3 = os.path.join(new_folder, "_____testfile3.txt")
+        write_file(file3)
+        changes = update_snapshot(snapshot, [new_folder])
+        self.assertEqual(list(changes.added), [file3])
+        self.assertIn(file3, snapshot)
+
+    def test_update_removed_folder_deletes_its_files(self):
+        snapshot = take_snapshot(self.test_folder)
+        shutil.rmtree(self.subfolder)
+        changes = update_snapshot(snapshot, [self.subfolder])
+        self.assertEqual(list(changes.deleted), [self.file2])
+        self.assertEqual(list(snapshot.keys()), [self.file1])
+
+
+if __name__ == '__main__':
+    unittest.main()
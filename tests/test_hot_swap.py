@@ -3,16 +3,28 @@
     you will frequently find breaking tests. The `unittest` package runs them in parallel, so you can get race
     conditions when deleting/writing files. Using a different name each time prevents that.
 """
+import importlib
 import os
 import shutil
+import sys
+import tempfile
+import threading
 import unittest
+from unittest import mock
 
-from src.hot_swap import create_addon_name, get_most_recent_bl_name_info
+from src import hot_swap
+from src.addon_sync import sync_addon
+from src.directory_snapshot import ChangeSet, stat_signature
+from src.hot_swap import (create_addon_name, get_most_recent_bl_name_info, partial_reload, purge_addon_modules,
+    start_import_tracking)
+from src.preflight import CompileError
+from src.swap_profiler import profiler
+from tests.helpers import write_file
 
 unittest.TestLoader.sortTestMethodsUsing = None
 
 good_folder_path = os.path.dirname(os.path.dirname(__file__))
-testfile_path = os.path.join(good_folder_path, "tests\\")
+testfile_path = os.path.join(good_folder_path, "tests")
 
 def delete_test_file(path):
     if os.path.exists(path):
@@ -228,5 +240,391 @@ class TestHotSwap_get_most_recent_bl_name_info(unittest.TestCase):
         name = get_most_recent_bl_name_info(modulepath)
         self.assertEqual(name, '')
 
+    ###############################################################
+    # Reading Without Running the Add-on
+    ###############################################################
+    def test_literal_bl_info_does_not_run_the_module(self):
+        """A literal `bl_info` is read without running any of the file, so errors further down do not matter."""
+        
+        filepath = os.path.join(testfile_path, "literal_bl_info_with_error.py")
+        delete_test_file(filepath)
+        testfile = open(filepath, "w")
+        testfile.write("import module_that_does_not_exist\n")
+        testfile.write("bl_info = {'name': 'Literal Name', 'version': (1, 0, 0)}\n")
+        testfile.write("raise RuntimeError('Should never run')\n")
+        testfile.close()
+
+        name = get_most_recent_bl_name_info(filepath)
+        self.assertEqual(name, 'Literal Name')
+
+        delete_test_file(filepath)
+
+    def test_computed_bl_info_falls_back_to_running_the_module(self):
+        """A `bl_info` built with code is still found by loading the module."""
+        
+        filepath = os.path.join(testfile_path, "computed_bl_info_file.py")
+        delete_test_file(filepath)
+        testfile = open(filepath, "w")
+        testfile.write("bl_info = dict(name='Computed ' + 'Name')\n")
+        testfile.close()
+
+        name = get_most_recent_bl_name_info(filepath)
+        self.assertEqual(name, 'Computed Name')
+
+        delete_test_file(filepath)
+
+    def test_bl_info_is_cached_until_the_file_changes(self):
+        """An unchanged stat signature returns the cached name without reading the file again."""
+        
+        filepath = os.path.join(testfile_path, "cached_bl_info_file.py")
+        delete_test_file(filepath)
+        testfile = open(filepath, "w")
+        testfile.write("bl_info = {'name': 'First'}\n")
+        testfile.close()
+        self.assertEqual(get_most_recent_bl_name_info(filepath), 'First')
+
+        # Same size and modified time, so only the cache is consulted
+        stat = os.stat(filepath)
+        testfile = open(filepath, "w")
+        testfile.write("bl_info = {'name': 'Other'}\n")
+        testfile.close()
+        os.utime(filepath, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assertEqual(get_most_recent_bl_name_info(filepath), 'First')
+
+        os.utime(filepath, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        self.assertEqual(get_most_recent_bl_name_info(filepath), 'Other')
+
+        delete_test_file(filepath)
+
+def changed(*file_paths):
+    """Returns the monitor's `ChangeSet` for modifying `file_paths`."""
+    return ChangeSet(modified={file_path: stat_signature(os.stat(file_path)) for file_path in file_paths})
+
+class StubbedBlenderTestCase(unittest.TestCase):
+    """Blender is stubbed: the add-on is "enabled" by its name being in the preferences, and "installed" in a temporary
+    user scripts folder. Reloads are recorded instead of run."""
+
+    def setUp(self):
+        self.test_folder = tempfile.mkdtemp(prefix="_____stubbed_blender_test")
+        self.addon_filename = "stubbed_addon"
+        self.package = os.path.join(self.test_folder, "source", self.addon_filename)
+        self.scripts = os.path.join(self.test_folder, "scripts")
+        self.installed = os.path.join(self.scripts, "addons", self.addon_filename)
+
+        self.init_file = os.path.join(self.package, "__init__.py")
+        self.operators = os.path.join(self.package, "operators.py")
+        self.utils_math = os.path.join(self.package, "utils", "math.py")
+        write_file(self.init_file, "import bpy\nfrom . import operators\n\nbl_info = {'name': 'stubbed_addon'}\n\n"
+            "def register(): pass\n")
+        write_file(self.operators, "from .utils.math import clamp\n")
+        write_file(os.path.join(self.package, "utils", "__init__.py"), "")
+        write_file(self.utils_math, "def clamp(x): return x\n")
+        sync_addon(self.package, self.installed)
+
+        bpy = mock.MagicMock()
+        bpy.context.preferences.addons.keys.return_value = [self.addon_filename]
+        bpy.utils.script_path_user.return_value = self.scripts
+        self.reloaded = []
+        patches = [
+            mock.patch.object(hot_swap, "bpy", bpy),
+            mock.patch.object(hot_swap.importlib, "reload", lambda module: self.reloaded.append(module.__name__)),
+            mock.patch.dict(sys.modules, {name: mock.Mock(__name__=name)
+                for name in (self.addon_filename + ".operators", self.addon_filename + ".utils.math")}),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        hot_swap._import_graphs.pop(self.package, None)
+
+    def tearDown(self):
+        hot_swap._import_graphs.pop(self.package, None)
+        hot_swap._refused_changes.pop(self.package, None)
+        shutil.rmtree(self.test_folder, ignore_errors=True)
+
+    def read_installed(self, file_path):
+        with open(os.path.join(self.installed, os.path.relpath(file_path, self.package))) as file:
+            return file.read()
+
+class TestHotSwap_partial_reload(StubbedBlenderTestCase):
+
+    def test_reloads_dependencies_first(self):
+        write_file(self.utils_math, "def clamp(x): return min(max(x, 0), 1)\n")
+        self.assertTrue(partial_reload(self.package, self.addon_filename, [self.utils_math]))
+        self.assertEqual(self.reloaded, [self.addon_filename + ".utils.math", self.addon_filename + ".operators"])
+
+    def test_syncs_only_the_changed_files(self):
+        write_file(self.utils_math, "def clamp(x): return min(max(x, 0), 1)\n")
+        write_file(self.operators, "from .utils.math import clamp  # Saved, but not reported as changed\n")
+        self.assertTrue(partial_reload(self.package, self.addon_filename, [self.utils_math]))
+
+        self.assertEqual(self.read_installed(self.utils_math), "def clamp(x): return min(max(x, 0), 1)\n")
+        self.assertEqual(self.read_installed(self.operators), "from .utils.math import clamp\n")
+
+    def test_falls_back_to_full_reload(self):
+        write_file(self.init_file, "import bpy\nfrom . import operators\n\ndef register(): print()\n")
+        self.assertFalse(partial_reload(self.package, self.addon_filename, [self.init_file]))
+        self.assertEqual(self.reloaded, [])
+        self.assertNotIn("print", self.read_installed(self.init_file))     # Left for the full hot swap to copy
+
+        hot_swap.bpy.context.preferences.addons.keys.return_value = []     # Not enabled
+        self.assertFalse(partial_reload(self.package, self.addon_filename, [self.utils_math]))
+
+    def test_dynamic_import_falls_back_to_full_reload(self):
+        # Imported with importlib, so only the loaded module shows it is part of the add-on
+        dynamic = os.path.join(self.package, "dynamic.py")
+        write_file(dynamic, "VALUE = 2\n")
+        self.assertTrue(partial_reload(self.package, self.addon_filename, [dynamic]))   # Not loaded yet
+        sys.modules[self.addon_filename + ".dynamic"] = mock.Mock(__name__=self.addon_filename + ".dynamic")
+        self.assertFalse(partial_reload(self.package, self.addon_filename, [dynamic]))
+        self.assertEqual(self.reloaded, [])
+
+    def test_finishes_its_own_profile(self):
+        profiler.clear()
+        partial_reload(self.package, self.addon_filename, [self.utils_math])
+        partial_reload(self.package, self.addon_filename, [self.init_file])
+        self.assertEqual([profile.outcome for profile in profiler.history()], ["success", "skipped"])
+        self.assertTrue(all(profile.total > 0 for profile in profiler.history()))
+
+        # A profile passed in belongs to the caller, which finishes it
+        profile = profiler.start()
+        partial_reload(self.package, self.addon_filename, [self.utils_math], profile)
+        self.assertEqual(len(profiler.history()), 2)
+        self.assertEqual(profile.strategy, "partial")
+        profiler.clear()
+
+class TestHotSwap_purge_addon_modules(unittest.TestCase):
+
+    def setUp(self):
+        self.test_folder = tempfile.mkdtemp(prefix="_____purge_addon_test")
+        write_file(os.path.join(self.test_folder, "_____purged_addon", "__init__.py"), "from . import operators\n\n"
+            "def lazy():\n    from . import lazy_module\n")
+        write_file(os.path.join(self.test_folder, "_____purged_addon", "operators.py"), "")
+        write_file(os.path.join(self.test_folder, "_____purged_addon", "lazy_module.py"), "")
+        write_file(os.path.join(self.test_folder, "_____purged_addon_other", "__init__.py"), "")
+        sys.path.insert(0, self.test_folder)
+
+    def tearDown(self):
+        hot_swap.stop_import_tracking("_____purged_addon")
+        sys.path.remove(self.test_folder)
+        for name in list(sys.modules):
+            if name.startswith("_____purged_addon"):
+                del sys.modules[name]
+        shutil.rmtree(self.test_folder, ignore_errors=True)
+
+    def test_purges_tracked_modules(self):
+        start_import_tracking("_____purged_addon")
+        importlib.import_module("_____purged_addon").lazy()
+        importlib.import_module("_____purged_addon_other")
+        self.assertEqual(purge_addon_modules("_____purged_addon"), ["_____purged_addon",
+            "_____purged_addon.lazy_module", "_____purged_addon.operators"])
+        self.assertNotIn("_____purged_addon", hot_swap._import_trackers)     # Purging ends the recording
+        self.assertNotIn("_____purged_addon.operators", sys.modules)
+        self.assertIn("_____purged_addon_other", sys.modules)       # Only shares the start of the name
+
+    def test_purges_untracked_modules_from_sys_modules(self):
+        # Enabled by Blender at startup, so nothing was recorded
+        importlib.import_module("_____purged_addon")
+        importlib.import_module("_____purged_addon_other")
+        self.assertEqual(purge_addon_modules("_____purged_addon"), ["_____purged_addon",
+            "_____purged_addon.operators"])
+        self.assertIn("_____purged_addon_other", sys.modules)
+        self.assertEqual(purge_addon_modules("_____purged_addon"), [])    # Nothing left to purge
+
+class TestHotSwap_swap_addon(StubbedBlenderTestCase):
+
+    def test_refused_changes_are_installed_with_the_fix(self):
+        write_file(self.utils_math, "def clamp(x): return min(max(x, 0), 1)\n")
+        write_file(self.operators, "from .utils.math import clamp\ndef broken(:\n")
+        self.assertIsNone(hot_swap.swap_addon(self.package, self.addon_filename,
+            changed(self.utils_math, self.operators)))
+        self.assertEqual(self.read_installed(self.utils_math), "def clamp(x): return x\n")
+
+        # Only the fix is reported, but the valid change saved with the error goes in too
+        write_file(self.operators, "from .utils.math import clamp\n# Fixed\n")
+        self.assertEqual(hot_swap.swap_addon(self.package, self.addon_filename, changed(self.operators)),
+            "stubbed_addon")
+        self.assertEqual(self.read_installed(self.utils_math), "def clamp(x): return min(max(x, 0), 1)\n")
+        self.assertEqual(self.read_installed(self.operators), "from .utils.math import clamp\n# Fixed\n")
+        self.assertNotIn(self.package, hot_swap._refused_changes)
+
+    def test_refused_changes_are_compiled_again(self):
+        # The caller only compiled the new changes, which leaves the error from the refused ones to find
+        write_file(self.operators, "from .utils.math import clamp\ndef broken(:\n")
+        self.assertIsNone(hot_swap.swap_addon(self.package, self.addon_filename, changed(self.operators)))
+        write_file(self.utils_math, "def clamp(x): return min(max(x, 0), 1)\n")
+        self.assertIsNone(hot_swap.swap_addon(self.package, self.addon_filename, changed(self.utils_math), []))
+        self.assertEqual(self.read_installed(self.utils_math), "def clamp(x): return x\n")
+
+        write_file(self.operators, "from .utils.math import clamp\n")
+        self.assertEqual(hot_swap.swap_addon(self.package, self.addon_filename, changed(self.operators), []),
+            "stubbed_addon")
+        self.assertEqual(self.read_installed(self.utils_math), "def clamp(x): return min(max(x, 0), 1)\n")
+
+class TestHotSwap_queue_hot_swap(StubbedBlenderTestCase):
+
+    def test_compiles_before_queueing(self):
+        write_file(self.operators, "from .utils.math import clamp\ndef broken(:\n")
+        changes = changed(self.operators, self.utils_math)
+        with mock.patch.object(hot_swap, "monitor", mock.Mock(directory=self.package)), \
+                mock.patch.object(hot_swap, "main_thread") as main_thread:
+            hot_swap.queue_hot_swap(changes)
+        (key, function, queued_changes, compile_errors), options = main_thread.submit.call_args
+        self.assertEqual((key, function, queued_changes), ("Hotswap", hot_swap.run_hot_swap, changes))
+        self.assertEqual(options, {"merge": hot_swap.merge_changes})
+        self.assertEqual([error.file_path for error in compile_errors], [self.operators])
+
+        # The main thread trusts the result, and leaves the add-on alone without compiling anything
+        with mock.patch.object(hot_swap, "preflight_compile") as preflight_compile:
+            self.assertIsNone(hot_swap.swap_addon(self.package, self.addon_filename, changes, compile_errors))
+        preflight_compile.assert_not_called()
+
+class TestHotSwap_reload_workspace(unittest.TestCase):
+    """Blender is stubbed, and so is `swap_addons`, which is tested on its own. Only the add-ons are looked at."""
+
+    def setUp(self):
+        self.workspace = tempfile.mkdtemp(prefix="_____reload_workspace_test")
+        self.package = os.path.join(self.workspace, "addon_one")
+        self.package_module = os.path.join(self.package, "operators.py")
+        self.single_file = os.path.join(self.workspace, "tools", "addon_two.py")
+        self.build_script = os.path.join(self.workspace, "build.py")
+        write_file(os.path.join(self.package, "__init__.py"), "bl_info = {'name': 'Addon One'}\n")
+        write_file(self.package_module, "")
+        write_file(self.single_file, "bl_info = {'name': 'Addon Two'}\n")
+        write_file(self.build_script, "")
+
+        self.bpy = mock.MagicMock()
+        self.bpy.context.preferences.addons.__getitem__.return_value.preferences.monitor_path = self.workspace
+        self.bpy.context.preferences.addons.keys.return_value = ["addon-one"]
+        self.requests = []      # (addon_path, old_addon_name, changes, compile_errors) of every add-on swapped
+        def swap_addons(requests):
+            self.requests.extend(requests)
+            return ["Renamed " + os.path.basename(request[0]) for request in requests]
+        for patch in (mock.patch.object(hot_swap, "bpy", self.bpy),
+                mock.patch.object(hot_swap, "swap_addons", swap_addons)):
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def tearDown(self):
+        hot_swap._workspaces.pop(self.workspace, None)
+        shutil.rmtree(self.workspace, ignore_errors=True)
+
+    def test_swaps_only_the_touched_addons(self):
+        hot_swap.reload_workspace(changed(self.package_module, self.build_script))
+        self.assertEqual(len(self.requests), 1)
+        addon_path, old_addon_name, addon_changes, compile_errors = self.requests[0]
+        self.assertEqual((addon_path, old_addon_name, compile_errors), (self.package, "addon-one", None))
+        self.assertEqual(addon_changes.paths(), [self.package_module])
+
+        # Installed under the name it was swapped with from then on
+        hot_swap.reload_workspace(changed(self.package_module))
+        self.assertEqual(self.requests[-1][1], "renamed-addon_one")
+
+    def test_swaps_every_addon_without_changes(self):
+        hot_swap.reload_workspace()
+        # addon_two is not enabled yet, so it has no old name
+        self.assertEqual(self.requests, [(self.package, "addon-one", None, None), (self.single_file, "", None, None)])
+
+    def test_compile_errors_are_split_by_addon(self):
+        errors = [CompileError(file_path, 1, 1, "invalid syntax", "")
+            for file_path in (self.package_module, self.build_script)]
+        hot_swap.reload_workspace(changed(self.package_module, self.single_file, self.build_script), errors)
+        self.assertEqual([request[3] for request in self.requests], [errors[:1], []])
+
+    def test_workspace_must_be_folder(self):
+        self.bpy.context.preferences.addons.__getitem__.return_value.preferences.monitor_path = self.single_file
+        hot_swap.reload_workspace(changed(self.single_file))
+        self.assertEqual(self.requests, [])
+
+class TestHotSwap_swap_addons(unittest.TestCase):
+    """Blender is stubbed, and every call into it and every copy is recorded in `self.events`."""
+
+    def setUp(self):
+        self.test_folder = tempfile.mkdtemp(prefix="_____swap_addons_test")
+        self.scripts = os.path.join(self.test_folder, "scripts")
+        self.names = ["swapped_first", "swapped_second"]
+        self.packages = [os.path.join(self.test_folder, "source", name) for name in self.names]
+        for name, package in zip(self.names, self.packages):
+            write_file(os.path.join(package, "__init__.py"), "bl_info = {'name': '" + name + "'}\n")
+            write_file(os.path.join(package, "operators.py"), "VALUE = 1\n")
+            sync_addon(package, os.path.join(self.scripts, "addons", name))
+            write_file(os.path.join(package, "operators.py"), "VALUE = 2\n")
+
+        self.events = []
+        bpy = mock.MagicMock()
+        bpy.context.preferences.addons.keys.return_value = list(self.names)
+        bpy.context.preferences.addons.__getitem__.return_value.preferences.hot_swap_partial_reload = False
+        bpy.utils.script_path_user.return_value = self.scripts
+        bpy.ops.preferences.addon_disable.side_effect = lambda module: self.events.append(("disable", module))
+        addon_utils = mock.MagicMock()
+        addon_utils.enable.side_effect = lambda name, **options: self.events.append(("enable", name)) or name
+        def recorded_sync(source_folder, target_folder, **options):
+            self.events.append(("copy", threading.current_thread().name))
+            return sync_addon(source_folder, target_folder, **options)
+        for patch in (mock.patch.object(hot_swap, "bpy", bpy), mock.patch.object(hot_swap, "addon_utils", addon_utils),
+                mock.patch.object(hot_swap, "sync_addon", recorded_sync)):
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def tearDown(self):
+        for name, package in zip(self.names, self.packages):
+            hot_swap.stop_import_tracking(name)
+            hot_swap._refused_changes.pop(package, None)
+        shutil.rmtree(self.test_folder, ignore_errors=True)
+
+    def test_copies_run_together_between_disabling_and_enabling(self):
+        names = hot_swap.swap_addons([(package, name, None, []) for name, package in zip(self.names, self.packages)])
+        self.assertEqual(names, self.names)
+        self.assertEqual([event[0] for event in self.events], ["disable", "disable", "copy", "copy", "enable",
+            "enable"])
+        self.assertEqual(self.events[-2:], [("enable", "swapped_first"), ("enable", "swapped_second")])
+        self.assertTrue(all(thread.startswith("HotSwap-sync") for kind, thread in self.events if kind == "copy"))
+        for name in self.names:
+            with open(os.path.join(self.scripts, "addons", name, "operators.py")) as file:
+                self.assertEqual(file.read(), "VALUE = 2\n")
+
+    def test_failed_addon_does_not_hold_back_the_others(self):
+        write_file(os.path.join(self.packages[0], "operators.py"), "def broken(:\n")
+        names = hot_swap.swap_addons([(package, name, None, None) for name, package in zip(self.names, self.packages)])
+        self.assertEqual(names, [None, "swapped_second"])
+        self.assertEqual(self.events, [("disable", "swapped_second"), ("copy", "MainThread"),
+            ("enable", "swapped_second")])
+
+class TestHotSwap_enable_addon(unittest.TestCase):
+
+    def setUp(self):
+        self.bpy = mock.MagicMock()
+        self.addon_utils = mock.MagicMock()
+        for patch in (mock.patch.object(hot_swap, "bpy", self.bpy),
+                mock.patch.object(hot_swap, "addon_utils", self.addon_utils)):
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_enables_directly(self):
+        hot_swap.enable_addon("enabled_addon")
+        self.addon_utils.enable.assert_called_once_with("enabled_addon", default_set=True, handle_error=mock.ANY)
+        self.bpy.ops.preferences.addon_enable.assert_not_called()
+
+    def test_enables_with_operator(self):
+        hot_swap.enable_addon("refreshed_addon", use_operator=True)
+        self.bpy.ops.preferences.addon_enable.assert_called_once_with(module="refreshed_addon")
+        self.addon_utils.enable.assert_not_called()
+
+    def test_raises_the_addon_exception(self):
+        def failing_enable(module_name, default_set, handle_error):
+            try:
+                raise ImportError("No module named 'missing'")
+            except ImportError as error:
+                handle_error(error)
+            return None
+        self.addon_utils.enable.side_effect = failing_enable
+        with self.assertRaisesRegex(ImportError, "missing"):
+            hot_swap.enable_addon("failing_addon")
+
+        # Blender gave no reason
+        self.addon_utils.enable.side_effect = None
+        self.addon_utils.enable.return_value = None
+        with self.assertRaisesRegex(RuntimeError, "silent_addon"):
+            hot_swap.enable_addon("silent_addon")
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,236 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from src.directory_monitor import DirectoryMonitor
+from src.directory_snapshot import take_snapshot
+from src.import_graph import ImportGraph, ReachableFilter, defines_registration, module_imports, reload_order
+from src.monitor_backends import DaemonBackend, InotifyBackend
+from src import watcher_daemon
+from src.watcher_daemon import stop_daemon
+from src.path_filter import PathFilter
+from tests.helpers import write_file
+
+class TestImportGraph(unittest.TestCase):
+    def setUp(self):
+        self.test_folder = tempfile.mkdtemp(prefix="_____import_graph_test")
+        self.package = os.path.join(self.test_folder, "my_addon")
+        self.utils = os.path.join(self.package, "utils")
+        self.tests = os.path.join(self.package, "tests")
+        for folder in (self.package, self.utils, self.tests):
+            os.mkdir(folder)
+
+        self.init_file = os.path.join(self.package, "__init__.py")
+        self.operators = os.path.join(self.package, "operators.py")
+        self.panels = os.path.join(self.package, "panels.py")
+        self.utils_init = os.path.join(self.utils, "__init__.py")
+        self.utils_math = os.path.join(self.utils, "math.py")
+        self.unused = os.path.join(self.package, "build_script.py")
+        self.test_file = os.path.join(self.tests, "test_operators.py")
+        self.readme = os.path.join(self.package, "README.md")
+
+        write_file(self.init_file, "import bpy\nfrom . import operators\n\ndef register():\n"
+            "    from .panels import Panel\n")
+        write_file(self.operators, "from .utils.math import clamp\nimport os\n")
+        write_file(self.panels, "class Panel: pass\n")
+        write_file(self.utils_init, "")
+        write_file(self.utils_math, "from .. import operators\n\ndef clamp(x): return x\n")
+        write_file(self.unused, "import my_addon.operators\n")
+        write_file(self.test_file, "from my_addon import operators\n")
+        write_file(self.readme, "Read me")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_folder, ignore_errors=True)
+
+    ###############################################################
+    # Reading Imports
+    ###############################################################
+    def test_relative_imports(self):
+        self.assertEqual(module_imports(self.init_file, self.package), {self.operators, self.panels})
+        # Importing a submodule runs its package's __init__ too
+        self.assertEqual(module_imports(self.operators, self.package), {self.utils_init, self.utils_math})
+        self.assertEqual(module_imports(self.utils_math, self.package), {self.operators})
+
+    def test_absolute_imports_of_own_package(self):
+        self.assertEqual(module_imports(self.unused, self.package), {self.operators})
+        self.assertEqual(module_imports(self.test_file, self.package), {self.operators})
+
+    ###############################################################
+    # Reachable Files
+    ###############################################################
+    def test_reachable_files(self):
+        graph = ImportGraph(self.package)
+        self.assertTrue(graph.build())
+        self.assertEqual(graph.files, {self.init_file, self.operators, self.panels, self.utils_init, self.utils_math})
+        self.assertEqual(graph.folders, {"utils"})
+        self.assertEqual(graph.importers(self.operators), {self.init_file, self.utils_math})
+        self.assertFalse(graph.build())     # Nothing changed
+
+    def test_update_after_import_change(self):
+        graph = ImportGraph(self.package)
+        graph.build()
+        self.assertFalse(graph.update([self.unused]))   # Not reachable, so never read
+
+        write_file(self.panels, "from . import build_script\n")
+        os.utime(self.panels, ns=(time.time_ns() + 10 ** 9, time.time_ns() + 10 ** 9))
+        self.assertTrue(graph.update([self.panels]))
+        self.assertIn(self.unused, graph.files)
+
+    def test_syntax_error_keeps_previous_imports(self):
+        graph = ImportGraph(self.package)
+        graph.build()
+        write_file(self.init_file, "from . import operators\ndef register(:\n")
+        os.utime(self.init_file, ns=(time.time_ns() + 10 ** 9, time.time_ns() + 10 ** 9))
+        self.assertFalse(graph.update([self.init_file]))
+        self.assertIn(self.panels, graph.files)
+
+    def test_reachable_filter(self):
+        graph = ImportGraph(self.package)
+        graph.build()
+        snapshot = take_snapshot(self.package, ReachableFilter(PathFilter(), graph))
+        self.assertEqual(set(snapshot), graph.files)
+
+        data_filter = ReachableFilter(PathFilter(), graph, ["*.md"])
+        snapshot = take_snapshot(self.package, data_filter)
+        self.assertEqual(set(snapshot), graph.files | {self.readme})
+        self.assertTrue(data_filter.includes_path("README.md", False))
+        self.assertFalse(data_filter.includes_path("tests/test_operators.py", False))
+
+    ###############################################################
+    # Partial Reload
+    ###############################################################
+    def test_reload_order(self):
+        write_file(self.utils_math, "def clamp(x): return x\n")
+        graph = ImportGraph(self.package)
+        # Dependencies reload before the modules that import them. __init__.py itself is never reloaded.
+        self.assertEqual(reload_order(graph, [self.utils_math]), [self.utils_math, self.operators])
+        self.assertEqual(reload_order(graph, [self.test_file], lambda file_path: False), [])    # Never imported
+
+    def test_reload_order_of_dynamic_import(self):
+        # The auto_load pattern: the graph cannot see which module __init__.py imports
+        dynamic = os.path.join(self.package, "dynamic.py")
+        write_file(dynamic, "VALUE = 1\n")
+        write_file(self.init_file, "import importlib\nutils = importlib.import_module('.dynamic', __package__)\n")
+        graph = ImportGraph(self.package)
+        graph.build()
+        self.assertNotIn(dynamic, graph.files)
+        self.assertIsNone(reload_order(graph, [dynamic]))
+        self.assertIsNone(reload_order(graph, [dynamic], lambda file_path: file_path == dynamic))
+        self.assertEqual(reload_order(graph, [dynamic], lambda file_path: False), [])   # Loads the new version
+
+    def test_reload_order_needs_full_reload(self):
+        graph = ImportGraph(self.package)
+        self.assertIsNone(reload_order(graph, [self.init_file]))
+        self.assertIsNone(reload_order(graph, [self.readme]))
+        self.assertIsNone(reload_order(graph, [self.panels]))       # __init__.py imports a name from it
+        self.assertIsNone(reload_order(graph, [self.utils_math]))   # Imports operators, which imports it back
+
+        write_file(self.utils_math, "def clamp(x): return x\n")
+        write_file(self.operators, "import bpy\nfrom .utils.math import clamp\n"
+            "class Operator(bpy.types.Operator): pass\n")
+        self.assertIsNone(reload_order(graph, [self.utils_math]))
+
+    def test_defines_registration(self):
+        self.assertFalse(defines_registration(self.utils_math))
+        self.assertTrue(defines_registration(self.init_file))
+        write_file(self.panels, "from bpy.types import Panel as BasePanel\nclass MyPanel(BasePanel): pass\n")
+        self.assertTrue(defines_registration(self.panels))
+        write_file(self.panels, "import bpy\nbpy.utils.register_class(object)\n")
+        self.assertTrue(defines_registration(self.panels))
+
+    ###############################################################
+    # Directory Monitor
+    ###############################################################
+    def test_monitor_import_reachable(self):
+        monitor = DirectoryMonitor(self.package)
+        monitor.import_reachable = True
+        self.assertEqual(monitor.reachable_files, {self.init_file, self.operators, self.panels, self.utils_init,
+            self.utils_math})
+        monitor.data_patterns = ["README.md"]
+        self.assertEqual(monitor.data_patterns, ("README.md",))
+
+        runs = []
+        monitor.subscribe("test", lambda changes: runs.append(changes), pass_changes=True)
+        monitor.watch()
+        runs.clear()    # The first scan reports every tracked file
+        try:
+            write_file(self.test_file, "# Not part of the add-on\n")
+            monitor._scan_and_update(self.package)
+            self.assertEqual(runs, [])
+
+            # A new import makes the build script reachable
+            write_file(self.init_file, "from . import operators, build_script\n")
+            os.utime(self.init_file, ns=(time.time_ns() + 10 ** 9, time.time_ns() + 10 ** 9))
+            monitor._scan_and_update(self.package)
+            self.assertIn(self.unused, monitor.reachable_files)
+            self.assertNotIn(self.panels, monitor.reachable_files)
+            # The import change wakes the monitor for another scan, which may run on the scheduler thread first
+            monitor._scan_and_update(self.package)
+            deadline = time.monotonic() + 2
+            while not any(self.unused in changes.added for changes in runs) and time.monotonic() < deadline:
+                time.sleep(.05)
+            self.assertTrue(any(self.unused in changes.added for changes in runs))
+            self.assertTrue(any(self.panels in changes.deleted for changes in runs))
+        finally:
+            monitor.secure()
+
+    @unittest.skipUnless(InotifyBackend.is_supported(), "inotify is only available on Linux")
+    def test_monitor_import_reachable_inotify(self):
+        # A subpackage that becomes reachable while the event backend is running gets watched from then on
+        sub_package = os.path.join(self.package, "sub")
+        sub_module = os.path.join(sub_package, "b.py")
+        write_file(os.path.join(sub_package, "__init__.py"), "from . import b\n")
+        write_file(sub_module, "VALUE = 1\n")
+        monitor = DirectoryMonitor(self.package)
+        monitor.backend = "inotify"
+        monitor.import_reachable = True
+
+        runs = []
+        monitor.subscribe("test", lambda changes: runs.append(changes), pass_changes=True)
+        monitor.watch()
+        try:
+            self.assertIsInstance(monitor._backend, InotifyBackend)
+            self.assertNotIn(sub_package, monitor._backend._watches.values())
+
+            write_file(self.init_file, "import bpy\nfrom . import operators, sub\n")
+            deadline = time.monotonic() + 2
+            while sub_module not in monitor.reachable_files and time.monotonic() < deadline:
+                time.sleep(.05)
+            while (monitor._backend is None or sub_package not in monitor._backend._watches.values()) \
+                    and time.monotonic() < deadline:
+                time.sleep(.05)
+
+            write_file(sub_module, "VALUE = 2  # Edited after the import was added\n")
+            deadline = time.monotonic() + 2
+            while not any(sub_module in changes.modified for changes in runs) and time.monotonic() < deadline:
+                time.sleep(.05)
+            self.assertTrue(any(sub_module in changes.modified for changes in runs))
+        finally:
+            monitor.secure()
+
+    def test_monitor_import_reachable_daemon(self):
+        # The daemon is shared by the plain path rules, so it is found at the address it listens on right away
+        monitor = DirectoryMonitor(self.package)
+        monitor.backend = "daemon"
+        monitor.import_reachable = True
+        watch_start = time.monotonic()
+        monitor.watch()
+        watch_time = time.monotonic() - watch_start
+        backend = monitor._backend
+        monitor.secure()
+        stop_daemon(self.package, monitor._path_filter.base_filter.key())
+
+        self.assertIsInstance(backend, DaemonBackend)
+        self.assertLess(watch_time, watcher_daemon.DAEMON_START_TIMEOUT)
+
+    def test_invalid_import_reachable(self):
+        monitor = DirectoryMonitor(self.package)
+        monitor.import_reachable = "yes"
+        self.assertFalse(monitor.import_reachable)
+        monitor.data_patterns = "*.png"
+        self.assertEqual(monitor.data_patterns, ())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import importlib
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from src.import_tracker import ImportTracker, package_modules
+from tests.helpers import write_file
+
+class TestImportTracker(unittest.TestCase):
+    def setUp(self):
+        self.test_folder = tempfile.mkdtemp(prefix="_____import_tracker_test")
+        self.package = os.path.join(self.test_folder, "_____tracked_addon")
+        self.similar_package = os.path.join(self.test_folder, "_____tracked_addon_other")
+        for package in (self.package, self.similar_package):
+            os.mkdir(package)
+        write_file(os.path.join(self.package, "__init__.py"), "from . import operators\n\n"
+            "def lazy():\n    from . import lazy_module\n")
+        write_file(os.path.join(self.package, "operators.py"), "")
+        write_file(os.path.join(self.package, "lazy_module.py"), "")
+        write_file(os.path.join(self.similar_package, "__init__.py"), "")
+        sys.path.insert(0, self.test_folder)
+        self.tracker = ImportTracker("_____tracked_addon")
+
+    def tearDown(self):
+        self.tracker.uninstall()
+        sys.path.remove(self.test_folder)
+        for name in package_modules("_____tracked_addon") + package_modules("_____tracked_addon_other"):
+            del sys.modules[name]
+        shutil.rmtree(self.test_folder, ignore_errors=True)
+
+    def test_records_own_modules_only(self):
+        self.tracker.install()
+        self.assertTrue(self.tracker.installed)
+        addon = importlib.import_module("_____tracked_addon")
+        importlib.import_module("_____tracked_addon_other")
+        self.assertEqual(self.tracker.modules(), {"_____tracked_addon", "_____tracked_addon.operators"})
+
+        addon.lazy()    # Imported after enabling, while still installed
+        self.assertEqual(self.tracker.uninstall(), {"_____tracked_addon", "_____tracked_addon.operators",
+            "_____tracked_addon.lazy_module"})
+        self.assertFalse(self.tracker.installed)
+
+    def test_nothing_recorded_when_uninstalled(self):
+        importlib.import_module("_____tracked_addon")
+        self.assertEqual(self.tracker.modules(), set())
+
+    def test_package_modules_does_not_match_similar_names(self):
+        importlib.import_module("_____tracked_addon")
+        importlib.import_module("_____tracked_addon_other")
+        self.assertEqual(sorted(package_modules("_____tracked_addon")), ["_____tracked_addon",
+            "_____tracked_addon.operators"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import importlib
+import time
+import unittest
+from unittest import mock
+
+from src.directory_snapshot import ChangeSet
+from src.hot_swap import merge_changes
+from src.main_thread import MainThreadQueue
+from src.preflight import CompileError
+
+class TestMainThreadQueue(unittest.TestCase):
+    def setUp(self):
+        self.busy = ""
+        self.runs = []
+        self.queue = MainThreadQueue(lambda: self.busy, history_length=3)
+
+    def record(self, *args):
+        self.runs.append(args)
+
+    def test_jobs_run_in_order(self):
+        self.queue.submit("first", self.record, 1)
+        self.queue.submit("second", self.record, 2)
+        self.assertEqual(self.queue.pending(), ["first", "second"])
+        self.assertEqual(self.queue.run_pending(), 2)
+        self.assertEqual(self.runs, [(1,), (2,)])
+        self.assertEqual(self.queue.pending(), [])
+        self.assertEqual(self.queue.run_pending(), 0)
+
+    def test_duplicate_requests_are_coalesced(self):
+        self.queue.submit("first", self.record, 1)
+        self.queue.submit("second", self.record, 2)
+        self.queue.submit("first", self.record, 3)     # Keeps its place in the queue
+        self.queue.submit("second", self.record, 4, merge=lambda older, newer: older + newer)
+        self.queue.run_pending()
+        self.assertEqual(self.runs, [(3,), (2, 4)])
+        self.assertEqual([run.coalesced for run in self.queue.history()], [1, 1])
+
+    def test_jobs_wait_while_blender_is_busy(self):
+        self.busy = "rendering"
+        self.queue.submit("first", self.record, 1)
+        time.sleep(.02)
+        self.assertEqual(self.queue.run_pending(), 0)
+        self.assertEqual(self.runs, [])
+
+        self.busy = ""
+        self.assertEqual(self.queue.run_pending(), 1)
+        run = self.queue.history()[-1]
+        self.assertEqual(run.key, "first")
+        self.assertGreaterEqual(run.wait, .02)      # Measured from the submission, not from when Blender was idle
+
+    def test_failing_job_does_not_stop_the_queue(self):
+        self.queue.submit("broken", lambda: 1 / 0)
+        self.queue.submit("second", self.record, 2)
+        self.queue.run_pending()
+        self.assertEqual(self.runs, [(2,)])
+        self.assertIsInstance(self.queue.history()[0].error, ZeroDivisionError)
+        self.assertIsNone(self.queue.history()[1].error)
+
+    def test_current_wait(self):
+        waits = []
+        self.queue.submit("first", lambda: waits.append(self.queue.current_wait()))
+        time.sleep(.02)
+        self.queue.run_pending()
+        self.assertGreaterEqual(waits[0], .02)
+        self.assertEqual(self.queue.current_wait(), 0)
+
+    def test_merge_changes(self):
+        older = ChangeSet(added={"/addon/new.py": (1, 1, 1)}, modified={"/addon/a.py": (1, 1, 2)})
+        newer = ChangeSet(deleted={"/addon/new.py": (1, 1, 1)}, modified={"/addon/b.py": (1, 1, 3)})
+        merged, _ = merge_changes((older, []), (newer, []))
+        self.assertEqual(merged.added, {})
+        self.assertEqual(set(merged.modified), {"/addon/a.py", "/addon/b.py"})
+        self.assertEqual(older.added, {"/addon/new.py": (1, 1, 1)})     # The waiting request is not changed
+        self.assertEqual(merge_changes((older, []), (None, [])), (None, []))    # A full reload wins
+
+    def test_merge_compile_errors(self):
+        older = ChangeSet(modified={"/addon/a.py": (1, 1, 1), "/addon/b.py": (1, 1, 2)})
+        newer = ChangeSet(modified={"/addon/b.py": (2, 1, 2)})
+        a_error = CompileError("/addon/a.py", 1, 1, "invalid syntax", "")
+        b_error = CompileError("/addon/b.py", 1, 1, "invalid syntax", "")
+        # The newer request compiled b.py again, and it compiles now
+        self.assertEqual(merge_changes((older, [a_error, b_error]), (newer, []))[1], [a_error])
+        self.assertEqual(merge_changes((older, [a_error]), (None, [b_error]))[1], [b_error])
+        self.assertIsNone(merge_changes((older, None), (newer, [b_error]))[1])     # Not compiled, so the job must
+
+    def test_stop_unregisters_the_started_timer(self):
+        # Like Blender, timers are told apart by identity. Every read of a bound method is a new object.
+        registered = []
+        def unregister(function):
+            registered[:] = [timer for timer in registered if timer is not function]
+        timers = mock.Mock(register=lambda function, **options: registered.append(function),
+            is_registered=lambda function: any(timer is function for timer in registered), unregister=unregister)
+        with mock.patch.object(importlib.import_module("src.main_thread").bpy.app, "timers", timers):
+            self.queue.start()
+            self.queue.start()
+            self.assertEqual(len(registered), 1)
+            self.queue.stop()
+        self.assertEqual(registered, [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.directory_snapshot import take_snapshot
+from src.path_filter import DEFAULT_EXCLUDE_PATTERNS, PathFilter
+from tests.helpers import write_file
+
+class TestPathFilter(unittest.TestCase):
+
+    ###############################################################
+    # Matching Rules
+    ###############################################################
+    def test_default_excludes(self):
+        path_filter = PathFilter()
+        self.assertTrue(path_filter.excludes_folder(".git", ".git"))
+        self.assertTrue(path_filter.excludes_folder("src/__pycache__", "__pycache__"))
+        self.assertTrue(path_filter.excludes_folder(".venv", ".venv"))
+        self.assertFalse(path_filter.includes_file("src/module.pyc", "module.pyc"))
+        self.assertFalse(path_filter.includes_file("src/.module.py.swp", ".module.py.swp"))
+        self.assertFalse(path_filter.includes_file("src/module.py~", "module.py~"))
+        self.assertTrue(path_filter.includes_file("src/module.py", "module.py"))
+        self.assertFalse(path_filter.excludes_folder("src", "src"))
+
+    def test_folder_only_rule_does_not_match_files(self):
+        path_filter = PathFilter(exclude=["build/"])
+        self.assertTrue(path_filter.excludes_folder("build", "build"))
+        self.assertTrue(path_filter.includes_file("build", "build"))
+
+    def test_anchored_rule_only_matches_from_root(self):
+        path_filter = PathFilter(exclude=["/build"])
+        self.assertTrue(path_filter.excludes_folder("build", "build"))
+        self.assertFalse(path_filter.excludes_folder("src/build", "build"))
+
+    def test_double_star_matches_any_depth(self):
+        path_filter = PathFilter(exclude=["**/tests", "docs/**"])
+        self.assertTrue(path_filter.excludes_folder("tests", "tests"))
+        self.assertTrue(path_filter.excludes_folder("a/b/tests", "tests"))
+        self.assertFalse(path_filter.includes_file("docs/a/b/readme.md", "readme.md"))
+        self.assertTrue(path_filter.includes_file("src/docs.md", "docs.md"))
+
+    def test_negated_rule_reincludes(self):
+        path_filter = PathFilter(exclude=["*.json", "!manifest.json"])
+        self.assertFalse(path_filter.includes_file("data/other.json", "other.json"))
+        self.assertTrue(path_filter.includes_file("data/manifest.json", "manifest.json"))
+
+    def test_include_patterns_limit_tracked_files(self):
+        path_filter = PathFilter(include=["*.py", "icons/**"])
+        self.assertTrue(path_filter.includes_file("src/module.py", "module.py"))
+        self.assertTrue(path_filter.includes_file("icons/a/b.png", "b.png"))
+        self.assertFalse(path_filter.includes_file("readme.md", "readme.md"))
+        # Excludes still win over includes
+        self.assertFalse(path_filter.includes_file(".git/hooks/hook.py", "hook.py") and
+            path_filter.includes_path(".git/hooks/hook.py", False))
+
+    def test_includes_path_checks_parent_folders(self):
+        path_filter = PathFilter()
+        self.assertFalse(path_filter.includes_path(".git/objects/ab/cdef", False))
+        self.assertTrue(path_filter.includes_path("src/module.py", False))
+
+    ###############################################################
+    # Ignore Files and Scanning
+    ###############################################################
+    def test_ignore_file_rules_and_pruned_walk(self):
+        test_folder = tempfile.mkdtemp(prefix="_____filter_test")
+        ignore_file = os.path.join(test_folder, ".scripting_assistant_ignore")
+        write_file(ignore_file, "# Comment line\n\nbuild/\n*.blend1\n")
+        os.mkdir(os.path.join(test_folder, "build"))
+        os.mkdir(os.path.join(test_folder, "__pycache__"))
+        write_file(os.path.join(test_folder, "build", "output.py"))
+        write_file(os.path.join(test_folder, "__pycache__", "module.cpython-310.pyc"))
+        write_file(os.path.join(test_folder, "scene.blend1"))
+        write_file(os.path.join(test_folder, "module.py"))
+
+        path_filter = PathFilter(exclude=DEFAULT_EXCLUDE_PATTERNS, ignore_file=ignore_file)
+        snapshot = take_snapshot(test_folder, path_filter)
+        shutil.rmtree(test_folder, ignore_errors=True)
+
+        self.assertEqual(sorted(os.path.basename(path) for path in snapshot),
+            [".scripting_assistant_ignore", "module.py"])
+
+
+if __name__ == '__main__':
+    unittest.main()
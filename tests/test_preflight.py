@@ -0,0 +1,56 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.directory_snapshot import ChangeSet
+from src.preflight import compile_module, modules_to_check, preflight_compile
+from tests.helpers import write_file
+
+class TestPreflight(unittest.TestCase):
+    def setUp(self):
+        self.test_folder = tempfile.mkdtemp(prefix="_____preflight_test")
+        self.good_file = os.path.join(self.test_folder, "good.py")
+        self.bad_file = os.path.join(self.test_folder, "bad.py")
+        self.data_file = os.path.join(self.test_folder, "icon.png")
+        write_file(self.good_file, "def register():\n    pass\n")
+        write_file(self.bad_file, "def register(:\n    pass\n")
+        write_file(self.data_file, "Not Python")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_folder, ignore_errors=True)
+
+    def test_compile_module(self):
+        self.assertIsNone(compile_module(self.good_file))
+        error = compile_module(self.bad_file)
+        self.assertEqual(error.file_path, self.bad_file)
+        self.assertEqual(error.line, 1)
+        self.assertGreater(error.column, 0)
+        self.assertEqual(error.text, "def register(:")
+
+    def test_compile_errors_are_found(self):
+        more_files = []
+        for number in range(5):
+            more_files.append(os.path.join(self.test_folder, "module" + str(number) + ".py"))
+            write_file(more_files[-1], "value = " + str(number) + "\n")
+        # Several files compile on the background pool, but the errors keep their order
+        errors = preflight_compile([self.good_file, self.bad_file] + more_files)
+        self.assertEqual([error.file_path for error in errors], [self.bad_file])
+        self.assertEqual(preflight_compile([self.good_file] + more_files), [])
+        self.assertEqual(preflight_compile([]), [])
+
+    def test_indentation_errors_are_found(self):
+        write_file(self.good_file, "def register():\npass\n")
+        self.assertEqual(compile_module(self.good_file).line, 2)
+
+    def test_modules_to_check(self):
+        self.assertEqual(modules_to_check(self.test_folder), sorted([self.good_file, self.bad_file]))
+        self.assertEqual(modules_to_check(self.good_file), [self.good_file])
+
+        deleted_file = os.path.join(self.test_folder, "deleted.py")
+        changes = ChangeSet(added={self.data_file: (0, 0, 0)}, modified={self.good_file: (0, 0, 0)},
+            deleted={deleted_file: (0, 0, 0)})
+        self.assertEqual(modules_to_check(self.test_folder, changes), [self.good_file])
+
+if __name__ == '__main__':
+    unittest.main()
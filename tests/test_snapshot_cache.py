@@ -0,0 +1,47 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.directory_snapshot import take_snapshot
+from src.snapshot_cache import load_snapshot, save_snapshot
+from tests.helpers import write_file
+
+class TestSnapshotCache(unittest.TestCase):
+    def setUp(self):
+        self.test_folder = tempfile.mkdtemp(prefix="_____cache_test")
+        self.cache_folder = tempfile.mkdtemp(prefix="_____cache_test")
+        self.cache_file = os.path.join(self.cache_folder, "snapshot.cache")
+        os.mkdir(os.path.join(self.test_folder, "subfolder"))
+        self.file1 = os.path.join(self.test_folder, "_____testfile1.txt")
+        self.file2 = os.path.join(self.test_folder, "subfolder", "_____testfile2.txt")
+        write_file(self.file1)
+        write_file(self.file2)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_folder, ignore_errors=True)
+        shutil.rmtree(self.cache_folder, ignore_errors=True)
+
+    def test_round_trip(self):
+        snapshot = take_snapshot(self.test_folder)
+        self.assertTrue(save_snapshot(self.cache_file, self.test_folder, "rules", snapshot))
+        self.assertEqual(load_snapshot(self.cache_file, self.test_folder, "rules"), snapshot)
+
+    def test_round_trip_single_file(self):
+        snapshot = take_snapshot(self.file1)
+        save_snapshot(self.cache_file, self.file1, "rules", snapshot)
+        self.assertEqual(load_snapshot(self.cache_file, self.file1, "rules"), snapshot)
+
+    def test_different_rules_or_directory_are_not_loaded(self):
+        save_snapshot(self.cache_file, self.test_folder, "rules", take_snapshot(self.test_folder))
+        self.assertIsNone(load_snapshot(self.cache_file, self.test_folder, "other rules"))
+        self.assertIsNone(load_snapshot(self.cache_file, self.cache_folder, "rules"))
+
+    def test_missing_or_corrupt_cache_is_ignored(self):
+        self.assertIsNone(load_snapshot(self.cache_file, self.test_folder, "rules"))
+        write_file(self.cache_file, "Not a cache file")
+        self.assertIsNone(load_snapshot(self.cache_file, self.test_folder, "rules"))
+
+
+if __name__ == '__main__':
+    unittest.main()
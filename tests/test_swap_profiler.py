@@ -0,0 +1,79 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from src.directory_snapshot import ChangeSet
+from src.swap_profiler import SwapProfiler
+
+class TestSwapProfiler(unittest.TestCase):
+    def setUp(self):
+        self.over_budget = []
+        self.profiler = SwapProfiler(lambda profile, budget: self.over_budget.append(profile), history_length=3)
+
+    def record_swap(self, changes=None, outcome="success", sleep=0):
+        profile = self.profiler.start(changes)
+        with profile.phase("purge"):
+            time.sleep(sleep)
+        with profile.phase("refresh"):
+            pass
+        with profile.phase("refresh"):
+            pass
+        profile.bytes_copied = 100
+        profile.outcome = outcome
+        self.profiler.finish(profile)
+        return profile
+
+    def test_phases_are_recorded(self):
+        profile = self.record_swap(sleep=.02)
+        self.assertEqual(list(profile.phases), ["purge", "refresh"])    # Repeated phases add up
+        self.assertGreaterEqual(profile.phases["purge"], .02)
+        self.assertGreaterEqual(profile.total, profile.phases["purge"])
+        self.assertEqual(profile.slowest_phase(), "purge")
+        self.assertIsNone(profile.save_to_live)
+
+    def test_history_is_a_ring_buffer(self):
+        profiles = [self.record_swap() for _ in range(5)]
+        self.assertEqual(self.profiler.history(), profiles[2:])
+        summary = self.profiler.summary()
+        self.assertEqual(summary["total"]["count"], 3)
+        self.assertIn("refresh", summary)
+        self.profiler.clear()
+        self.assertEqual(self.profiler.history(), [])
+
+    def test_export_json(self):
+        self.record_swap()
+        export_folder = tempfile.mkdtemp(prefix="_____swap_profiler_test")
+        try:
+            export_file = os.path.join(export_folder, "swaps.json")
+            contents = self.profiler.export_json(export_file)
+            with open(export_file) as file:
+                self.assertEqual(file.read(), contents)
+        finally:
+            shutil.rmtree(export_folder, ignore_errors=True)
+        swaps = json.loads(contents)["swaps"]
+        self.assertEqual(swaps[0]["bytes_copied"], 100)
+        self.assertEqual(set(swaps[0]["phases"]), {"purge", "refresh"})
+
+    def test_latency_budget(self):
+        self.record_swap(sleep=.02)
+        self.assertEqual(self.over_budget, [])  # No budget set
+
+        self.profiler.latency_budget = .01
+        profile = self.record_swap(sleep=.02)
+        self.assertEqual(self.over_budget, [profile])
+        self.record_swap(sleep=.02, outcome="compile error")
+        self.assertEqual(len(self.over_budget), 1)
+
+        # Measured from when the changed file was saved, not when the swap started
+        self.profiler.latency_budget = 5
+        saved = (time.time_ns() - 10 * 10 ** 9, 10, 1)
+        profile = self.record_swap(ChangeSet(modified={"/addon/module.py": saved}))
+        self.assertGreaterEqual(profile.save_to_live, 10)
+        self.assertEqual(profile.changed_files, 1)
+        self.assertEqual(self.over_budget[-1], profile)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import ast
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.directory_snapshot import ChangeSet
+from src.workspace import PathTrie, Workspace, defines_bl_info, discover_addons, find_bl_info
+from tests.helpers import write_file
+
+BL_INFO = "bl_info = {'name': 'Test Add-on'}\n"
+
+class TestWorkspace(unittest.TestCase):
+    def setUp(self):
+        self.test_folder = tempfile.mkdtemp(prefix="_____workspace_test")
+        self.first = os.path.join(self.test_folder, "addons", "first")
+        self.second = os.path.join(self.test_folder, "addons", "second")
+        self.single = os.path.join(self.test_folder, "tools", "single.py")
+        write_file(os.path.join(self.first, "__init__.py"), BL_INFO)
+        write_file(os.path.join(self.first, "utils", "__init__.py"), BL_INFO)   # Part of `first`, not its own add-on
+        write_file(os.path.join(self.first, "utils", "math.py"), "")
+        write_file(os.path.join(self.second, "__init__.py"), "import bpy\n" + BL_INFO)
+        write_file(self.single, BL_INFO)
+        write_file(os.path.join(self.test_folder, "tools", "helper.py"), "print('bl_info')\n")
+        write_file(os.path.join(self.test_folder, "shared", "__init__.py"), "")
+        write_file(os.path.join(self.test_folder, ".git", "hooks", "hook.py"), BL_INFO)
+        self.workspace = Workspace(self.test_folder)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_folder, ignore_errors=True)
+
+    def test_defines_bl_info(self):
+        self.assertTrue(defines_bl_info(self.single))
+        self.assertFalse(defines_bl_info(os.path.join(self.test_folder, "tools", "helper.py")))
+        self.assertFalse(defines_bl_info(os.path.join(self.test_folder, "missing.py")))
+
+    def test_find_bl_info(self):
+        self.assertEqual(ast.literal_eval(find_bl_info(ast.parse(BL_INFO))), {'name': 'Test Add-on'})
+        self.assertIsNotNone(find_bl_info(ast.parse("bl_info: dict = {}\n")))
+        self.assertIsNone(find_bl_info(ast.parse("bl_info: dict\n")))      # Declared, but never assigned
+        self.assertIsNone(find_bl_info(ast.parse("def register():\n    bl_info = {}\n")))
+
+    def test_discover_addons(self):
+        self.assertEqual(discover_addons(self.test_folder), sorted([self.first, self.second, self.single]))
+        self.assertTrue(self.workspace.discover())
+        self.assertFalse(self.workspace.discover())
+
+    @unittest.skipUnless(hasattr(os, "symlink"), "needs symbolic links")
+    def test_discover_addons_skips_linked_folders(self):
+        os.symlink(self.test_folder, os.path.join(self.test_folder, "loop"))
+        os.symlink(self.first, os.path.join(self.test_folder, "first_link"))
+        self.assertEqual(discover_addons(self.test_folder), sorted([self.first, self.second, self.single]))
+
+    def test_path_trie(self):
+        trie = PathTrie()
+        trie.insert("/workspace/addons/first", "first")
+        trie.insert("/workspace/addons/first/nested", "nested")
+        self.assertEqual(len(trie), 2)
+        self.assertEqual(trie.owner("/workspace/addons/first/utils/math.py"), "first")
+        self.assertEqual(trie.owner("/workspace/addons/first/nested/module.py"), "nested")   # The longest prefix wins
+        self.assertEqual(trie.owner("/workspace/addons/first"), "first")
+        self.assertIsNone(trie.owner("/workspace/addons/firstly/module.py"))
+        self.assertIsNone(trie.owner("/workspace"))
+
+        self.assertTrue(trie.remove("/workspace/addons/first/nested"))
+        self.assertFalse(trie.remove("/workspace/addons/first/nested"))
+        self.assertEqual(trie.owner("/workspace/addons/first/nested/module.py"), "first")
+        self.assertEqual(len(trie), 1)
+
+    def test_split_changes(self):
+        self.workspace.discover()
+        first_module = os.path.join(self.first, "utils", "math.py")
+        second_module = os.path.join(self.second, "operators.py")
+        changes = ChangeSet(
+            modified={first_module: (1, 1, 1), os.path.join(self.test_folder, "README.md"): (1, 1, 2)},
+            moved={os.path.join(self.first, "old.py"): (second_module, (1, 1, 3)),
+                os.path.join(self.first, "a.py"): (os.path.join(self.first, "b.py"), (1, 1, 4))})
+        split = self.workspace.split_changes(changes)
+        self.assertEqual(set(split), {self.first, self.second})     # Files outside every add-on are dropped
+        self.assertEqual(set(split[self.first].modified), {first_module})
+        self.assertEqual(set(split[self.first].deleted), {os.path.join(self.first, "old.py")})
+        self.assertEqual(set(split[self.first].moved), {os.path.join(self.first, "a.py")})
+        self.assertEqual(set(split[self.second].added), {second_module})
+
+    def test_new_addons_are_discovered(self):
+        self.workspace.discover()
+        third = os.path.join(self.test_folder, "addons", "third")
+        write_file(os.path.join(third, "__init__.py"), BL_INFO)
+        split = self.workspace.split_changes(ChangeSet(added={os.path.join(third, "__init__.py"): (1, 1, 1)}))
+        self.assertEqual(list(split), [third])
+        self.assertIn(third, self.workspace.addons)
+
+if __name__ == '__main__':
+    unittest.main()